@@ -0,0 +1,107 @@
+"""
+采样模式基准测试
+比较 uniform / fps / poisson_disk 在不同点数下的采样耗时、覆盖率以及骨骼生成耗时
+
+用法:
+    PYTHONPATH=src python benchmarks/benchmark_sampling.py [mesh_file] [--counts 2048 4096 8192]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+import trimesh
+from scipy.spatial import cKDTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from services.point_sampling import PointSampler, SAMPLING_MODES, normalize_point_cloud
+
+
+def build_test_mesh() -> trimesh.Trimesh:
+    """构造一个带细长四肢和手指的测试网格"""
+    parts = [trimesh.creation.box(extents=[0.4, 0.8, 0.2])]
+
+    # 四肢
+    for x, y, angle in [(-0.35, 0.2, 1.2), (0.35, 0.2, -1.2), (-0.12, -0.7, 0.0), (0.12, -0.7, 0.0)]:
+        limb = trimesh.creation.cylinder(radius=0.04, height=0.7)
+        limb.apply_transform(trimesh.transformations.rotation_matrix(np.pi / 2 + angle, [0, 0, 1]))
+        limb.apply_translation([x, y, 0])
+        parts.append(limb)
+
+    # 手指
+    for side in (-1, 1):
+        for i in range(5):
+            finger = trimesh.creation.cylinder(radius=0.008, height=0.12)
+            finger.apply_translation([side * 0.68, 0.42 + (i - 2) * 0.025, 0])
+            parts.append(finger)
+
+    return trimesh.util.concatenate(parts)
+
+
+def coverage_error(mesh: trimesh.Trimesh, points: np.ndarray) -> tuple:
+    """计算致密参考点到采样点的单向距离（95分位 / 最大值）"""
+    reference, _ = trimesh.sample.sample_surface(mesh, 200000, seed=12345)
+    dist, _ = cKDTree(points).query(reference)
+    return float(np.percentile(dist, 95)), float(dist.max())
+
+
+async def measure_inference(point_clouds: List[np.ndarray]) -> Optional[List[float]]:
+    """测量骨骼生成耗时；模型依赖不可用时跳过"""
+    try:
+        from services.magicarticulate_wrapper import MagicArticulateWrapper
+    except ImportError as e:
+        print(f"Skipping inference benchmark: {e}")
+        return None
+
+    wrapper = MagicArticulateWrapper()
+    await wrapper.initialize()
+
+    timings = []
+    for pc in point_clouds:
+        start = time.perf_counter()
+        await wrapper.generate_skeleton(pc)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark point cloud sampling modes")
+    parser.add_argument("mesh_file", nargs="?", help="mesh file to sample (defaults to a synthetic figure)")
+    parser.add_argument("--counts", type=int, nargs="+", default=[2048, 4096, 8192])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-inference", action="store_true")
+    args = parser.parse_args()
+
+    mesh = trimesh.load(args.mesh_file, force="mesh") if args.mesh_file else build_test_mesh()
+    sampler = PointSampler()
+
+    rows = []
+    point_clouds = []
+    for mode in SAMPLING_MODES:
+        for count in args.counts:
+            timings = []
+            for seed in range(args.repeat):
+                start = time.perf_counter()
+                points, normals = sampler.sample(mesh, count, mode, seed=seed)
+                timings.append(time.perf_counter() - start)
+
+            p95, worst = coverage_error(mesh, points)
+            rows.append((mode, count, float(np.median(timings)), p95, worst))
+            # 与服务中 _apply_sampling_strategy 的输出一致：归一化到单位立方体后送入模型
+            point_clouds.append(normalize_point_cloud(points, normals))
+
+    inference = None if args.skip_inference else asyncio.run(measure_inference(point_clouds))
+
+    print(f"{'mode':<14}{'points':>8}{'sample_s':>11}{'cov_p95':>10}{'cov_max':>10}{'infer_s':>10}")
+    for i, (mode, count, sample_s, p95, worst) in enumerate(rows):
+        infer = f"{inference[i]:>10.3f}" if inference else f"{'-':>10}"
+        print(f"{mode:<14}{count:>8}{sample_s:>11.4f}{p95:>10.4f}{worst:>10.4f}{infer}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,24 @@ ArticulateHub AI Service
 基于MagicArticulate的增强版3D模型骨骼生成服务
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 import uvicorn
 import os
+import uuid
+import asyncio
 import logging
 from pathlib import Path
 
 from services.articulation_service import ArticulationService
 from services.text_processor import TextProcessor
-from models.requests import ProcessingRequest, ProcessingResponse
+from services.result_encoding import negotiate_media_type, encode_result
+from services.file_response import RangeFileResponse, IMMUTABLE_CACHE_CONTROL, accepts_encoding
+from services.gltf_export import MEDIA_GLB
+from services.task_results import TaskResultRegistry
+from models.requests import ProcessingRequest, ProcessingResponse, ProcessingStatus
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -46,6 +52,9 @@ RESULTS_DIR = Path("/app/results")
 UPLOAD_DIR.mkdir(exist_ok=True)
 RESULTS_DIR.mkdir(exist_ok=True)
 
+# 已完成任务的结果（task_id -> ProcessingResult），条目数有上限且会过期
+task_results = TaskResultRegistry()
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
@@ -53,6 +62,11 @@ async def startup_event():
     await articulation_service.initialize()
     logger.info("✅ AI Service ready!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时释放资源"""
+    await articulation_service.shutdown()
+
 @app.get("/")
 async def root():
     """健康检查接口"""
@@ -73,6 +87,13 @@ async def health_check():
         }
     }
 
+@app.get("/cache/metrics")
+async def cache_metrics():
+    """几何缓存指标（命中率、重建耗时）"""
+    metrics = articulation_service.get_cache_metrics()
+    metrics['task_results'] = task_results.get_metrics()
+    return metrics
+
 @app.post("/process", response_model=ProcessingResponse)
 async def process_model(
     background_tasks: BackgroundTasks,
@@ -87,18 +108,20 @@ async def process_model(
         if not os.path.exists(request.file_path):
             raise HTTPException(status_code=404, detail="Model file not found")
         
-        # 异步处理任务
+        # 异步处理任务（同一文件多次处理各自得到独立的任务号）
+        task_id = f"task_{uuid.uuid4().hex}"
         background_tasks.add_task(
             process_model_task,
+            task_id,
             request.file_path,
             request.user_prompt,
-            request.processing_options
+            request.processing_options.model_dump(mode="json")
         )
         
         return ProcessingResponse(
-            status="accepted",
+            status=ProcessingStatus.PENDING,
             message="Processing started",
-            task_id=f"task_{hash(request.file_path)}"
+            task_id=task_id
         )
         
     except Exception as e:
@@ -106,6 +129,7 @@ async def process_model(
         raise HTTPException(status_code=500, detail=str(e))
 
 async def process_model_task(
+    task_id: str,
     file_path: str, 
     user_prompt: Optional[str], 
     options: dict
@@ -118,7 +142,7 @@ async def process_model_task(
             **options
         )
         
-        # 这里可以添加结果存储逻辑
+        task_results.put(task_id, result)
         logger.info(f"Processing completed for {file_path}")
         return result
         
@@ -146,17 +170,81 @@ async def upload_file(file: UploadFile = File(...)):
             content = await file.read()
             buffer.write(content)
         
+        # 只读文件头估算内存，超出处理能力的文件直接拒绝
+        inspection = await articulation_service.inspect_upload(str(file_path))
+        if inspection["admission"] == "reject":
+            file_path.unlink(missing_ok=True)
+            raise HTTPException(
+                status_code=413,
+                detail=f"Model too large or unreadable: estimated {inspection['estimated_bytes']} bytes"
+            )
+        
+        # 在 /process 之前的空闲时间里预取几何
+        articulation_service.prefetch_geometry(str(file_path))
+        
         return {
             "message": "File uploaded successfully",
             "file_path": str(file_path),
             "file_size": len(content),
-            "file_type": file_extension
+            "file_type": file_extension,
+            "inspection": inspection
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/results/{task_id}")
+async def get_result(task_id: str, request: Request, accept: Optional[str] = Header(None)):
+    """
+    获取处理结果
+    按 Accept 头返回 msgpack / npz（骨骼数组为原始字节），否则返回 JSON；
+    以 output_format=glb 处理的任务在 Accept 包含 model/gltf-binary 时直接返回 GLB 文件
+    """
+    result = task_results.get(task_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Result not found")
+    
+    if accept and MEDIA_GLB in accept.lower() and result.artifacts and 'glb' in result.artifacts:
+        return await get_artifact(result.artifacts['glb'], request)
+    
+    media_type = negotiate_media_type(accept)
+    return Response(
+        content=encode_result(result, media_type),
+        media_type=media_type,
+        headers={"Vary": "Accept"}
+    )
+
+@app.get("/artifacts/{name}")
+async def get_artifact(name: str, request: Request):
+    """
+    获取结果文件（骨骼 JSON / 骨骼数组 / 蒙皮权重）
+    文件按内容哈希命名，ETag 即内容哈希；支持 If-None-Match 和单区间 Range。
+    zstd 压缩的文件在客户端接受 zstd 时原样发送（Content-Encoding: zstd），否则解压后返回完整内容
+    """
+    result_store = articulation_service.result_store
+    path = await result_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    
+    media_type, encoding = result_store.describe(name)
+    digest = name.split('.', 1)[0]
+    if encoding and not accepts_encoding(request.headers.get('accept-encoding'), encoding):
+        etag = f'"{digest}"'
+        if request.headers.get('if-none-match') == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        content = await asyncio.get_running_loop().run_in_executor(None, result_store.read_decoded, path)
+        return Response(
+            content=content,
+            media_type=media_type,
+            headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        )
+    
+    etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+    return RangeFileResponse(path, request.headers, etag, media_type, content_encoding=encoding)
+
 @app.get("/prompt-templates")
 async def get_prompt_templates():
     """获取提示词模板"""
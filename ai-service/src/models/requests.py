@@ -2,18 +2,93 @@
 API请求和响应模型定义
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, PlainValidator, WithJsonSchema, model_validator
+from typing import Optional, Dict, Any, List, Annotated
 from enum import Enum
+import numpy as np
+
+from services.sparse_voxel import MIN_OCTREE_DEPTH, MAX_OCTREE_DEPTH
+
+# 点云点数的取值范围（采样内存不计入网格加载的准入预算，由上限约束）
+MIN_POINT_COUNT = 256
+MAX_POINT_COUNT = 65536
+
+
+def _array_field(dtype, width: Optional[int], item_type: str, rows: bool = False):
+    """
+    numpy 数组字段：输入转换为 dtype 数组，JSON 输出为嵌套列表
+
+    width 为每行定长；rows 为 True 时保留二维形状、行长不定
+    """
+    def validate(value) -> np.ndarray:
+        array = np.asarray(value, dtype=dtype)
+        if width:
+            return array.reshape(-1, width)
+        return np.atleast_2d(array) if rows else array.reshape(-1)
+
+    item_schema = {'type': item_type}
+    if width:
+        item_schema = {'type': 'array', 'items': item_schema, 'minItems': width, 'maxItems': width}
+    elif rows:
+        item_schema = {'type': 'array', 'items': item_schema}
+    return Annotated[
+        np.ndarray,
+        PlainValidator(validate),
+        PlainSerializer(lambda array: array.tolist(), when_used='json'),
+        WithJsonSchema({'type': 'array', 'items': item_schema})
+    ]
+
+
+# 关节坐标 (J, 3) float32 / 骨骼索引 (B, 2) int32 / 父关节索引 (J,) int32
+JointArray = _array_field(np.float32, 3, 'number')
+BoneArray = _array_field(np.int32, 2, 'integer')
+IndexArray = _array_field(np.int32, None, 'integer')
+# 每顶点 top-k 的骨骼序号 (V, k) int32 / 权重 (V, k) float32
+IndexRows = _array_field(np.int32, None, 'integer', rows=True)
+WeightRows = _array_field(np.float32, None, 'number', rows=True)
+
+class SamplingMode(str, Enum):
+    """点云采样模式枚举"""
+    UNIFORM = "uniform"
+    FPS = "fps"
+    POISSON_DISK = "poisson_disk"
+
+class OutputFormat(str, Enum):
+    """结果输出格式枚举"""
+    JSON = "json"
+    GLB = "glb"
+
+class SymmetryMode(str, Enum):
+    """骨骼对称化模式枚举"""
+    OFF = "off"
+    AVERAGE = "average"
+    MIRROR = "mirror"
 
 class ProcessingOptions(BaseModel):
     """处理选项"""
     use_prompt_guidance: bool = Field(default=True, description="是否使用提示词引导")
     prompt_weight: float = Field(default=0.5, ge=0.0, le=1.0, description="提示词影响权重")
-    input_pc_num: int = Field(default=8192, description="输入点云数量")
+    input_pc_num: int = Field(default=8192, ge=MIN_POINT_COUNT, le=MAX_POINT_COUNT, description="输入点云数量")
     apply_marching_cubes: bool = Field(default=False, description="是否应用Marching Cubes")
-    octree_depth: int = Field(default=7, description="八叉树深度")
+    octree_depth: int = Field(default=7, ge=MIN_OCTREE_DEPTH, le=MAX_OCTREE_DEPTH, description="八叉树深度")
     hier_order: bool = Field(default=False, description="是否使用层次顺序")
+    sampling_mode: SamplingMode = Field(default=SamplingMode.UNIFORM, description="点云采样模式")
+    adaptive_budget: bool = Field(default=False, description="是否根据网格复杂度自动选择点云数量")
+    min_pc_num: int = Field(default=1024, ge=MIN_POINT_COUNT, le=MAX_POINT_COUNT, description="自适应点数下限")
+    max_pc_num: int = Field(default=8192, ge=MIN_POINT_COUNT, le=MAX_POINT_COUNT, description="自适应点数上限")
+    adaptive_target_quality: float = Field(default=0.9, ge=0.5, le=0.99, description="自适应点数的目标质量")
+    compute_skinning: bool = Field(default=False, description="是否计算蒙皮权重")
+    skinning_top_k: int = Field(default=4, ge=1, le=8, description="每个顶点保留的骨骼影响数")
+    symmetry_mode: SymmetryMode = Field(default=SymmetryMode.AVERAGE, description="检测到镜像对称时的处理：关节配对平均 / 保留半边并镜像补全 / 关闭")
+    skeleton_lod_levels: int = Field(default=0, ge=0, le=4, description="预览用骨骼LOD级数（每级关节数减半）")
+    output_format: OutputFormat = Field(default=OutputFormat.JSON, description="输出格式（glb 时额外导出绑定好骨骼的 GLB）")
+
+    @model_validator(mode='after')
+    def _check_point_bounds(self) -> 'ProcessingOptions':
+        """自适应点数的下限不能超过上限"""
+        if self.min_pc_num > self.max_pc_num:
+            raise ValueError(f"min_pc_num ({self.min_pc_num}) must not exceed max_pc_num ({self.max_pc_num})")
+        return self
 
 class ProcessingRequest(BaseModel):
     """处理请求"""
@@ -29,21 +104,71 @@ class ProcessingStatus(str, Enum):
     FAILED = "failed"
 
 class SkeletonData(BaseModel):
-    """骨骼数据"""
-    joints: List[List[float]] = Field(..., description="关节坐标")
-    bones: List[List[int]] = Field(..., description="骨骼连接")
+    """
+    骨骼数据（数组存储）
+
+    服务内部用 model_construct 直接构造，跳过逐元素校验；
+    外部输入的嵌套列表经校验转换为数组
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    joints: JointArray = Field(..., description="关节坐标")
+    bones: BoneArray = Field(..., description="骨骼连接")
     joint_names: Optional[List[str]] = Field(None, description="关节名称")
     root_index: Optional[int] = Field(None, description="根关节索引")
+    parents: Optional[IndexArray] = Field(None, description="父关节索引（根为-1）")
+
+class SkinWeights(BaseModel):
+    """
+    蒙皮权重（每顶点 top-k 稀疏存储）
+
+    顶点顺序与清理（焊接）后的网格一致；骨骼序号对应 SkeletonData.bones
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    indices: IndexRows = Field(..., description="每个顶点影响最大的骨骼序号")
+    weights: WeightRows = Field(..., description="对应的权重（降序，每行和为1）")
+    top_k: int = Field(..., description="每个顶点保留的骨骼数")
+    vertex_count: int = Field(..., description="顶点数")
+
+    @property
+    def nbytes(self) -> int:
+        """数组占用的字节数（用于缓存容量估算）"""
+        return int(self.indices.nbytes + self.weights.nbytes)
+
+class SkeletonLOD(BaseModel):
+    """骨骼细节层级（预览用的简化骨骼）"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    level: int = Field(..., description="层级（1 为最精细的简化级）")
+    joints: JointArray = Field(..., description="关节坐标")
+    bones: BoneArray = Field(..., description="骨骼连接（父 -> 子）")
+    parents: IndexArray = Field(..., description="父关节索引（根为-1）")
+    joint_names: Optional[List[str]] = Field(None, description="关节名称")
+    source_joints: IndexArray = Field(..., description="每个LOD关节对应的全分辨率关节")
+    joint_map: IndexArray = Field(..., description="每个全分辨率关节并入的LOD关节")
+
+    @property
+    def nbytes(self) -> int:
+        """数组占用的字节数（用于缓存容量估算）"""
+        return int(sum(array.nbytes for array in (
+            self.joints, self.bones, self.parents, self.source_joints, self.joint_map
+        )))
 
 class ProcessingResult(BaseModel):
     """处理结果"""
     skeleton_data: Optional[SkeletonData] = None
+    skin_weights: Optional[SkinWeights] = Field(None, description="蒙皮权重（compute_skinning 时提供）")
+    skeleton_lods: Optional[List[SkeletonLOD]] = Field(None, description="逐级简化的预览骨骼（skeleton_lod_levels > 0 时提供）")
     joint_count: Optional[int] = Field(None, description="关节数量")
     bone_count: Optional[int] = Field(None, description="骨骼数量")
     processing_time: Optional[float] = Field(None, description="处理时间(秒)")
     user_prompt: Optional[str] = Field(None, description="用户提示词")
     prompt_influence_score: Optional[float] = Field(None, description="提示词影响分数")
+    sampling_info: Optional[Dict[str, Any]] = Field(None, description="采样信息（自适应点数选择等）")
+    symmetry_info: Optional[Dict[str, Any]] = Field(None, description="对称检测结果（镜像平面、残差比）")
     result_file_path: Optional[str] = Field(None, description="结果文件路径")
+    artifacts: Optional[Dict[str, str]] = Field(None, description="结果文件名（json / arrays / weights / glb），通过 /artifacts/{name} 获取")
     error_message: Optional[str] = Field(None, description="错误信息")
 
 class ProcessingResponse(BaseModel):
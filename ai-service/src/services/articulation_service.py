@@ -5,20 +5,74 @@
 
 import os
 import sys
+import copy
 import asyncio
 import logging
 import time
-from typing import Optional, Dict, Any, Tuple
-from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
 import numpy as np
 
 from services.text_processor import TextProcessor
 from services.enhanced_sampling import EnhancedSampling
 from services.magicarticulate_wrapper import MagicArticulateWrapper
-from models.requests import ProcessingResult, SkeletonData
+from services.prefetcher import GeometryPrefetcher
+from services.stage_graph import StageGraph, value_digest
+from services.pipeline import StagePipeline
+from services.skeleton_hierarchy import SkeletonHierarchyBuilder
+from services.skeleton_lod import SkeletonLODBuilder
+from services.symmetry import SymmetryDetector
+from services.joint_refinement import JointRefiner
+from services.prompt_influence import PromptInfluenceEvaluator
+from services.result_store import ResultStore
+from models.requests import OutputFormat, SymmetryMode, ProcessingOptions, ProcessingResult, SkeletonData, SkeletonLOD, SkinWeights
 
 logger = logging.getLogger(__name__)
 
+# 影响点云采样结果的策略字段（点云阶段的输入）
+GEOMETRY_STRATEGY_KEYS = (
+    'sampling_count', 'sampling_mode', 'apply_marching_cubes', 'octree_depth',
+    'adaptive_budget', 'min_pc_num', 'max_pc_num', 'adaptive_target_quality', 'region_weights'
+)
+
+# 影响骨骼推理的处理选项（推理阶段的输入）
+INFERENCE_OPTION_KEYS = ('hier_order',)
+
+# 对称阶段的处理选项
+SYMMETRY_OPTION_KEYS = ('symmetry_mode',)
+
+# 蒙皮阶段的处理选项
+SKINNING_OPTION_KEYS = ('compute_skinning', 'skinning_top_k')
+
+# 骨骼LOD阶段的处理选项
+LOD_OPTION_KEYS = ('skeleton_lod_levels',)
+
+# 导出阶段的处理选项
+EXPORT_OPTION_KEYS = ('output_format',)
+
+# 未引导基线骨骼经过的阶段（用于提示词影响评估）
+BASELINE_STAGES = (
+    'geometry_hints', 'sampling_strategy', 'geometry_request', 'point_cloud', 'symmetry', 'skeleton', 'skeleton_data'
+)
+# 不影响基线骨骼的处理选项
+BASELINE_EXCLUDED_OPTIONS = ('use_prompt_guidance', 'prompt_weight') + SKINNING_OPTION_KEYS + LOD_OPTION_KEYS + EXPORT_OPTION_KEYS
+
+# 流水线阶段：(名称, 包含的阶段图阶段, 并发数)
+# 推理阶段只有一个工作协程，独占模型
+PIPELINE_STAGES = (
+    ('io', ('geometry_hints', 'sampling_strategy', 'mesh_hash', 'geometry_request'), 4),
+    ('cpu', ('point_cloud', 'symmetry'), 2),
+    ('inference', ('skeleton',), 1),
+    ('postprocess', ('skeleton_data', 'prompt_influence', 'skeleton_lod'), 2),
+    ('skinning', ('skinning',), 2),
+    ('output', ('export',), 2)
+)
+
+# 阶段之间的队列容量
+PIPELINE_QUEUE_SIZE = 8
+
+# 后台基线作业等待推理阶段空闲的轮询间隔（秒）
+BASELINE_POLL_INTERVAL = 0.1
+
 class ArticulationService:
     """增强版关节生成服务"""
     
@@ -26,6 +80,22 @@ class ArticulationService:
         self.magicarticulate = MagicArticulateWrapper()
         self.text_processor = TextProcessor()
         self.enhanced_sampling = EnhancedSampling()
+        self.prefetcher = GeometryPrefetcher(self.magicarticulate)
+        self.hierarchy_builder = SkeletonHierarchyBuilder()
+        self.lod_builder = SkeletonLODBuilder()
+        self.symmetry_detector = SymmetryDetector()
+        self.joint_refiner = JointRefiner()
+        self.influence_evaluator = PromptInfluenceEvaluator(self.magicarticulate.part_segmenter)
+        self.result_store = ResultStore()
+        # 正在后台计算的未引导基线骨骼；同一时刻最多一个基线作业进入流水线
+        self._baseline_tasks: Dict[Tuple, asyncio.Task] = {}
+        self._baseline_running = False
+        self.stage_graph = self._build_stage_graph()
+        self.pipeline = StagePipeline(
+            [(name, self._pipeline_handler(name, stages), concurrency)
+             for name, stages, concurrency in PIPELINE_STAGES],
+            queue_size=PIPELINE_QUEUE_SIZE
+        )
         self.initialized = False
         
     async def initialize(self):
@@ -47,6 +117,35 @@ class ArticulationService:
         """健康检查"""
         return self.initialized
     
+    async def shutdown(self):
+        """关闭服务"""
+        self.prefetcher.cancel_all()
+        for task in self._baseline_tasks.values():
+            task.cancel()
+        await self.pipeline.stop()
+        await self.result_store.flush()
+        self.magicarticulate.shutdown()
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """获取几何缓存指标"""
+        metrics = self.magicarticulate.get_cache_metrics()
+        metrics['prefetch'] = self.prefetcher.get_metrics()
+        metrics['pipeline'] = self.pipeline.get_metrics()
+        metrics['results'] = self.result_store.get_metrics()
+        return metrics
+    
+    def prefetch_geometry(self, file_path: str):
+        """上传后按默认处理选项在后台预取几何（解析、清理、点云金字塔）"""
+        strategy = self.enhanced_sampling.create_sampling_strategy(
+            None, 0.5, ProcessingOptions().model_dump(mode="json")
+        )
+        self.prefetcher.schedule(file_path, strategy)
+    
+    async def inspect_upload(self, file_path: str) -> Dict[str, Any]:
+        """检查上传文件的规模并给出准入决定（报告按内容哈希缓存，预取和处理时复用）"""
+        mesh_hash = await self._stage_mesh_hash(file_path)
+        return await self.magicarticulate.inspect_mesh_file(file_path, mesh_hash)
+    
     async def process_model_with_prompt(
         self,
         file_path: str,
@@ -72,56 +171,38 @@ class ArticulationService:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Model file not found: {file_path}")
             
-            # 2. 解析文本提示词
-            geometry_hints = None
-            if user_prompt and use_prompt_guidance:
-                geometry_hints = self.text_processor.extract_geometry_hints(user_prompt)
-                logger.info(f"Extracted geometry hints: {geometry_hints}")
-            
-            # 3. 创建自适应采样策略
-            sampling_strategy = self.enhanced_sampling.create_sampling_strategy(
-                geometry_hints, prompt_weight
-            )
-            
-            # 4. 处理点云采样
-            point_cloud_data = await self.magicarticulate.process_mesh_to_pointcloud(
-                file_path, sampling_strategy
-            )
-            
-            # 5. 生成骨骼
-            skeleton_data = await self.magicarticulate.generate_skeleton(
-                point_cloud_data, **kwargs
-            )
-            
-            # 转换为SkeletonData格式
-            skeleton_result = SkeletonData(
-                joints=skeleton_data['joints'],
-                bones=skeleton_data['bones'],
-                joint_names=[f"joint_{i}" for i in range(skeleton_data['joint_count'])],
-                root_index=0
-            )
-            
-            # 6. 后处理优化
-            if geometry_hints:
-                skeleton_result = await self._post_process_with_hints(
-                    skeleton_result, geometry_hints
-                )
-            
-            # 7. 计算提示词影响分数
-            prompt_influence_score = self._calculate_prompt_influence(
-                skeleton_result, geometry_hints
-            ) if geometry_hints else 0.0
+            # 2. 提交到流水线（I/O -> CPU -> 推理 -> 后处理 -> 蒙皮 -> 输出），各阶段只重新执行输入变化的部分
+            #    前台请求期间后台预取让行；该文件的预取若在进行中则等待其写入缓存
+            async with self.prefetcher.foreground(file_path):
+                outputs = await self.pipeline.submit({
+                    'file_path': file_path,
+                    'user_prompt': user_prompt,
+                    'use_prompt_guidance': use_prompt_guidance,
+                    'prompt_weight': prompt_weight,
+                    'options': kwargs,
+                    'inference_options': {key: kwargs[key] for key in INFERENCE_OPTION_KEYS if key in kwargs},
+                    'symmetry_options': {key: kwargs[key] for key in SYMMETRY_OPTION_KEYS if key in kwargs},
+                    'skinning_options': {key: kwargs[key] for key in SKINNING_OPTION_KEYS if key in kwargs},
+                    'lod_options': {key: kwargs[key] for key in LOD_OPTION_KEYS if key in kwargs},
+                    'export_options': {key: kwargs[key] for key in EXPORT_OPTION_KEYS if key in kwargs}
+                })
             
+            skeleton_result = outputs['skeleton_data']
             processing_time = time.time() - start_time
             
             return ProcessingResult(
                 skeleton_data=skeleton_result,
+                skin_weights=outputs['skinning'],
+                skeleton_lods=outputs['skeleton_lod'],
                 joint_count=len(skeleton_result.joints) if skeleton_result else 0,
                 bone_count=len(skeleton_result.bones) if skeleton_result else 0,
                 processing_time=processing_time,
                 user_prompt=user_prompt,
-                prompt_influence_score=prompt_influence_score,
-                result_file_path=self._save_result(skeleton_result, file_path)
+                prompt_influence_score=outputs['prompt_influence'],
+                sampling_info=outputs['point_cloud']['sampling_info'],
+                symmetry_info=outputs['symmetry'],
+                result_file_path=outputs['result_file_path'],
+                artifacts=outputs['artifacts']
             )
             
         except Exception as e:
@@ -132,6 +213,352 @@ class ArticulationService:
                 error_message=str(e)
             )
     
+    def _pipeline_handler(self, name: str, stages: Tuple[str, ...]):
+        """流水线阶段处理函数：执行阶段图中属于该流水线阶段的部分"""
+        async def handler(values: Dict[str, Any]):
+            # 作业可以只经过部分阶段（如后台基线作业）
+            selected = [stage for stage in stages if stage in values.get('stages', stages)]
+            outputs, report = await self.stage_graph.run(values, only=selected)
+            values.update(outputs)
+            values.setdefault('stage_report', {}).update(report)
+            
+            # 输出阶段负责保存结果（文件在后台写入，不阻塞响应）
+            if name == 'output' and values.get('save_result', True):
+                values['artifacts'] = await self._save_result(
+                    values['skeleton_data'], values.get('skinning'), values.get('export')
+                )
+                values['result_file_path'] = (
+                    str(self.result_store.root / values['artifacts']['json']) if values['artifacts'] else ""
+                )
+        
+        return handler
+    
+    def _build_stage_graph(self) -> StageGraph:
+        """
+        构建处理阶段图，每个阶段只依赖显式声明的输入
+        
+        提示词只影响 geometry_hints 之后的阶段；若生成的几何采样请求不变，
+        点云和骨骼推理阶段直接命中缓存
+        """
+        graph = StageGraph(self.magicarticulate.mesh_cache)
+        graph.add_stage('geometry_hints', self._stage_geometry_hints, ['user_prompt', 'use_prompt_guidance'])
+        graph.add_stage(
+            'sampling_strategy', self._stage_sampling_strategy, ['geometry_hints', 'prompt_weight', 'options']
+        )
+        # 文件内容可能变化，哈希每次都重新计算
+        graph.add_stage('mesh_hash', self._stage_mesh_hash, ['file_path'], memoize=False)
+        graph.add_stage('geometry_request', self._stage_geometry_request, ['sampling_strategy'], memoize=False)
+        graph.add_stage(
+            'point_cloud', self._stage_point_cloud, ['file_path', 'mesh_hash', 'geometry_request'],
+            unkeyed_inputs=['file_path']
+        )
+        graph.add_stage('symmetry', self._stage_symmetry, ['point_cloud', 'symmetry_options'])
+        graph.add_stage('skeleton', self._stage_skeleton, ['point_cloud', 'inference_options'])
+        graph.add_stage(
+            'skeleton_data', self._stage_skeleton_data, ['skeleton', 'geometry_hints', 'point_cloud', 'symmetry']
+        )
+        # 依赖后台基线骨骼，基线就绪前结果为空，不做记忆化
+        graph.add_stage(
+            'prompt_influence', self._stage_prompt_influence,
+            ['skeleton_data', 'point_cloud', 'geometry_hints', 'sampling_strategy', 'file_path', 'mesh_hash', 'options'],
+            memoize=False
+        )
+        graph.add_stage('skeleton_lod', self._stage_skeleton_lod, ['skeleton_data', 'lod_options'])
+        graph.add_stage(
+            'skinning', self._stage_skinning,
+            ['file_path', 'mesh_hash', 'skeleton_data', 'point_cloud', 'skinning_options'],
+            unkeyed_inputs=['file_path']
+        )
+        # GLB 不计入缓存容量估算，不做记忆化；同内容的结果文件由结果存储去重
+        graph.add_stage(
+            'export', self._stage_export,
+            ['file_path', 'mesh_hash', 'skeleton_data', 'point_cloud', 'skinning', 'export_options'],
+            memoize=False
+        )
+        return graph
+    
+    async def _stage_geometry_hints(
+        self, 
+        user_prompt: Optional[str], 
+        use_prompt_guidance: bool
+    ) -> Optional[Dict[str, Any]]:
+        """解析文本提示词"""
+        if not (user_prompt and use_prompt_guidance):
+            return None
+        geometry_hints = self.text_processor.extract_geometry_hints(user_prompt)
+        logger.info(f"Extracted geometry hints: {geometry_hints}")
+        return geometry_hints
+    
+    async def _stage_sampling_strategy(
+        self, 
+        geometry_hints: Optional[Dict[str, Any]], 
+        prompt_weight: float,
+        options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """创建自适应采样策略"""
+        return self.enhanced_sampling.create_sampling_strategy(geometry_hints, prompt_weight, options)
+    
+    async def _stage_mesh_hash(self, file_path: str) -> str:
+        """读取文件并计算内容哈希"""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.magicarticulate.mesh_cache.hash_file, file_path
+        )
+    
+    async def _stage_geometry_request(self, sampling_strategy: Dict[str, Any]) -> Dict[str, Any]:
+        """只保留影响点云采样结果的策略字段"""
+        return {key: sampling_strategy[key] for key in GEOMETRY_STRATEGY_KEYS if key in sampling_strategy}
+    
+    async def _stage_point_cloud(
+        self, 
+        file_path: str, 
+        mesh_hash: str,
+        geometry_request: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """点云采样，同时返回实际使用的采样参数和归一化变换（关节映射回网格坐标时使用）"""
+        # 采样过程会在策略中写入自适应点数等审计信息，使用副本避免修改上游输出
+        strategy = copy.deepcopy(geometry_request)
+        point_cloud = await self.magicarticulate.process_mesh_to_pointcloud(file_path, strategy, mesh_hash)
+        return {
+            'point_cloud': point_cloud,
+            'sampling_info': self._sampling_info(strategy),
+            'normalization': strategy.get('normalization'),
+            # 回退采样的结果不被阶段图缓存，下次请求重新采样
+            'is_fallback': strategy.get('is_fallback', False)
+        }
+    
+    async def _stage_symmetry(
+        self,
+        point_cloud: Dict[str, Any],
+        symmetry_options: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """在点云上检测镜像对称平面；关闭对称化或检测失败时返回None"""
+        mode = symmetry_options.get('symmetry_mode', SymmetryMode.AVERAGE.value)
+        if mode == SymmetryMode.OFF.value:
+            return None
+        
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, self.symmetry_detector.detect, point_cloud['point_cloud'][:, :3]
+            )
+            return {**result, 'mode': mode}
+        except Exception as e:
+            logger.error(f"Symmetry detection failed: {str(e)}")
+            return None
+    
+    async def _stage_skeleton(
+        self, 
+        point_cloud: Dict[str, Any], 
+        inference_options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """骨骼生成（模型推理）；模型不可用或推理失败时为带 is_fallback 标记的模拟骨骼，不做缓存"""
+        return await self.magicarticulate.generate_skeleton(point_cloud['point_cloud'], **inference_options)
+    
+    async def _stage_skeleton_data(
+        self, 
+        skeleton: Dict[str, Any], 
+        geometry_hints: Optional[Dict[str, Any]],
+        point_cloud: Dict[str, Any],
+        symmetry: Optional[Dict[str, Any]]
+    ) -> SkeletonData:
+        """对称化解码结果，构建骨骼层次，转换为SkeletonData格式并做中轴吸附和提示词后处理"""
+        loop = asyncio.get_running_loop()
+        joints, bones = skeleton['joints'], skeleton['bones']
+        if symmetry and symmetry['symmetric']:
+            joints, bones = await loop.run_in_executor(None, self._apply_symmetry, joints, bones, symmetry)
+        
+        # 骨骼图 -> 有根树：去环、桥接分量、选根，骨骼按父 -> 子的拓扑顺序排列
+        hierarchy = await loop.run_in_executor(
+            None, self.hierarchy_builder.build, joints, bones, geometry_hints
+        )
+        # 内部构造的数组已是目标类型，跳过校验
+        skeleton_result = SkeletonData.model_construct(
+            joints=np.asarray(joints, dtype=np.float32).reshape(-1, 3),
+            bones=hierarchy['bones'],
+            joint_names=hierarchy['joint_names'],
+            root_index=hierarchy['root_index'],
+            parents=hierarchy['parents']
+        )
+        
+        # 中轴吸附始终进行；脊柱细分和精细吸附强度只在有提示词时启用
+        return await self._post_process_skeleton(skeleton_result, geometry_hints, point_cloud['point_cloud'])
+    
+    def _apply_symmetry(
+        self,
+        joints: np.ndarray,
+        bones: np.ndarray,
+        symmetry: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """按对称模式处理解码出的关节：配对平均，或保留半边并镜像补全"""
+        if symmetry['mode'] == SymmetryMode.MIRROR.value:
+            joints, bones, stats = self.symmetry_detector.mirror_half(joints, bones, symmetry)
+        else:
+            joints, stats = self.symmetry_detector.symmetrize(joints, symmetry)
+        logger.info(f"Applied symmetry ({symmetry['mode']}): {stats}")
+        return joints.astype(np.float32), bones.astype(np.int32)
+    
+    async def _stage_prompt_influence(
+        self, 
+        skeleton_data: SkeletonData, 
+        point_cloud: Dict[str, Any],
+        geometry_hints: Optional[Dict[str, Any]],
+        sampling_strategy: Dict[str, Any],
+        file_path: str,
+        mesh_hash: str,
+        options: Dict[str, Any]
+    ) -> Optional[float]:
+        """
+        计算提示词影响分数
+        
+        需要同一网格的未引导骨骼作为基线；基线未就绪时返回None，并在推理阶段空闲后于后台计算，
+        不增加请求延迟、不与前台请求争用推理，之后的请求直接使用按网格哈希缓存的基线
+        """
+        if not geometry_hints:
+            return 0.0
+        
+        baseline = self._baseline_skeleton(file_path, mesh_hash, options)
+        if baseline is None:
+            return None
+        baseline_skeleton, baseline_normalization = baseline
+        return await self._calculate_prompt_influence(
+            skeleton_data, point_cloud.get('normalization'), baseline_skeleton, baseline_normalization,
+            sampling_strategy, file_path, mesh_hash
+        )
+    
+    def _baseline_skeleton(
+        self, 
+        file_path: str, 
+        mesh_hash: str, 
+        options: Dict[str, Any]
+    ) -> Optional[Tuple[SkeletonData, Optional[Tuple[np.ndarray, float]]]]:
+        """读取缓存的未引导基线骨骼及其点云归一化变换，不存在时安排后台计算"""
+        baseline_options = {key: value for key, value in options.items() if key not in BASELINE_EXCLUDED_OPTIONS}
+        cache_key = ('baseline', mesh_hash, value_digest(baseline_options))
+        baseline = self.magicarticulate.mesh_cache.get(cache_key)
+        if baseline is None and cache_key not in self._baseline_tasks:
+            self._baseline_tasks[cache_key] = asyncio.create_task(
+                self._compute_baseline(cache_key, file_path, mesh_hash, options)
+            )
+        return baseline
+    
+    async def _compute_baseline(
+        self, 
+        cache_key: Tuple, 
+        file_path: str, 
+        mesh_hash: str, 
+        options: Dict[str, Any]
+    ):
+        """
+        通过流水线计算未引导骨骼（推理仍由流水线的推理阶段独占执行）
+        
+        等到推理阶段及其上游没有作业、且没有其他基线作业时才提交，基线只占用空闲的推理时间
+        """
+        try:
+            while self._baseline_running or not self.pipeline.is_idle('inference'):
+                await asyncio.sleep(BASELINE_POLL_INTERVAL)
+            
+            self._baseline_running = True
+            try:
+                outputs = await self.pipeline.submit({
+                    'file_path': file_path,
+                    'mesh_hash': mesh_hash,
+                    'user_prompt': None,
+                    'use_prompt_guidance': False,
+                    'prompt_weight': options.get('prompt_weight', 0.5),
+                    'options': {**options, 'use_prompt_guidance': False},
+                    'inference_options': {key: options[key] for key in INFERENCE_OPTION_KEYS if key in options},
+                    'symmetry_options': {key: options[key] for key in SYMMETRY_OPTION_KEYS if key in options},
+                    'stages': BASELINE_STAGES,
+                    'save_result': False
+                })
+            finally:
+                self._baseline_running = False
+            
+            # 基线点云的归一化变换与引导请求的不同，与骨骼一并缓存
+            self.magicarticulate.mesh_cache.put(
+                cache_key, (outputs['skeleton_data'], outputs['point_cloud'].get('normalization'))
+            )
+            logger.info(f"Baseline skeleton ready for {file_path}")
+        except Exception as e:
+            logger.warning(f"Baseline skeleton failed for {file_path}: {str(e)}")
+        finally:
+            self._baseline_tasks.pop(cache_key, None)
+    
+    async def _stage_skeleton_lod(
+        self,
+        skeleton_data: SkeletonData,
+        lod_options: Dict[str, Any]
+    ) -> Optional[List[SkeletonLOD]]:
+        """按需生成预览用的骨骼LOD；失败时不影响骨骼结果"""
+        levels = lod_options.get('skeleton_lod_levels', 0)
+        if not levels or skeleton_data is None or skeleton_data.parents is None:
+            return None
+        
+        try:
+            lods = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.lod_builder.build,
+                skeleton_data.joints,
+                skeleton_data.parents,
+                levels,
+                skeleton_data.joint_names
+            )
+            return [SkeletonLOD.model_construct(**lod) for lod in lods]
+        except Exception as e:
+            logger.error(f"Skeleton LOD failed: {str(e)}")
+            return None
+    
+    async def _stage_skinning(
+        self,
+        file_path: str,
+        mesh_hash: str,
+        skeleton_data: SkeletonData,
+        point_cloud: Dict[str, Any],
+        skinning_options: Dict[str, Any]
+    ) -> Optional[SkinWeights]:
+        """按需计算蒙皮权重；失败时不影响骨骼结果"""
+        if not skinning_options.get('compute_skinning', False):
+            return None
+        
+        try:
+            result = await self.magicarticulate.compute_skin_weights(
+                file_path,
+                mesh_hash,
+                skeleton_data.joints,
+                skeleton_data.bones,
+                top_k=skinning_options.get('skinning_top_k', 4),
+                normalization=point_cloud.get('normalization')
+            )
+            return SkinWeights.model_construct(
+                indices=result['indices'],
+                weights=result['weights'],
+                top_k=result['top_k'],
+                vertex_count=result['vertex_count']
+            )
+        except Exception as e:
+            logger.error(f"Skinning failed: {str(e)}")
+            return None
+
+    async def _stage_export(
+        self,
+        file_path: str,
+        mesh_hash: str,
+        skeleton_data: SkeletonData,
+        point_cloud: Dict[str, Any],
+        skinning: Optional[SkinWeights],
+        export_options: Dict[str, Any]
+    ) -> Optional[bytes]:
+        """按需导出 GLB（网格 + 骨骼层级 + 蒙皮权重）；失败时不影响骨骼结果"""
+        if export_options.get('output_format') != OutputFormat.GLB.value:
+            return None
+
+        try:
+            return await self.magicarticulate.export_glb(
+                file_path, mesh_hash, skeleton_data, skinning, point_cloud.get('normalization')
+            )
+        except Exception as e:
+            logger.error(f"GLB export failed: {str(e)}")
+            return None
+
     async def _process_point_cloud(
         self, 
         file_path: str, 
@@ -182,61 +609,103 @@ class ArticulationService:
             logger.error(f"Skeleton generation failed: {str(e)}")
             raise
     
-    async def _post_process_with_hints(
+    async def _post_process_skeleton(
         self, 
         skeleton_data: SkeletonData, 
-        geometry_hints: Dict[str, Any]
+        geometry_hints: Optional[Dict[str, Any]],
+        point_cloud_data: np.ndarray
     ) -> SkeletonData:
-        """基于几何提示后处理骨骼"""
+        """后处理骨骼：关节吸附到中轴，有几何提示时再按提示词调整结构"""
         try:
-            # 这里实现基于提示词的骨骼优化
-            # 例如：调整关节位置、优化层次结构等
-            
             logger.info(f"Post-processing with hints: {geometry_hints}")
             
-            # 目前直接返回原数据
-            return skeleton_data
+            refined = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.joint_refiner.refine,
+                skeleton_data.joints,
+                skeleton_data.bones,
+                skeleton_data.parents,
+                skeleton_data.joint_names,
+                skeleton_data.root_index,
+                point_cloud_data,
+                geometry_hints
+            )
+            return SkeletonData.model_construct(
+                joints=refined['joints'].astype(np.float32),
+                bones=refined['bones'].astype(np.int32),
+                joint_names=refined['joint_names'],
+                root_index=skeleton_data.root_index,
+                parents=refined['parents'].astype(np.int32)
+            )
             
         except Exception as e:
             logger.error(f"Post-processing failed: {str(e)}")
             return skeleton_data
     
-    def _calculate_prompt_influence(
+    async def _calculate_prompt_influence(
         self, 
         skeleton_data: SkeletonData, 
-        geometry_hints: Dict[str, Any]
+        normalization: Optional[Tuple[np.ndarray, float]],
+        baseline: SkeletonData,
+        baseline_normalization: Optional[Tuple[np.ndarray, float]],
+        sampling_strategy: Dict[str, Any],
+        file_path: str,
+        mesh_hash: str
     ) -> float:
-        """计算提示词对结果的影响程度"""
+        """
+        计算提示词对结果的影响程度：请求加密的部位上关节份额的实际增量 / 预期增量
+        
+        两组关节各自按其输入点云的归一化变换映射回网格坐标后再归属部位
+        """
         try:
-            # 这里实现提示词影响度评估算法
-            # 例如：比较生成的骨骼与提示词的匹配度
+            region_weights = sampling_strategy.get('region_weights') or {}
+            if not region_weights:
+                return 0.0
+            
+            context, face_labels = await self.magicarticulate.get_part_regions(file_path, mesh_hash)
+            if face_labels is None:
+                return 0.0
             
-            # 目前返回随机值
-            return np.random.uniform(0.6, 0.9)
+            details = self.influence_evaluator.evaluate(
+                context.denormalize(np.asarray(skeleton_data.joints, dtype=np.float64), normalization),
+                context.denormalize(np.asarray(baseline.joints, dtype=np.float64), baseline_normalization),
+                context.face_center_tree,
+                face_labels,
+                context.face_areas,
+                region_weights
+            )
+            return details['score']
             
         except Exception as e:
             logger.error(f"Influence calculation failed: {str(e)}")
             return 0.0
     
-    def _save_result(
+    def _sampling_info(self, sampling_strategy: Dict[str, Any]) -> Dict[str, Any]:
+        """汇总实际使用的采样参数，用于结果审计"""
+        info = {
+            'sampling_count': sampling_strategy.get('sampling_count'),
+            'sampling_mode': sampling_strategy.get('sampling_mode', 'uniform')
+        }
+        if 'adaptive_budget_info' in sampling_strategy:
+            info['adaptive_budget'] = sampling_strategy['adaptive_budget_info']
+        if 'cleanup_report' in sampling_strategy:
+            info['cleanup'] = sampling_strategy['cleanup_report']
+        if 'part_summary' in sampling_strategy:
+            info['part_summary'] = sampling_strategy['part_summary']
+        if sampling_strategy.get('is_fallback'):
+            info['is_fallback'] = True
+        return info
+    
+    async def _save_result(
         self, 
         skeleton_data: SkeletonData, 
-        original_file_path: str
-    ) -> str:
-        """保存处理结果"""
+        skin_weights: Optional[SkinWeights],
+        glb: Optional[bytes] = None
+    ) -> Dict[str, str]:
+        """保存处理结果，返回 {类型: 文件名}"""
         try:
-            # 生成结果文件路径
-            original_name = Path(original_file_path).stem
-            result_dir = Path("/app/results")
-            result_dir.mkdir(exist_ok=True)
-            
-            result_file = result_dir / f"{original_name}_result.json"
-            
-            # 这里会保存实际的结果文件
-            logger.info(f"Result saved to: {result_file}")
-            
-            return str(result_file)
+            return await self.result_store.save(skeleton_data, skin_weights, glb)
             
         except Exception as e:
             logger.error(f"Failed to save result: {str(e)}")
-            return ""
\ No newline at end of file
+            return {}
\ No newline at end of file
@@ -4,23 +4,38 @@
 """
 
 import numpy as np
+import trimesh
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+from scipy.spatial import cKDTree
+
+from services.point_pyramid import PYRAMID_LEVELS, PYRAMID_MAX_POINTS
+from services.mesh_context import MeshContext
 
 logger = logging.getLogger(__name__)
 
+# 自适应点数的覆盖半径（相对包围盒对角线）：参考表面点到点云的距离不超过该半径即视为被覆盖。
+# 在 benchmarks/benchmark_sampling.py 的测试人形、icosphere(4) 和单位立方体上标定，
+# 达到 0.9 覆盖率分别需要 2048 / 4096 / 8192 点；相对包围盒尺寸的表面积越大，所需点数越多
+ADAPTIVE_COVERAGE_RADIUS = 0.015
+
+# 覆盖率评估的探测点种子（与参考点的种子不同）
+ADAPTIVE_PROBE_SEED = 1
+
 class EnhancedSampling:
     """增强采样策略生成器"""
     
-    def __init__(self):
+    def __init__(self, coverage_radius: float = ADAPTIVE_COVERAGE_RADIUS):
         self.default_sampling_count = 8192
+        self.coverage_radius = coverage_radius
         self.region_weights = self._initialize_region_weights()
     
     def create_sampling_strategy(
         self, 
         geometry_hints: Optional[Dict[str, Any]], 
-        prompt_weight: float = 0.5
+        prompt_weight: float = 0.5,
+        processing_options: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         基于几何提示创建采样策略
@@ -28,12 +43,21 @@ class EnhancedSampling:
         Args:
             geometry_hints: 从文本提取的几何约束
             prompt_weight: 提示词影响权重
+            processing_options: 请求中的处理选项（点数、采样模式等）
         
         Returns:
             采样策略字典
         """
+        options = processing_options or {}
         strategy = {
-            'sampling_count': self.default_sampling_count,
+            'sampling_count': options.get('input_pc_num', self.default_sampling_count),
+            'sampling_mode': options.get('sampling_mode', 'uniform'),
+            'apply_marching_cubes': options.get('apply_marching_cubes', False),
+            'octree_depth': options.get('octree_depth', 7),
+            'adaptive_budget': options.get('adaptive_budget', False),
+            'min_pc_num': options.get('min_pc_num', PYRAMID_LEVELS[0]),
+            'max_pc_num': options.get('max_pc_num', self.default_sampling_count),
+            'adaptive_target_quality': options.get('adaptive_target_quality', 0.9),
             'region_weights': {},
             'emphasis_areas': [],
             'adaptive_density': False,
@@ -74,6 +98,73 @@ class EnhancedSampling:
             logger.error(f"Failed to create sampling strategy: {str(e)}")
             return strategy
     
+    def measure_level_coverage(
+        self, 
+        mesh: trimesh.Trimesh, 
+        context: Optional[MeshContext] = None
+    ) -> Dict[str, Any]:
+        """
+        测量每个金字塔层级的表面覆盖率
+        
+        按固定种子均匀采样 PYRAMID_MAX_POINTS 个点，随机顺序的前缀即各层级的均匀点云；
+        覆盖率为上下文参考表面点中，到该层级点云距离不超过覆盖半径的比例。
+        FPS 点云的覆盖不低于同点数的均匀点云，按均匀层级测量是保守估计
+        
+        Returns:
+            {'levels': 层级点数, 'coverage': 各层级覆盖率, 'coverage_radius': 覆盖半径（相对对角线）}
+        """
+        context = context or MeshContext(mesh, None)
+        reference, _ = context.surface_samples()
+        radius = self.coverage_radius * float(np.linalg.norm(mesh.extents))
+        points, _ = trimesh.sample.sample_surface(mesh, PYRAMID_MAX_POINTS, seed=ADAPTIVE_PROBE_SEED)
+        
+        coverage = []
+        for level in PYRAMID_LEVELS:
+            distance, _ = cKDTree(points[:level]).query(reference, distance_upper_bound=radius)
+            coverage.append(float(np.mean(distance <= radius)))
+        
+        return {
+            'levels': list(PYRAMID_LEVELS),
+            'coverage': coverage,
+            'coverage_radius': self.coverage_radius
+        }
+    
+    def select_adaptive_budget(
+        self, 
+        level_coverage: Dict[str, Any], 
+        strategy: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        选择覆盖率达到目标质量的最小金字塔层级
+        
+        在配置范围内的层级中按实测覆盖率（measure_level_coverage）选择；
+        都达不到目标时取范围内最大的层级。范围内没有金字塔层级时取上限点数，此时没有实测覆盖率
+        
+        Returns:
+            选择结果（包含各层级覆盖率，用于审计）
+        """
+        min_points = strategy.get('min_pc_num', PYRAMID_LEVELS[0])
+        max_points = strategy.get('max_pc_num', self.default_sampling_count)
+        target_quality = min(max(strategy.get('adaptive_target_quality', 0.9), 0.5), 0.99)
+        
+        measured = dict(zip(level_coverage['levels'], level_coverage['coverage']))
+        candidates = [level for level in measured if min_points <= level <= max_points]
+        if candidates:
+            selected = next((level for level in candidates if measured[level] >= target_quality), candidates[-1])
+            coverage = measured[selected]
+        else:
+            selected, coverage = max_points, None
+        
+        return {
+            'mode': 'adaptive',
+            'selected_point_count': int(selected),
+            'measured_coverage': coverage,
+            'target_met': coverage is not None and coverage >= target_quality,
+            'target_quality': target_quality,
+            'bounds': [min_points, max_points],
+            'level_coverage': level_coverage
+        }
+    
     def apply_adaptive_sampling(
         self, 
         mesh_data: np.ndarray, 
@@ -0,0 +1,166 @@
+"""
+文件响应模块
+支持 ETag 条件请求和单区间 Range 请求的文件响应；服务器提供 ASGI zero-copy 扩展时
+以 http.response.zerocopysend 交给服务器做 sendfile，否则在线程池中分块读取发送
+"""
+
+import os
+import re
+import logging
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# 分块发送的块大小
+CHUNK_SIZE = 256 * 1024
+
+# 内容哈希命名的文件内容不会变化，允许客户端长期缓存
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """
+    Accept-Encoding 是否接受指定的内容编码
+
+    编码名不区分大小写；显式列出的编码以其 q 值为准（q=0 表示拒绝），
+    未列出时按通配 * 的 q 值，两者都没有时视为不接受
+    """
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        parts = [part.strip() for part in item.split(';')]
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for parameter in parts[1:]:
+            name, _, value = parameter.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[parts[0].lower()] = quality
+
+    quality = qualities.get(encoding.lower(), qualities.get('*', 0.0))
+    return quality > 0
+
+
+class RangeFileResponse(Response):
+    """带 ETag / Range 支持的文件响应"""
+
+    def __init__(
+        self,
+        path: Path,
+        request_headers: Mapping[str, str],
+        etag: str,
+        media_type: str,
+        content_encoding: Optional[str] = None
+    ):
+        self.path = Path(path)
+        self.media_type = media_type
+        self.background = None
+        file_size = os.stat(self.path).st_size
+
+        headers = {
+            'etag': etag,
+            'accept-ranges': 'bytes',
+            'cache-control': IMMUTABLE_CACHE_CONTROL,
+            'vary': 'Accept-Encoding'
+        }
+        if content_encoding:
+            headers['content-encoding'] = content_encoding
+
+        # 1. 条件请求：ETag 匹配时只返回 304
+        self.offset, self.count = 0, file_size
+        if self._etag_matches(request_headers.get('if-none-match'), etag):
+            self.status_code = 304
+            self.count = 0
+        else:
+            # 2. 单区间 Range 请求；多区间或格式不支持的 Range、If-Range 与当前 ETag 不一致时返回完整内容
+            match = RANGE_PATTERN.match(request_headers.get('range', '').strip())
+            if_range = request_headers.get('if-range')
+            if match and (if_range is None or if_range == etag):
+                parsed = self._parse_range(match, file_size)
+                if parsed is None:
+                    self.status_code = 416
+                    self.count = 0
+                    headers['content-range'] = f"bytes */{file_size}"
+                else:
+                    self.status_code = 206
+                    self.offset, end = parsed
+                    self.count = end - self.offset + 1
+                    headers['content-range'] = f"bytes {self.offset}-{end}/{file_size}"
+            else:
+                self.status_code = 200
+
+        if self.status_code != 304:
+            headers['content-length'] = str(self.count)
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            'type': 'http.response.start',
+            'status': self.status_code,
+            'headers': self.raw_headers
+        })
+
+        if self.count == 0 or scope.get('method') == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        if 'http.response.zerocopysend' in scope.get('extensions', {}):
+            # 服务器直接从文件描述符发送（sendfile），数据不经过用户态
+            with open(self.path, 'rb') as f:
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': f,
+                    'offset': self.offset,
+                    'count': self.count,
+                    'more_body': False
+                })
+            return
+
+        async with await anyio.open_file(self.path, 'rb') as f:
+            await f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+            if remaining > 0:
+                # 文件在发送过程中被截断
+                logger.error(f"File truncated while sending: {self.path}")
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        candidates = [value.strip() for value in if_none_match.split(',')]
+        # 弱比较：忽略 W/ 前缀
+        return '*' in candidates or etag in [value[2:] if value.startswith('W/') else value for value in candidates]
+
+    @staticmethod
+    def _parse_range(match: re.Match, file_size: int) -> Optional[Tuple[int, int]]:
+        """把 Range 转为闭区间 (start, end)；不可满足时返回None"""
+        if file_size == 0:
+            return None
+        start, end = match.groups()
+        if not start:
+            # 后缀区间：最后 N 个字节
+            if not end or int(end) == 0:
+                return None
+            return max(file_size - int(end), 0), file_size - 1
+        start = int(start)
+        end = min(int(end), file_size - 1) if end else file_size - 1
+        if start >= file_size or end < start:
+            return None
+        return start, end
@@ -0,0 +1,267 @@
+"""
+glTF 导出模块
+把清理后的网格、骨骼节点层级（含逆绑定矩阵）和蒙皮权重写成单个二进制 glTF（GLB），
+所有缓冲区直接由 numpy 数组构建，不逐顶点处理
+"""
+
+import json
+import struct
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import trimesh
+
+from models.requests import SkinWeights
+
+logger = logging.getLogger(__name__)
+
+MEDIA_GLB = 'model/gltf-binary'
+
+# GLB 文件头与块类型
+GLB_MAGIC = 0x46546C67
+GLB_VERSION = 2
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+# 访问器分量类型
+COMPONENT_TYPES = {
+    np.dtype(np.uint8): 5121,
+    np.dtype(np.uint16): 5123,
+    np.dtype(np.uint32): 5125,
+    np.dtype(np.float32): 5126
+}
+# 访问器元素类型 -> 分量数
+ACCESSOR_WIDTHS = {1: 'SCALAR', 3: 'VEC3', 4: 'VEC4', 16: 'MAT4'}
+
+# bufferView 目标
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+# glTF 每组 JOINTS_n / WEIGHTS_n 的影响数
+INFLUENCES_PER_SET = 4
+
+
+class _BinaryBuffer:
+    """按 4 字节对齐拼接数组，同时生成 bufferView 和 accessor"""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.buffer_views: List[Dict[str, Any]] = []
+        self.accessors: List[Dict[str, Any]] = []
+        self.length = 0
+
+    def add(self, array: np.ndarray, target: Optional[int] = None, bounds: bool = False) -> int:
+        """添加一个数组，返回其访问器序号"""
+        array = np.ascontiguousarray(array)
+        padding = -self.length % 4
+        if padding:
+            self.chunks.append(bytes(padding))
+            self.length += padding
+
+        view = {'buffer': 0, 'byteOffset': self.length, 'byteLength': int(array.nbytes)}
+        if target is not None:
+            view['target'] = target
+        self.buffer_views.append(view)
+        # 直接引用数组内存，最终拼接时才复制一次
+        self.chunks.append(memoryview(array).cast('B'))
+        self.length += array.nbytes
+
+        width = 1 if array.ndim == 1 else array.shape[1]
+        accessor = {
+            'bufferView': len(self.buffer_views) - 1,
+            'componentType': COMPONENT_TYPES[array.dtype],
+            'count': int(array.shape[0]),
+            'type': ACCESSOR_WIDTHS[width]
+        }
+        if bounds:
+            accessor['min'] = array.min(axis=0).tolist()
+            accessor['max'] = array.max(axis=0).tolist()
+        self.accessors.append(accessor)
+        return len(self.accessors) - 1
+
+
+class GLBExporter:
+    """绑定好骨骼的 GLB 导出"""
+
+    def __init__(self, generator: str = "ArticulateHub AI Service"):
+        self.generator = generator
+
+    def export(
+        self,
+        mesh: trimesh.Trimesh,
+        joints: np.ndarray,
+        bones: np.ndarray,
+        parents: Optional[np.ndarray] = None,
+        joint_names: Optional[List[str]] = None,
+        skin_weights: Optional[SkinWeights] = None
+    ) -> bytes:
+        """
+        导出 GLB
+
+        Args:
+            mesh: 清理后的网格（顶点顺序与蒙皮权重一致）
+            joints: 网格坐标系下的关节 (J, 3)
+            bones: 骨骼 (B, 2)，父 -> 子
+            parents: 父关节索引（根为 -1），为空时由骨骼推出
+            joint_names: 关节名称
+            skin_weights: 每顶点 top-k 骨骼权重，为空时只导出骨骼层级
+
+        Returns:
+            GLB 字节
+        """
+        joints = np.asarray(joints, dtype=np.float32).reshape(-1, 3)
+        bones = np.asarray(bones, dtype=np.int64).reshape(-1, 2)
+        joint_count = len(joints)
+        if parents is None:
+            parents = np.full(joint_count, -1, dtype=np.int64)
+            parents[bones[:, 1]] = bones[:, 0]
+        parents = np.asarray(parents, dtype=np.int64)
+        names = list(joint_names or [])
+        names += [f"joint_{i}" for i in range(len(names), joint_count)]
+
+        buffer = _BinaryBuffer()
+
+        # 1. 网格：位置、法向、索引
+        vertices = np.asarray(mesh.vertices, dtype=np.float32)
+        faces = np.asarray(mesh.faces)
+        index_dtype = np.uint16 if len(vertices) < 65535 else np.uint32
+        attributes = {
+            'POSITION': buffer.add(vertices, ARRAY_BUFFER, bounds=True),
+            'NORMAL': buffer.add(np.asarray(mesh.vertex_normals, dtype=np.float32), ARRAY_BUFFER)
+        }
+        indices = buffer.add(faces.astype(index_dtype).reshape(-1), ELEMENT_ARRAY_BUFFER)
+
+        # 2. 蒙皮属性：骨骼序号映射为其父端关节（骨骼绕父端关节旋转）
+        skinned = skin_weights is not None and skin_weights.vertex_count == len(vertices)
+        if skin_weights is not None and not skinned:
+            logger.warning(
+                f"Skin weights cover {skin_weights.vertex_count} vertices, mesh has {len(vertices)}; exporting without skin"
+            )
+        if skinned and joint_count:
+            attributes.update(self._skin_attributes(buffer, skin_weights, bones[:, 0], joint_count))
+
+        # 3. 骨骼节点：节点 0 为网格，关节 j 对应节点 j + 1，平移为相对父关节的偏移
+        local = joints - np.where(parents[:, None] >= 0, joints[np.maximum(parents, 0)], 0.0)
+        child_order = np.argsort(parents, kind='stable')
+        child_parents = parents[child_order]
+        starts = np.searchsorted(child_parents, np.arange(joint_count))
+        ends = np.searchsorted(child_parents, np.arange(joint_count), side='right')
+        joint_nodes = []
+        for j in range(joint_count):
+            node = {'name': names[j], 'translation': local[j].tolist()}
+            if ends[j] > starts[j]:
+                node['children'] = (child_order[starts[j]:ends[j]] + 1).tolist()
+            joint_nodes.append(node)
+        roots = (np.flatnonzero(parents < 0) + 1).tolist()
+
+        # 4. 逆绑定矩阵：绑定姿态下关节无旋转，世界矩阵为平移，逆矩阵为反向平移（列主序）
+        if joint_count:
+            inverse_bind = np.tile(np.eye(4, dtype=np.float32), (joint_count, 1, 1))
+            inverse_bind[:, :3, 3] = -joints
+            inverse_bind_accessor = buffer.add(inverse_bind.transpose(0, 2, 1).reshape(-1, 16))
+
+        mesh_node = {'name': 'mesh', 'mesh': 0}
+        if skinned and joint_count:
+            mesh_node['skin'] = 0
+
+        document = {
+            'asset': {'version': '2.0', 'generator': self.generator},
+            'scene': 0,
+            'scenes': [{'nodes': [0] + roots}],
+            'nodes': [mesh_node] + joint_nodes,
+            'meshes': [{'primitives': [{'attributes': attributes, 'indices': indices, 'mode': 4}]}],
+            'buffers': [{'byteLength': buffer.length}],
+            'bufferViews': buffer.buffer_views,
+            'accessors': buffer.accessors
+        }
+        if joint_count:
+            document['skins'] = [{
+                'joints': list(range(1, joint_count + 1)),
+                'inverseBindMatrices': inverse_bind_accessor,
+                'skeleton': roots[0] if roots else 1
+            }]
+
+        glb = self._pack(document, buffer)
+        logger.info(
+            f"GLB export: {len(vertices)} vertices, {joint_count} joints, "
+            f"skinned={bool(skinned and joint_count)}, {len(glb)} bytes"
+        )
+        return glb
+
+    def _skin_attributes(
+        self,
+        buffer: _BinaryBuffer,
+        skin_weights: SkinWeights,
+        bone_heads: np.ndarray,
+        joint_count: int
+    ) -> Dict[str, int]:
+        """JOINTS_n / WEIGHTS_n 属性，每组 4 个影响，不足时补零"""
+        bone_indices = np.asarray(skin_weights.indices, dtype=np.int64)
+        weights = np.asarray(skin_weights.weights, dtype=np.float32)
+        joint_indices = np.where(weights > 0, bone_heads[np.maximum(bone_indices, 0)], 0)
+        # 共用父端关节的骨骼会映射到同一关节，glTF 不允许同一顶点重复引用非零权重的关节
+        joint_indices, weights = self._merge_duplicate_joints(joint_indices, weights)
+
+        vertex_count, top_k = weights.shape
+        set_count = -(-top_k // INFLUENCES_PER_SET)
+        width = set_count * INFLUENCES_PER_SET
+        joint_dtype = np.uint8 if joint_count <= 256 else np.uint16
+        padded_joints = np.zeros((vertex_count, width), dtype=joint_dtype)
+        padded_joints[:, :top_k] = joint_indices
+        padded_weights = np.zeros((vertex_count, width), dtype=np.float32)
+        padded_weights[:, :top_k] = weights
+        # 权重和须为1（全零的顶点绑定到根关节）
+        totals = padded_weights.sum(axis=1, keepdims=True)
+        padded_weights = np.divide(padded_weights, totals, out=np.zeros_like(padded_weights), where=totals > 0)
+        padded_weights[totals[:, 0] <= 0, 0] = 1.0
+
+        attributes = {}
+        for n in range(set_count):
+            columns = slice(n * INFLUENCES_PER_SET, (n + 1) * INFLUENCES_PER_SET)
+            attributes[f'JOINTS_{n}'] = buffer.add(padded_joints[:, columns], ARRAY_BUFFER)
+            attributes[f'WEIGHTS_{n}'] = buffer.add(padded_weights[:, columns], ARRAY_BUFFER)
+        return attributes
+
+    def _merge_duplicate_joints(self, joint_indices: np.ndarray, weights: np.ndarray):
+        """同一顶点上相同关节的权重求和合并，再按权重降序重排（空槽位为关节 0、权重 0）"""
+        rows = np.arange(len(weights))[:, None]
+        order = np.argsort(joint_indices, axis=1, kind='stable')
+        joint_indices = joint_indices[rows, order]
+        weights = weights[rows, order]
+
+        # 1. 每行按关节排序后，相同关节连续出现；每段的起点对应合并后的一个槽位
+        starts = np.ones(joint_indices.shape, dtype=bool)
+        starts[:, 1:] = joint_indices[:, 1:] != joint_indices[:, :-1]
+        slots = np.cumsum(starts, axis=1) - 1
+
+        # 2. 每行首列都是段起点，展平后按段求和不会跨行
+        sums = np.add.reduceat(weights.ravel(), np.flatnonzero(starts))
+        start_rows = np.nonzero(starts)[0]
+        merged_weights = np.zeros_like(weights)
+        merged_joints = np.zeros_like(joint_indices)
+        merged_weights[start_rows, slots[starts]] = sums
+        merged_joints[start_rows, slots[starts]] = joint_indices[starts]
+
+        # 3. 按权重降序重排，零权重槽位统一指向关节 0
+        order = np.argsort(-merged_weights, axis=1, kind='stable')
+        merged_weights = merged_weights[rows, order]
+        merged_joints = np.where(merged_weights > 0, merged_joints[rows, order], 0)
+        return merged_joints, merged_weights
+
+    def _pack(self, document: Dict[str, Any], buffer: _BinaryBuffer) -> bytes:
+        """GLB 容器：12 字节文件头 + JSON 块（空格补齐）+ BIN 块（零补齐）"""
+        json_chunk = json.dumps(document, separators=(',', ':')).encode()
+        json_chunk += b' ' * (-len(json_chunk) % 4)
+        bin_padding = bytes(-buffer.length % 4)
+        bin_length = buffer.length + len(bin_padding)
+        total_length = 12 + 8 + len(json_chunk) + 8 + bin_length
+
+        return b''.join([
+            struct.pack('<III', GLB_MAGIC, GLB_VERSION, total_length),
+            struct.pack('<II', len(json_chunk), CHUNK_JSON),
+            json_chunk,
+            struct.pack('<II', bin_length, CHUNK_BIN),
+            *buffer.chunks,
+            bin_padding
+        ])
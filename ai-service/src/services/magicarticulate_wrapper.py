@@ -5,12 +5,30 @@ MagicArticulate包装器
 
 import os
 import sys
+import time
+import asyncio
+import multiprocessing
 import torch
 import trimesh
 import numpy as np
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Tuple, List, AsyncIterator
+
+from services.point_sampling import PointSampler, normalize_point_cloud, point_cloud_normalization, mesh_file_to_point_cloud
+from services.mesh_cache import MeshCache
+from services.sparse_voxel import SparseVoxelRemesher
+from services.streaming_sampler import StreamingMeshSampler
+from services.point_pyramid import PointCloudPyramid, PYRAMID_MAX_POINTS, NESTED_SAMPLING_MODES, pyramid_level
+from services.enhanced_sampling import EnhancedSampling
+from services.part_segmentation import PartSegmenter
+from services.mesh_context import MeshContext, MeshContextStore
+from services.mesh_inspector import MeshInspector, AdmissionController
+from services.mesh_cleanup import MeshCleaner
+from services.skeleton_decoding import SkeletonDecoder
+from services.skinning import HeatDiffusionSkinner
+from services.gltf_export import GLBExporter
 
 # 添加MagicArticulate路径
 MAGICARTICULATE_PATH = "/app/magicarticulate"
@@ -22,11 +40,25 @@ logger = logging.getLogger(__name__)
 class MagicArticulateWrapper:
     """MagicArticulate模型包装器"""
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, process_workers: Optional[int] = None):
         self.model = None
         self.model_path = model_path
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.initialized = False
+        self.point_sampler = PointSampler()
+        self.mesh_cache = MeshCache()
+        self.mesh_contexts = MeshContextStore()
+        self.mesh_inspector = MeshInspector()
+        self.mesh_cleaner = MeshCleaner()
+        self.admission = AdmissionController()
+        self.remesher = SparseVoxelRemesher()
+        self.streaming_sampler = StreamingMeshSampler()
+        self.enhanced_sampling = EnhancedSampling()
+        self.part_segmenter = PartSegmenter()
+        self.glb_exporter = GLBExporter()
+        # 全局共享一个网格处理进程池，进程数在启动时确定（默认CPU核数），按需创建
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self._process_pool: Optional[ProcessPoolExecutor] = None
         
         # 默认参数
         self.default_args = {
@@ -41,6 +73,10 @@ class MagicArticulateWrapper:
             'octree_depth': 7,
             'hier_order': False
         }
+        self.skeleton_decoder = SkeletonDecoder(
+            n_discrete_size=self.default_args['n_discrete_size'],
+            pad_id=self.default_args['pad_id']
+        )
     
     async def initialize(self) -> bool:
         """初始化MagicArticulate模型"""
@@ -142,18 +178,19 @@ class MagicArticulateWrapper:
             with self.accelerator.autocast():
                 pred_bone_coords = self.model.generate(batch_data)
             
-            # 处理输出
-            skeleton_coords = pred_bone_coords[0].cpu().numpy().squeeze()
-            
-            # 转换为关节和骨骼格式
-            joints, bones = self._process_skeleton_output(skeleton_coords)
+            # 处理输出：整个批次一次解码为关节和骨骼
+            bone_coords = pred_bone_coords.float().cpu().numpy()
+            skeleton_coords = bone_coords[0].squeeze()
+            joints, bones = self.skeleton_decoder.decode_batch(bone_coords)[0]
+            if len(bones) == 0:
+                raise ValueError("Model output contains no valid bones")
             
             return {
-                'joints': joints.tolist(),
-                'bones': bones.tolist(),
+                'joints': joints.astype(np.float32),
+                'bones': bones.astype(np.int32),
                 'joint_count': len(joints),
                 'bone_count': len(bones),
-                'raw_output': skeleton_coords.tolist()
+                'raw_output': skeleton_coords
             }
             
         except Exception as e:
@@ -164,7 +201,8 @@ class MagicArticulateWrapper:
     async def process_mesh_to_pointcloud(
         self, 
         mesh_file_path: str,
-        sampling_strategy: Optional[Dict[str, Any]] = None
+        sampling_strategy: Optional[Dict[str, Any]] = None,
+        mesh_hash: Optional[str] = None
     ) -> np.ndarray:
         """
         将网格文件转换为点云
@@ -172,58 +210,647 @@ class MagicArticulateWrapper:
         Args:
             mesh_file_path: 网格文件路径
             sampling_strategy: 采样策略
+            mesh_hash: 已计算的文件内容哈希（为空时在此计算）
         
         Returns:
             点云数据 (N, 6) - xyz + normals
         """
         try:
-            # 加载网格
-            mesh = trimesh.load(mesh_file_path, force='mesh')
+            mesh_hash = mesh_hash or await asyncio.get_running_loop().run_in_executor(
+                None, self.mesh_cache.hash_file, mesh_file_path
+            )
             
-            # 应用采样策略
-            if sampling_strategy:
-                return await self._apply_sampling_strategy(mesh, sampling_strategy)
-            else:
-                return await self._default_mesh_processing(mesh)
+            # 已有点云金字塔时直接取前缀，无需解析和采样
+            if sampling_strategy and self._resolve_adaptive_budget(sampling_strategy, mesh_hash):
+                point_cloud = self._take_from_pyramid(mesh_hash, sampling_strategy)
+                if point_cloud is not None:
+                    return point_cloud
+            
+            # 超出单任务内存上限的网格走流式采样，避免 trimesh.load 一次性占满内存；
+            # 清理后的网格已缓存时不会再解析文件，无需检查
+            if ('clean', mesh_hash) not in self.mesh_cache:
+                report = await self.inspect_mesh_file(mesh_file_path, mesh_hash)
+                if report['admission'] == 'stream':
+                    async with self.admission.reserve(report):
+                        return await self._streaming_mesh_sampling(
+                            mesh_file_path, sampling_strategy or {}, mesh_hash
+                        )
+            
+            # 整体加载的准入检查和内存预留在 _load_clean_mesh 中进行
+            return await self._sample_clean_mesh(mesh_file_path, mesh_hash, sampling_strategy)
                 
         except Exception as e:
             logger.error(f"Mesh processing failed: {str(e)}")
             raise
     
+    async def _sample_clean_mesh(
+        self, 
+        mesh_file_path: str,
+        mesh_hash: str,
+        sampling_strategy: Optional[Dict[str, Any]]
+    ) -> np.ndarray:
+        """加载并清理网格（清理结果按哈希缓存，命中时跳过解析），再按策略采样"""
+        mesh = await self._load_clean_mesh(mesh_file_path, mesh_hash, sampling_strategy)
+        
+        if sampling_strategy:
+            return await self._apply_sampling_strategy(mesh, sampling_strategy, mesh_hash)
+        return await self._default_mesh_processing(mesh)
+    
+    async def _load_clean_mesh(
+        self, 
+        mesh_file_path: str,
+        mesh_hash: str,
+        strategy: Optional[Dict[str, Any]] = None
+    ) -> trimesh.Trimesh:
+        """
+        加载网格并焊接重复顶点、去除退化面和未引用顶点
+        
+        清理结果未缓存时先按文件头检查准入，加载和清理期间持有内存预留
+        
+        Raises:
+            ValueError: 网格超出单任务内存上限（只能流式采样）或被拒绝，不能整体加载
+        """
+        cache_key = ('clean', mesh_hash)
+        cached = self.mesh_cache.get(cache_key)
+        if cached is None:
+            report = await self.inspect_mesh_file(mesh_file_path, mesh_hash)
+            if report['admission'] == 'stream':
+                raise ValueError(
+                    f"Mesh rejected: {report['format']} file, estimated {report['estimated_bytes']} bytes "
+                    f"exceeds the per-job memory limit and cannot be fully loaded"
+                )
+            
+            async with self.admission.reserve(report):
+                # 解析在线程池中进行，不阻塞事件循环中的其他请求
+                loop = asyncio.get_running_loop()
+                mesh = await loop.run_in_executor(None, lambda: trimesh.load(mesh_file_path, force='mesh'))
+                try:
+                    start_time = time.perf_counter()
+                    cached = await loop.run_in_executor(None, self.mesh_cleaner.clean, mesh)
+                    self.mesh_cache.record_timing('mesh_cleanup', time.perf_counter() - start_time)
+                except Exception as e:
+                    logger.error(f"Mesh cleanup failed: {str(e)}")
+                    # 清理失败时使用原始网格，且不写入缓存；基于它的采样结果标记为回退
+                    if strategy is not None:
+                        strategy['is_fallback'] = True
+                    return mesh
+            self.mesh_cache.put(cache_key, cached)
+        
+        mesh, report = cached
+        if strategy is not None:
+            strategy['cleanup_report'] = report
+        return mesh
+    
+    async def inspect_mesh_file(self, mesh_file_path: str, mesh_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        检查网格文件头并给出准入决定（写入报告的 admission 字段）
+        
+        检查在线程池中进行（OBJ/STL 需要扫描整个文件）；给出网格哈希时报告按哈希缓存
+        """
+        cache_key = ('inspection', mesh_hash)
+        if mesh_hash:
+            cached = self.mesh_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+        
+        report = await asyncio.get_running_loop().run_in_executor(
+            None, self.mesh_inspector.inspect, mesh_file_path
+        )
+        report['admission'] = self.admission.decide(report)
+        logger.info(f"Mesh inspection: {report}")
+        if mesh_hash:
+            self.mesh_cache.put(cache_key, dict(report))
+        return report
+    
+    def _pyramid_key(self, mesh_hash: str, strategy: Dict[str, Any]) -> Tuple:
+        """
+        点云金字塔的缓存键：只包含影响几何采样结果的参数
+        
+        前缀不可复用的采样（泊松圆盘、MeshProcessor 预处理）按点数整体缓存，键中包含点数
+        """
+        apply_marching_cubes = strategy.get('apply_marching_cubes', False)
+        region_weights = strategy.get('region_weights') or {}
+        sampling_mode = strategy.get('sampling_mode', 'uniform')
+        exact_count = None
+        if sampling_mode not in NESTED_SAMPLING_MODES or self._uses_mesh_processor(strategy):
+            exact_count = strategy.get('sampling_count', self.default_args['input_pc_num'])
+        return (
+            'pyramid',
+            mesh_hash,
+            sampling_mode,
+            exact_count,
+            apply_marching_cubes,
+            strategy.get('octree_depth', 7) if apply_marching_cubes else None,
+            tuple(sorted((region, round(weight, 4)) for region, weight in region_weights.items()))
+        )
+    
+    def _uses_mesh_processor(self, strategy: Dict[str, Any]) -> bool:
+        """
+        是否使用 MagicArticulate 的 MeshProcessor 生成点云
+        
+        模型按 MeshProcessor 的预处理训练，可用时未加权的均匀采样始终使用它；
+        其输出经 FPS 子采样，前缀不是同分布的子采样，不能从更大的层级切片
+        """
+        return (
+            hasattr(self, 'MeshProcessor')
+            and strategy.get('sampling_mode', 'uniform') == 'uniform'
+            and not strategy.get('region_weights')
+        )
+    
+    def _resolve_adaptive_budget(
+        self, 
+        strategy: Dict[str, Any], 
+        mesh_hash: str,
+        mesh: Optional[trimesh.Trimesh] = None
+    ) -> bool:
+        """
+        自适应点数模式下，根据各金字塔层级的实测覆盖率确定 sampling_count
+        
+        层级覆盖率按网格哈希缓存；选择结果写回策略的 adaptive_budget_info 供结果审计。
+        
+        Returns:
+            点数是否已确定（未开启自适应时恒为True；需要网格但尚未加载时为False）
+        """
+        if not strategy.get('adaptive_budget') or 'adaptive_budget_info' in strategy:
+            return True
+        
+        cache_key = ('level_coverage', mesh_hash)
+        level_coverage = self.mesh_cache.get(cache_key)
+        if level_coverage is None:
+            if mesh is None:
+                return False
+            level_coverage = self.enhanced_sampling.measure_level_coverage(
+                mesh, context=self.mesh_contexts.get(mesh, mesh_hash)
+            )
+            self.mesh_cache.put(cache_key, level_coverage)
+        
+        selection = self.enhanced_sampling.select_adaptive_budget(level_coverage, strategy)
+        strategy['sampling_count'] = selection['selected_point_count']
+        strategy['adaptive_budget_info'] = selection
+        logger.info(f"Adaptive point budget: {selection}")
+        return True
+    
+    def _take_from_pyramid(self, mesh_hash: str, strategy: Dict[str, Any]) -> Optional[np.ndarray]:
+        """从缓存的点云金字塔中取前缀切片，未命中或已采样点数不足时返回None"""
+        sampling_count = strategy.get('sampling_count', self.default_args['input_pc_num'])
+        if sampling_count > PYRAMID_MAX_POINTS:
+            return None
+        
+        pyramid = self.mesh_cache.get(self._pyramid_key(mesh_hash, strategy))
+        if pyramid is None or pyramid.max_count < sampling_count:
+            return None
+        self._record_normalization(strategy, pyramid.normalization)
+        return pyramid.take(sampling_count)
+    
+    def _store_pyramid(
+        self, 
+        mesh_hash: Optional[str], 
+        strategy: Dict[str, Any], 
+        point_cloud: np.ndarray
+    ) -> PointCloudPyramid:
+        """保存点云金字塔（连同策略中记录的归一化变换）"""
+        pyramid = PointCloudPyramid(point_cloud, strategy.get('normalization'))
+        if mesh_hash:
+            self.mesh_cache.put(self._pyramid_key(mesh_hash, strategy), pyramid)
+        return pyramid
+    
+    async def _streaming_mesh_sampling(
+        self, 
+        mesh_file_path: str,
+        strategy: Dict[str, Any],
+        mesh_hash: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        流式两遍采样（有界内存），点数不超过金字塔上限时一并生成金字塔
+        
+        Raises:
+            ValueError: 文件格式变体不支持流式读取（如非三角面PLY、索引越界的OBJ）
+        """
+        sampling_count = strategy.get('sampling_count', self.default_args['input_pc_num'])
+        sampling_mode = strategy.get('sampling_mode', 'uniform')
+        
+        if strategy.get('apply_marching_cubes', False):
+            logger.warning("Watertight remeshing is not available for streamed meshes, skipping")
+        if strategy.get('adaptive_budget') and 'adaptive_budget_info' not in strategy:
+            logger.warning("Adaptive point budget needs the full mesh, using requested sampling count")
+        
+        build_pyramid = sampling_count <= PYRAMID_MAX_POINTS
+        target_count = pyramid_level(sampling_count, sampling_mode) if build_pyramid else sampling_count
+        
+        # 覆盖率导向模式先流式过采样，再在点集上挑选
+        stream_count = target_count
+        if sampling_mode != 'uniform':
+            stream_count *= self.point_sampler.oversample_factor
+        
+        loop = asyncio.get_running_loop()
+        try:
+            points, normals, surface_area = await loop.run_in_executor(
+                None, self.streaming_sampler.sample, mesh_file_path, stream_count
+            )
+        except (ValueError, KeyError, IndexError) as e:
+            # 走流式采样的文件超出单任务内存上限，不能退回整体加载，直接拒绝
+            raise ValueError(
+                f"Mesh rejected: file exceeds the per-job memory limit and cannot be streamed ({str(e)})"
+            ) from e
+        
+        if sampling_mode == 'fps':
+            selected = await loop.run_in_executor(
+                None, self.point_sampler.farthest_point_sampling, points, target_count
+            )
+            points, normals = points[selected], normals[selected]
+        elif sampling_mode == 'poisson_disk':
+            selected = await loop.run_in_executor(
+                None, self.point_sampler.poisson_disk_sampling, points, target_count, surface_area
+            )
+            points, normals = points[selected], normals[selected]
+        
+        point_cloud = self._normalize_point_cloud(points, normals, strategy)
+        if not build_pyramid:
+            return point_cloud
+        return self._store_pyramid(mesh_hash, strategy, point_cloud).take(sampling_count)
+    
+    async def iter_meshes_to_pointclouds(
+        self, 
+        mesh_file_paths: List[str],
+        sampling_strategy: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Tuple[int, Optional[np.ndarray]]]:
+        """
+        批量将网格文件转换为点云，按完成顺序流式返回
+        
+        Args:
+            mesh_file_paths: 网格文件路径列表
+            sampling_strategy: 采样策略（所有文件共用）
+            max_workers: 本批次同时处理的文件数上限，不超过共享进程池的进程数（默认即进程数）
+        
+        Yields:
+            (输入序号, 点云)；单个文件失败时点云为None
+        """
+        strategy = sampling_strategy or {'sampling_count': self.default_args['input_pc_num']}
+        loop = asyncio.get_running_loop()
+        pool = self._get_process_pool()
+        # 请求只能限制自身的并发，不能扩大进程池
+        slots = asyncio.Semaphore(min(max_workers or self.process_workers, self.process_workers))
+        
+        async def convert(path: str) -> np.ndarray:
+            async with slots:
+                # 每个文件按估算内存准入，预算不足时排队，避免多个大文件同时加载
+                report = await self.inspect_mesh_file(path)
+                async with self.admission.reserve(report):
+                    if report['admission'] == 'stream':
+                        return await self._streaming_mesh_sampling(path, dict(strategy))
+                    return await loop.run_in_executor(pool, mesh_file_to_point_cloud, path, strategy)
+        
+        futures = {
+            asyncio.ensure_future(convert(path)): index
+            for index, path in enumerate(mesh_file_paths)
+        }
+        
+        try:
+            pending = set(futures)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index = futures[future]
+                    try:
+                        yield index, future.result()
+                    except Exception as e:
+                        logger.error(f"Batch mesh processing failed for {mesh_file_paths[index]}: {str(e)}")
+                        yield index, None
+        finally:
+            # 调用方提前结束迭代时取消尚未开始的任务
+            for future in futures:
+                future.cancel()
+    
+    async def batch_process_meshes_to_pointclouds(
+        self, 
+        mesh_file_paths: List[str],
+        sampling_strategy: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None
+    ) -> List[Optional[np.ndarray]]:
+        """
+        批量将网格文件转换为点云
+        
+        Returns:
+            与输入顺序一致的点云列表；失败的文件对应None
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(mesh_file_paths)
+        async for index, point_cloud in self.iter_meshes_to_pointclouds(
+            mesh_file_paths, sampling_strategy, max_workers
+        ):
+            results[index] = point_cloud
+        return results
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        获取（按需创建）共享的网格处理进程池
+        
+        工作进程以 spawn 方式启动：父进程已加载 torch 并运行多个线程，fork 出的子进程可能继承被占用的锁
+        """
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._process_pool
+    
+    def shutdown(self):
+        """释放进程池等资源"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
     async def _apply_sampling_strategy(
         self, 
         mesh: trimesh.Trimesh, 
-        strategy: Dict[str, Any]
+        strategy: Dict[str, Any],
+        mesh_hash: Optional[str] = None
     ) -> np.ndarray:
         """应用自定义采样策略"""
         try:
+            # 自适应点数在重建前的原始网格上测量层级覆盖率
+            if mesh_hash:
+                self._resolve_adaptive_budget(strategy, mesh_hash, mesh)
+            
             sampling_count = strategy.get('sampling_count', self.default_args['input_pc_num'])
+            sampling_mode = strategy.get('sampling_mode', 'uniform')
             
-            # 如果有MeshProcessor，使用它
-            if hasattr(self, 'MeshProcessor'):
-                pc_list = self.MeshProcessor.convert_meshes_to_point_clouds(
-                    [mesh], 
-                    sampling_count,
-                    apply_marching_cubes=strategy.get('apply_marching_cubes', False),
-                    octree_depth=strategy.get('octree_depth', 7)
+            # 水密重建结果按 (网格哈希, 八叉树深度) 缓存，采样直接在重建网格上进行
+            if strategy.get('apply_marching_cubes', False):
+                mesh = await self._get_watertight_mesh(
+                    mesh, mesh_hash, strategy.get('octree_depth', 7)
                 )
-                return pc_list[0]
-            else:
-                # 简单采样方法
-                return await self._simple_mesh_sampling(mesh, sampling_count)
+            
+            # 实际采样网格的共享几何上下文（面积分布、邻接图等只构建一次）
+            context = self.get_mesh_context(mesh, mesh_hash, strategy)
+            
+            # 提示词区域权重通过部位分割映射为逐面权重
+            face_weights = await self._region_face_weights(mesh, strategy, mesh_hash, context)
+            
+            # 模型训练时使用的预处理：结果按请求点数整体缓存，启用缓存不改变模型输入
+            if self._uses_mesh_processor(strategy):
+                point_cloud = await self._mesh_processor_sampling(mesh, sampling_count, strategy, context)
+                if sampling_count <= PYRAMID_MAX_POINTS:
+                    self._store_pyramid(mesh_hash, strategy, point_cloud)
+                return point_cloud
+            
+            # 点数不超过金字塔上限时，嵌套模式按不小于请求的最小层级采样并缓存，
+            # 之后不超过该层级的请求都取前缀；泊松圆盘按请求点数采样，按点数缓存
+            if sampling_count <= PYRAMID_MAX_POINTS:
+                point_cloud = await self._coverage_mesh_sampling(
+                    mesh, pyramid_level(sampling_count, sampling_mode), sampling_mode, face_weights, context, strategy
+                )
+                return self._store_pyramid(mesh_hash, strategy, point_cloud).take(sampling_count)
+            
+            # 覆盖率导向的采样模式（FPS / 泊松圆盘）、区域加权采样，以及需要分块并行采样的大网格
+            if (sampling_mode != 'uniform' or face_weights is not None
+                    or len(mesh.faces) >= self.point_sampler.parallel_face_threshold):
+                return await self._coverage_mesh_sampling(
+                    mesh, sampling_count, sampling_mode, face_weights, context, strategy
+                )
+            
+            # 简单采样方法
+            return await self._simple_mesh_sampling(mesh, sampling_count, strategy)
                 
         except Exception as e:
             logger.error(f"Sampling strategy application failed: {str(e)}")
-            return await self._simple_mesh_sampling(mesh, strategy.get('sampling_count', 8192))
+            # 回退结果不进入点云金字塔，并标记在策略中，阶段图不缓存
+            strategy['is_fallback'] = True
+            return await self._simple_mesh_sampling(mesh, strategy.get('sampling_count', 8192), strategy)
+    
+    async def _mesh_processor_sampling(
+        self, 
+        mesh: trimesh.Trimesh, 
+        count: int,
+        strategy: Dict[str, Any],
+        context: MeshContext
+    ) -> np.ndarray:
+        """MeshProcessor 预处理（水密重建已在此之前完成），并反求其归一化变换"""
+        pc_list = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self.MeshProcessor.convert_meshes_to_point_clouds(
+                [mesh],
+                count,
+                apply_marching_cubes=False,
+                octree_depth=strategy.get('octree_depth', 7)
+            )
+        )
+        await self._fit_normalization(context, pc_list[0], strategy)
+        return pc_list[0]
+    
+    async def _get_watertight_mesh(
+        self, 
+        mesh: trimesh.Trimesh, 
+        mesh_hash: Optional[str],
+        octree_depth: int
+    ) -> trimesh.Trimesh:
+        """获取水密重建网格（优先使用缓存）"""
+        cache_key = ('watertight', mesh_hash or self.mesh_cache.hash_mesh(mesh), octree_depth)
+        
+        watertight = self.mesh_cache.get(cache_key)
+        if watertight is not None:
+            return watertight
+        
+        try:
+            start_time = time.perf_counter()
+            watertight = await asyncio.get_running_loop().run_in_executor(
+                None, self._watertight_remesh, mesh, octree_depth
+            )
+            self.mesh_cache.record_timing('watertight_remesh', time.perf_counter() - start_time)
+            
+        except Exception as e:
+            logger.error(f"Watertight remeshing failed: {str(e)}")
+            # 重建失败时退回原始网格，且不写入缓存
+            return mesh
+        
+        self.mesh_cache.put(cache_key, watertight)
+        return watertight
+    
+    async def _region_face_weights(
+        self, 
+        mesh: trimesh.Trimesh, 
+        strategy: Dict[str, Any],
+        mesh_hash: Optional[str] = None,
+        context: Optional[MeshContext] = None
+    ) -> Optional[np.ndarray]:
+        """
+        把策略中的区域权重映射为逐面采样权重
+        
+        Returns:
+            (F,) 权重数组；没有区域权重或分割失败时返回None（按面积均匀采样）
+        """
+        region_weights = strategy.get('region_weights')
+        if not region_weights:
+            return None
+        
+        face_labels = await self._get_part_labels(mesh, strategy, mesh_hash, context)
+        if face_labels is None:
+            return None
+        
+        strategy['part_summary'] = self.part_segmenter.summarize(face_labels)
+        return self.part_segmenter.face_weights(face_labels, region_weights)
+    
+    async def _get_part_labels(
+        self, 
+        mesh: trimesh.Trimesh, 
+        strategy: Dict[str, Any],
+        mesh_hash: Optional[str] = None,
+        context: Optional[MeshContext] = None
+    ) -> Optional[np.ndarray]:
+        """获取逐面部位标签（优先使用缓存）"""
+        # 标签对应实际采样的网格，水密重建后的网格单独缓存
+        apply_marching_cubes = strategy.get('apply_marching_cubes', False)
+        cache_key = (
+            'parts',
+            mesh_hash or self.mesh_cache.hash_mesh(mesh),
+            strategy.get('octree_depth', 7) if apply_marching_cubes else None
+        )
+        
+        face_labels = self.mesh_cache.get(cache_key)
+        if face_labels is not None:
+            return face_labels
+        
+        try:
+            start_time = time.perf_counter()
+            face_labels = await asyncio.get_running_loop().run_in_executor(
+                None, self.part_segmenter.segment, mesh, context
+            )
+            self.mesh_cache.record_timing('part_segmentation', time.perf_counter() - start_time)
+            
+        except Exception as e:
+            logger.error(f"Part segmentation failed: {str(e)}")
+            return None
+        
+        self.mesh_cache.put(cache_key, face_labels)
+        return face_labels
+    
+    def _watertight_remesh(self, mesh: trimesh.Trimesh, octree_depth: int) -> trimesh.Trimesh:
+        """在 2^octree_depth 分辨率的稀疏窄带体素上做水密重建"""
+        return self.remesher.remesh(mesh, octree_depth)
+    
+    async def compute_skin_weights(
+        self,
+        mesh_file_path: str,
+        mesh_hash: str,
+        joints: np.ndarray,
+        bones: np.ndarray,
+        top_k: int = 4,
+        normalization: Optional[Tuple[np.ndarray, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        在清理后的网格上计算热扩散蒙皮权重
+        
+        Args:
+            joints: 归一化坐标系下的关节（与模型输入点云一致）
+            bones: 骨骼 (B, 2)
+            top_k: 每个顶点保留的骨骼数
+            normalization: 模型输入点云的归一化变换 (center, scale)，为空时使用网格包围盒变换
+        """
+        mesh = await self._load_clean_mesh(mesh_file_path, mesh_hash)
+        # 余切拉普拉斯和顶点面积缓存在网格上下文中，同一网格的不同骨骼复用
+        context = self.get_mesh_context(mesh, mesh_hash)
+        skinner = HeatDiffusionSkinner(top_k=top_k)
+        joints = context.denormalize(np.asarray(joints, dtype=np.float64), normalization)
+        
+        start_time = time.perf_counter()
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, skinner.compute, context, joints, bones
+        )
+        self.mesh_cache.record_timing('skinning', time.perf_counter() - start_time)
+        return result
+    
+    async def export_glb(
+        self,
+        mesh_file_path: str,
+        mesh_hash: str,
+        skeleton_data: Any,
+        skin_weights: Optional[Any] = None,
+        normalization: Optional[Tuple[np.ndarray, float]] = None
+    ) -> bytes:
+        """
+        把清理后的网格、骨骼和蒙皮权重导出为 GLB
+        
+        Args:
+            skeleton_data: SkeletonData（归一化坐标系下的关节）
+            skin_weights: SkinWeights（与清理后的网格顶点一致），可为空
+            normalization: 模型输入点云的归一化变换 (center, scale)，为空时使用网格包围盒变换
+        """
+        mesh = await self._load_clean_mesh(mesh_file_path, mesh_hash)
+        context = self.get_mesh_context(mesh, mesh_hash)
+        joints = context.denormalize(np.asarray(skeleton_data.joints, dtype=np.float64), normalization)
+        
+        start_time = time.perf_counter()
+        glb = await asyncio.get_running_loop().run_in_executor(
+            None,
+            self.glb_exporter.export,
+            mesh,
+            joints,
+            skeleton_data.bones,
+            skeleton_data.parents,
+            skeleton_data.joint_names,
+            skin_weights
+        )
+        self.mesh_cache.record_timing('export', time.perf_counter() - start_time)
+        return glb
+    
+    async def get_part_regions(
+        self,
+        mesh_file_path: str,
+        mesh_hash: str
+    ) -> Tuple[MeshContext, Optional[np.ndarray]]:
+        """清理后网格的几何上下文及其逐面部位标签（分割失败时标签为None）"""
+        mesh = await self._load_clean_mesh(mesh_file_path, mesh_hash)
+        context = self.get_mesh_context(mesh, mesh_hash)
+        face_labels = await self._get_part_labels(mesh, {}, mesh_hash, context)
+        return context, face_labels
+    
+    def get_mesh_context(
+        self, 
+        mesh: trimesh.Trimesh, 
+        mesh_hash: Optional[str] = None,
+        strategy: Optional[Dict[str, Any]] = None
+    ) -> MeshContext:
+        """获取网格的共享几何上下文，水密重建后的网格按 (哈希, 深度) 单独存放"""
+        key = mesh_hash
+        if mesh_hash and strategy and strategy.get('apply_marching_cubes', False):
+            key = (mesh_hash, 'watertight', strategy.get('octree_depth', 7))
+        return self.mesh_contexts.get(mesh, key)
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """获取网格缓存指标"""
+        metrics = self.mesh_cache.get_metrics()
+        metrics['contexts'] = self.mesh_contexts.get_metrics()
+        metrics['admission'] = self.admission.get_metrics()
+        return metrics
     
     async def _default_mesh_processing(self, mesh: trimesh.Trimesh) -> np.ndarray:
         """默认网格处理"""
         return await self._simple_mesh_sampling(mesh, self.default_args['input_pc_num'])
     
+    async def _coverage_mesh_sampling(
+        self, 
+        mesh: trimesh.Trimesh, 
+        count: int,
+        mode: str,
+        face_weights: Optional[np.ndarray] = None,
+        context: Optional[MeshContext] = None,
+        strategy: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+        """
+        PointSampler采样（最远点 / 泊松圆盘 / 区域加权 / 大网格分块并行）
+        
+        失败时抛出异常，由 _apply_sampling_strategy 统一回退，避免回退结果写入点云金字塔
+        """
+        area_cdf = context.area_cdf if context is not None else None
+        points, face_normals = await asyncio.get_running_loop().run_in_executor(
+            None, self.point_sampler.sample, mesh, count, mode, None, face_weights, area_cdf
+        )
+        return self._normalize_point_cloud(points, face_normals, strategy)
+    
     async def _simple_mesh_sampling(
         self, 
         mesh: trimesh.Trimesh, 
-        count: int
+        count: int,
+        strategy: Optional[Dict[str, Any]] = None
     ) -> np.ndarray:
         """简单网格采样"""
         try:
@@ -238,86 +865,93 @@ class MagicArticulateWrapper:
                 face_normals = np.random.randn(count, 3)
                 face_normals = face_normals / np.linalg.norm(face_normals, axis=1, keepdims=True)
             
-            # 归一化坐标
-            bounds = np.array([points.min(axis=0), points.max(axis=0)])
-            center = (bounds[0] + bounds[1]) / 2
-            scale = np.abs(points - center).max()
-            
-            normalized_points = (points - center) / scale * 0.9995
-            
-            # 组合点和法向量
-            point_cloud = np.concatenate([normalized_points, face_normals], axis=1)
-            
-            return point_cloud.astype(np.float32)
+            return self._normalize_point_cloud(points, face_normals, strategy)
             
         except Exception as e:
             logger.error(f"Simple mesh sampling failed: {str(e)}")
-            # 返回随机点云
+            # 返回随机点云，与网格坐标没有对应关系
+            self._record_normalization(strategy, None)
             return np.random.rand(count, 6).astype(np.float32)
     
+    def _normalize_point_cloud(
+        self, 
+        points: np.ndarray, 
+        normals: np.ndarray,
+        strategy: Optional[Dict[str, Any]] = None
+    ) -> np.ndarray:
+        """归一化坐标并拼接法向量，实际使用的变换记录在策略中，供关节映射回网格坐标"""
+        normalization = point_cloud_normalization(points)
+        self._record_normalization(strategy, normalization)
+        return normalize_point_cloud(points, normals, normalization)
+    
+    async def _fit_normalization(
+        self, 
+        context: MeshContext, 
+        point_cloud: np.ndarray,
+        strategy: Dict[str, Any]
+    ):
+        """外部预处理（MeshProcessor）不返回归一化变换，按网格表面配准反求"""
+        try:
+            normalization = await asyncio.get_running_loop().run_in_executor(
+                None, context.fit_normalization, point_cloud[:, :3]
+            )
+        except Exception as e:
+            logger.warning(f"Point cloud normalization fit failed: {str(e)}")
+            normalization = None
+        self._record_normalization(strategy, normalization)
+    
+    def _record_normalization(
+        self, 
+        strategy: Optional[Dict[str, Any]], 
+        normalization: Optional[Tuple[np.ndarray, float]]
+    ):
+        """在策略中记录点云的归一化变换（未知时移除，下游回退到网格包围盒变换）"""
+        if strategy is None:
+            return
+        if normalization is None:
+            strategy.pop('normalization', None)
+        else:
+            strategy['normalization'] = normalization
+    
     async def _generate_mock_skeleton(self, point_cloud_data: np.ndarray) -> Dict[str, Any]:
-        """生成模拟骨骼数据（用于开发测试）"""
+        """生成模拟骨骼数据（用于开发测试），结果带 is_fallback 标记，不会被阶段图缓存"""
         try:
             # 基于点云大小生成合理的关节数量
             num_joints = min(max(len(point_cloud_data) // 400, 8), 24)
             
             # 生成关节位置
-            joints = np.random.uniform(-0.4, 0.4, (num_joints, 3))
+            joints = np.random.uniform(-0.4, 0.4, (num_joints, 3)).astype(np.float32)
             
             # 生成骨骼连接（简单的链式结构）
-            bones = []
-            for i in range(num_joints - 1):
-                bones.append([i, i + 1])
+            chain = np.arange(num_joints - 1, dtype=np.int32)
+            bones = np.column_stack([chain, chain + 1])
             
             # 添加一些分支
             if num_joints > 10:
-                bones.append([2, num_joints - 2])  # 添加分支
+                bones = np.vstack([bones, [[2, num_joints - 2]]]).astype(np.int32)  # 添加分支
             
             return {
-                'joints': joints.tolist(),
+                'joints': joints,
                 'bones': bones,
                 'joint_count': num_joints,
                 'bone_count': len(bones),
-                'raw_output': joints.flatten().tolist()
+                'raw_output': joints.reshape(-1),
+                'is_fallback': True
             }
             
         except Exception as e:
             logger.error(f"Mock skeleton generation failed: {str(e)}")
             # 最简单的骨骼
+            joints = np.array([[0, 0, 0], [0, 0.1, 0], [0, 0.2, 0]], dtype=np.float32)
             return {
-                'joints': [[0, 0, 0], [0, 0.1, 0], [0, 0.2, 0]],
-                'bones': [[0, 1], [1, 2]],
+                'joints': joints,
+                'bones': np.array([[0, 1], [1, 2]], dtype=np.int32),
                 'joint_count': 3,
                 'bone_count': 2,
-                'raw_output': [0, 0, 0, 0, 0.1, 0, 0, 0.2, 0]
+                'raw_output': joints.reshape(-1),
+                'is_fallback': True
             }
     
-    def _process_skeleton_output(self, skeleton_coords: np.ndarray) -> Tuple[np.ndarray, List[List[int]]]:
-        """处理骨骼输出格式"""
-        try:
-            # 这里实现MagicArticulate输出格式的解析
-            # 假设skeleton_coords是 (N, 3) 的关节坐标
-            
-            if skeleton_coords.ndim == 1:
-                # 如果是扁平化的，重塑为 (N, 3)
-                skeleton_coords = skeleton_coords.reshape(-1, 3)
-            
-            joints = skeleton_coords
-            
-            # 生成简单的骨骼连接
-            bones = []
-            for i in range(len(joints) - 1):
-                bones.append([i, i + 1])
-            
-            return joints, bones
-            
-        except Exception as e:
-            logger.error(f"Skeleton output processing failed: {str(e)}")
-            # 返回最简单的结构
-            joints = np.array([[0, 0, 0], [0, 0.1, 0]])
-            bones = [[0, 1]]
-            return joints, bones
-    
     def _create_args_object(self):
         """创建参数对象"""
         class Args:
@@ -0,0 +1,131 @@
+"""
+网格缓存模块
+按网格内容哈希缓存耗时的几何处理结果（如水密重建），并记录命中率与耗时指标
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import trimesh
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存容量（字节）
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+
+
+class MeshCache:
+    """按内容哈希索引的LRU网格缓存"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        # 指标：按命名空间（键的第一个元素）统计命中/未命中，按名称统计耗时
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._evictions = 0
+
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """计算文件内容哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def hash_mesh(mesh: trimesh.Trimesh) -> str:
+        """计算网格几何内容哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(mesh.vertices).tobytes())
+        digest.update(np.ascontiguousarray(mesh.faces).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """估算缓存值占用的字节数"""
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+        if isinstance(value, trimesh.Trimesh):
+            return value.vertices.nbytes + value.faces.nbytes
+        if isinstance(value, (list, tuple)):
+            return sum(MeshCache.estimate_size(v) for v in value)
+        if isinstance(value, dict):
+            return sum(MeshCache.estimate_size(v) for v in value.values())
+        return 64
+
+    def __contains__(self, key: Hashable) -> bool:
+        """是否已缓存（不刷新LRU顺序，不计入命中统计）"""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，命中时刷新LRU顺序"""
+        namespace = self._namespace(key)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits[namespace] = self._hits.get(namespace, 0) + 1
+                return self._entries[key]
+            self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            return None
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        size = nbytes if nbytes is not None else self.estimate_size(value)
+        if size > self.max_bytes:
+            logger.warning(f"Cache entry {key} ({size} bytes) exceeds cache capacity, not cached")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._sizes[key]
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._total_bytes += size
+
+            while self._total_bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(old_key)
+                self._evictions += 1
+
+    def record_timing(self, name: str, seconds: float):
+        """记录一次耗时"""
+        with self._lock:
+            timing = self._timings.setdefault(name, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            timing['count'] += 1
+            timing['total_seconds'] += seconds
+            timing['max_seconds'] = max(timing['max_seconds'], seconds)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取缓存指标"""
+        with self._lock:
+            namespaces = set(self._hits) | set(self._misses)
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self._evictions,
+                'namespaces': {
+                    ns: {'hits': self._hits.get(ns, 0), 'misses': self._misses.get(ns, 0)}
+                    for ns in sorted(namespaces)
+                },
+                'timings': {name: dict(timing) for name, timing in self._timings.items()}
+            }
+
+    def _namespace(self, key: Hashable) -> str:
+        """缓存键的命名空间"""
+        if isinstance(key, tuple) and key:
+            return str(key[0])
+        return 'default'
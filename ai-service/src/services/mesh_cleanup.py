@@ -0,0 +1,93 @@
+"""
+网格清理模块
+向量化地焊接重复顶点、去除退化面、重复面和未引用顶点，
+减小网格规模并避免退化面在采样时产生 NaN 法向
+"""
+
+import logging
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import trimesh
+
+logger = logging.getLogger(__name__)
+
+
+class MeshCleaner:
+    """顶点焊接 + 退化/重复面过滤 + 未引用顶点压缩"""
+
+    def __init__(self, weld_tolerance: float = 1e-6, area_tolerance: float = 1e-12):
+        # 焊接容差与面积容差，均相对包围盒对角线（面积为对角线平方）
+        self.weld_tolerance = weld_tolerance
+        self.area_tolerance = area_tolerance
+
+    def clean(self, mesh: trimesh.Trimesh) -> Tuple[trimesh.Trimesh, Dict[str, Any]]:
+        """
+        清理网格
+
+        Returns:
+            (清理后的网格, 清理前后的统计报告)
+        """
+        vertices = np.asarray(mesh.vertices, dtype=np.float64)
+        faces = np.asarray(mesh.faces, dtype=np.int64)
+        report = {
+            'vertices_before': len(vertices),
+            'faces_before': len(faces)
+        }
+
+        # 1. 含非有限坐标的顶点所在面直接丢弃
+        finite = np.isfinite(vertices).all(axis=1)
+        face_finite = finite[faces].all(axis=1) if len(faces) else np.zeros(0, dtype=bool)
+        report['non_finite_faces'] = int((~face_finite).sum())
+        faces = faces[face_finite]
+
+        if len(faces) == 0:
+            report.update({'welded_vertices': 0, 'degenerate_faces': 0, 'duplicate_faces': 0,
+                           'unreferenced_vertices': 0, 'vertices_after': 0, 'faces_after': 0})
+            return trimesh.Trimesh(vertices=np.zeros((0, 3)), faces=np.zeros((0, 3), dtype=np.int64),
+                                   process=False), report
+
+        # 2. 量化坐标后用 np.unique 焊接重复顶点
+        valid_vertices = vertices[finite]
+        lower = valid_vertices.min(axis=0)
+        diagonal = float(np.linalg.norm(valid_vertices.max(axis=0) - lower)) or 1.0
+        quantum = self.weld_tolerance * diagonal
+        keys = np.zeros((len(vertices), 3), dtype=np.int64)
+        keys[finite] = np.round((valid_vertices - lower) / quantum).astype(np.int64)
+        # 非有限顶点各自保留唯一键，不与其他顶点合并（之后作为未引用顶点被移除）
+        keys[~finite] = -1 - np.arange((~finite).sum())[:, None]
+
+        _, first_index, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        faces = inverse[faces]
+        vertices = vertices[first_index]
+        report['welded_vertices'] = int(finite.sum() - np.unique(inverse[finite]).size)
+
+        # 3. 过滤退化面：顶点重复或面积近似为0
+        triangles = vertices[faces]
+        cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        doubled_area = np.sqrt(np.einsum('ij,ij->i', cross, cross))
+        repeated = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 0] == faces[:, 2])
+        degenerate = repeated | (doubled_area <= 2.0 * self.area_tolerance * diagonal ** 2)
+        report['degenerate_faces'] = int(degenerate.sum())
+        faces = faces[~degenerate]
+
+        # 4. 焊接后完全重合的重复面只保留一个
+        _, unique_faces = np.unique(np.sort(faces, axis=1), axis=0, return_index=True)
+        report['duplicate_faces'] = int(len(faces) - len(unique_faces))
+        faces = faces[np.sort(unique_faces)]
+
+        # 5. 压缩未引用顶点
+        referenced = np.zeros(len(vertices), dtype=bool)
+        referenced[faces.reshape(-1)] = True
+        remap = np.cumsum(referenced) - 1
+        report['unreferenced_vertices'] = int((~referenced).sum())
+        vertices = vertices[referenced]
+        faces = remap[faces]
+
+        report['vertices_after'] = len(vertices)
+        report['faces_after'] = len(faces)
+
+        cleaned = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        logger.info(f"Mesh cleanup: {report}")
+        return cleaned, report
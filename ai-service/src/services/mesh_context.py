@@ -0,0 +1,319 @@
+"""
+网格几何上下文模块
+按网格内容哈希共享一个 MeshContext，惰性计算并缓存面面积、面积累积分布、
+顶点邻接图、余切拉普拉斯（及热扩散系数矩阵的分解）、KD树、包围盒和归一化变换等派生数据，每个网格最多构建一次
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import trimesh
+from scipy.sparse import coo_matrix, csr_matrix, diags
+from scipy.sparse.linalg import SuperLU, splu
+from scipy.spatial import cKDTree
+
+from services.mesh_cache import MeshCache
+
+logger = logging.getLogger(__name__)
+
+# 默认上下文存储容量（字节）
+DEFAULT_CONTEXT_BYTES = 512 * 1024 * 1024
+
+# 表面KD树默认使用的采样点数
+SURFACE_SAMPLE_COUNT = 20000
+
+# 点云归一化变换拟合的最大迭代次数和收敛阈值（相对缩放）
+FIT_ITERATIONS = 10
+FIT_TOLERANCE = 1e-6
+
+
+class MeshContext:
+    """单个网格的惰性派生数据"""
+
+    def __init__(
+        self,
+        mesh: trimesh.Trimesh,
+        mesh_hash: Optional[Hashable],
+        on_update: Optional[Callable[['MeshContext'], None]] = None
+    ):
+        self.mesh = mesh
+        self.mesh_hash = mesh_hash
+        self._on_update = on_update
+        self._derived: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _derive(self, name: str, builder: Callable[[], Any], nbytes: Optional[Callable[[Any], int]] = None) -> Any:
+        """读取派生数据，不存在时构建并通知存储更新内存占用"""
+        with self._lock:
+            if name in self._derived:
+                return self._derived[name]
+            value = builder()
+            self._derived[name] = value
+            self._sizes[name] = nbytes(value) if nbytes else MeshCache.estimate_size(value)
+
+        if self._on_update is not None:
+            self._on_update(self)
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        """网格本身与已构建派生数据的总字节数"""
+        with self._lock:
+            derived = sum(self._sizes.values())
+        return self.mesh.vertices.nbytes + self.mesh.faces.nbytes + derived
+
+    @property
+    def face_areas(self) -> np.ndarray:
+        """(F,) 面面积"""
+        return self._derive('face_areas', lambda: np.asarray(self.mesh.area_faces, dtype=np.float64))
+
+    @property
+    def face_normals(self) -> np.ndarray:
+        """(F, 3) 面法向"""
+        return self._derive('face_normals', lambda: np.asarray(self.mesh.face_normals, dtype=np.float64))
+
+    @property
+    def area_cdf(self) -> np.ndarray:
+        """(F,) 面面积累积分布，用于按面积选面"""
+        return self._derive('area_cdf', lambda: np.cumsum(self.face_areas))
+
+    @property
+    def surface_area(self) -> float:
+        """表面积"""
+        cdf = self.area_cdf
+        return float(cdf[-1]) if len(cdf) else 0.0
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """(2, 3) 包围盒"""
+        return self._derive('bounds', lambda: np.asarray(self.mesh.bounds, dtype=np.float64))
+
+    @property
+    def normalization(self) -> Tuple[np.ndarray, float]:
+        """
+        按网格顶点包围盒估计的归一化变换 (center, scale)：normalized = (points - center) / scale
+
+        点云归一化按实际采样点的包围盒计算，与此接近但不相同；
+        只作为拟合点云变换的初值，或没有记录点云变换时的回退
+        """
+        def build():
+            center = self.bounds.mean(axis=0)
+            scale = float(np.abs(np.asarray(self.mesh.vertices) - center).max()) / 0.9995
+            return center, max(scale, 1e-12)
+
+        return self._derive('normalization', build, lambda value: value[0].nbytes + 8)
+
+    def fit_normalization(self, normalized_points: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        由归一化后的点云反求其归一化变换（用于外部预处理产生、未记录变换的点云）
+
+        以 normalization 为初值做点到平面的配准：每轮把点映射回网格坐标，取最近表面采样点及其法向，
+        对 (scale, center) 解线性最小二乘，直到变换收敛
+
+        Raises:
+            ValueError: 点云不足以确定变换（如平面网格）
+        """
+        points = np.asarray(normalized_points, dtype=np.float64)
+        samples, normals = self.surface_samples()
+        tree = self.surface_tree()
+        center, scale = self.normalization
+
+        for _ in range(FIT_ITERATIONS):
+            _, nearest = tree.query(points * scale + center)
+            target, target_normals = samples[nearest], normals[nearest]
+            system = np.column_stack([np.einsum('ij,ij->i', target_normals, points), target_normals])
+            solution, _, rank, _ = np.linalg.lstsq(
+                system, np.einsum('ij,ij->i', target_normals, target), rcond=None
+            )
+            if rank < 4 or solution[0] <= 0:
+                raise ValueError("Point cloud does not determine the normalization")
+
+            change = abs(solution[0] - scale) + np.abs(solution[1:] - center).max()
+            scale, center = float(solution[0]), solution[1:]
+            if change <= FIT_TOLERANCE * scale:
+                break
+
+        return center, scale
+
+    def normalize(
+        self,
+        points: np.ndarray,
+        normalization: Optional[Tuple[np.ndarray, float]] = None
+    ) -> np.ndarray:
+        """网格坐标 -> 归一化坐标（变换为空时使用网格包围盒变换）"""
+        center, scale = normalization or self.normalization
+        return (points - center) / scale
+
+    def denormalize(
+        self,
+        points: np.ndarray,
+        normalization: Optional[Tuple[np.ndarray, float]] = None
+    ) -> np.ndarray:
+        """归一化坐标 -> 网格坐标（变换为空时使用网格包围盒变换）"""
+        center, scale = normalization or self.normalization
+        return points * scale + center
+
+    @property
+    def vertex_graph(self) -> csr_matrix:
+        """以边长为权重的对称稀疏顶点邻接图"""
+        def build():
+            edges = self.mesh.edges_unique
+            # 重合顶点之间的零长度边在稀疏矩阵中会被视为不存在
+            lengths = np.maximum(self.mesh.edges_unique_length, 1e-12)
+            num_vertices = len(self.mesh.vertices)
+            return csr_matrix(
+                (np.concatenate([lengths, lengths]),
+                 (np.concatenate([edges[:, 0], edges[:, 1]]), np.concatenate([edges[:, 1], edges[:, 0]]))),
+                shape=(num_vertices, num_vertices)
+            )
+
+        return self._derive(
+            'vertex_graph', build,
+            lambda graph: graph.data.nbytes + graph.indices.nbytes + graph.indptr.nbytes
+        )
+
+    @property
+    def vertex_areas(self) -> np.ndarray:
+        """(V,) 顶点重心面积（相邻面面积的 1/3 之和），即集中质量矩阵的对角"""
+        def build():
+            faces = np.asarray(self.mesh.faces).reshape(-1)
+            return np.bincount(
+                faces, weights=np.repeat(self.face_areas / 3.0, 3), minlength=len(self.mesh.vertices)
+            )
+
+        return self._derive('vertex_areas', build)
+
+    @property
+    def cotangent_laplacian(self) -> csr_matrix:
+        """
+        对称半正定的余切拉普拉斯矩阵 L = D - W，边 (i, j) 的权重为其对角余切之和的一半
+
+        负余切（钝角）截断为0，保证热扩散解满足极值原理
+        """
+        def build():
+            vertices = np.asarray(self.mesh.vertices, dtype=np.float64)
+            faces = np.asarray(self.mesh.faces, dtype=np.int64)
+            num_vertices = len(vertices)
+
+            rows, cols, weights = [], [], []
+            for corner in range(3):
+                apex = faces[:, corner]
+                left = faces[:, (corner + 1) % 3]
+                right = faces[:, (corner + 2) % 3]
+                u = vertices[left] - vertices[apex]
+                v = vertices[right] - vertices[apex]
+                cross = np.linalg.norm(np.cross(u, v), axis=1)
+                cotangent = np.einsum('ij,ij->i', u, v) / np.maximum(cross, 1e-12)
+                # 角的余切作用于其对边
+                rows.append(left)
+                cols.append(right)
+                weights.append(0.5 * np.maximum(cotangent, 0.0))
+
+            adjacency = coo_matrix(
+                (np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+                shape=(num_vertices, num_vertices)
+            ).tocsr()
+            adjacency = adjacency + adjacency.T
+            return (diags(np.asarray(adjacency.sum(axis=1)).reshape(-1)) - adjacency).tocsr()
+
+        return self._derive(
+            'cotangent_laplacian', build,
+            lambda matrix: matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        )
+
+    def heat_factorization(self, heat: np.ndarray) -> SuperLU:
+        """
+        热扩散系数矩阵 L + diag(heat) 的稀疏 LU 分解
+
+        heat 由骨骼到顶点的距离决定，同一骨骼重复蒙皮时直接复用；
+        分解的填充远大于拉普拉斯本身，只保留最近一次的分解
+        """
+        key = hashlib.sha1(np.ascontiguousarray(heat, dtype=np.float64).tobytes()).hexdigest()
+        with self._lock:
+            cached = self._derived.get('heat_factorization')
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            factor = splu((self.cotangent_laplacian + diags(heat)).tocsc(), permc_spec='MMD_AT_PLUS_A')
+            self._derived['heat_factorization'] = (key, factor)
+            # L、U 的非零元（值和行索引）与行列置换
+            self._sizes['heat_factorization'] = int(factor.nnz * 12 + factor.shape[0] * 16)
+
+        if self._on_update is not None:
+            self._on_update(self)
+        return factor
+
+    @property
+    def face_centers(self) -> np.ndarray:
+        """(F, 3) 面重心"""
+        return self._derive('face_centers', lambda: np.asarray(self.mesh.triangles_center, dtype=np.float64))
+
+    @property
+    def face_center_tree(self) -> cKDTree:
+        """面重心KD树，用于把点归属到最近的面（及其部位标签）"""
+        return self._derive('face_center_tree', lambda: cKDTree(self.face_centers), self._tree_nbytes)
+
+    @property
+    def vertex_tree(self) -> cKDTree:
+        """顶点KD树"""
+        return self._derive(
+            'vertex_tree', lambda: cKDTree(np.asarray(self.mesh.vertices)), self._tree_nbytes
+        )
+
+    def surface_samples(self, count: int = SURFACE_SAMPLE_COUNT) -> Tuple[np.ndarray, np.ndarray]:
+        """固定种子的表面采样点及其面法向，同一点数只采样一次"""
+        def build():
+            points, face_indices = trimesh.sample.sample_surface(self.mesh, count, seed=0)
+            return points, self.face_normals[face_indices]
+
+        return self._derive(f'surface_samples_{count}', build)
+
+    def surface_tree(self, count: int = SURFACE_SAMPLE_COUNT) -> cKDTree:
+        """表面采样点的KD树，用于最近表面查询"""
+        return self._derive(
+            f'surface_tree_{count}', lambda: cKDTree(self.surface_samples(count)[0]), self._tree_nbytes
+        )
+
+    @staticmethod
+    def _tree_nbytes(tree: cKDTree) -> int:
+        """KD树占用估算：数据副本、索引和节点"""
+        return int(tree.data.nbytes + tree.indices.nbytes + tree.n * 48)
+
+
+class MeshContextStore:
+    """按网格哈希共享 MeshContext，按内存预算淘汰"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CONTEXT_BYTES):
+        self._cache = MeshCache(max_bytes)
+        self._lock = threading.Lock()
+
+    def get(self, mesh: trimesh.Trimesh, key: Optional[Hashable] = None) -> MeshContext:
+        """
+        获取网格上下文，不存在时创建
+
+        Args:
+            mesh: 网格
+            key: 网格内容哈希（或带变体的键），为空时按几何内容计算
+        """
+        key = key or self._cache.hash_mesh(mesh)
+        with self._lock:
+            context = self._cache.get(('context', key))
+            if context is None:
+                context = MeshContext(mesh, key, on_update=self._refresh)
+                self._cache.put(('context', key), context, context.nbytes)
+        return context
+
+    def lookup(self, key: Hashable) -> Optional[MeshContext]:
+        """按键查找已有上下文"""
+        return self._cache.get(('context', key))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取存储指标"""
+        return self._cache.get_metrics()
+
+    def _refresh(self, context: MeshContext):
+        """派生数据增加后重新计入内存占用，必要时淘汰其他上下文"""
+        self._cache.put(('context', context.mesh_hash), context, context.nbytes)
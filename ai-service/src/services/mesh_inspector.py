@@ -0,0 +1,297 @@
+"""
+网格文件检查与准入控制模块
+在 trimesh.load 之前只读取文件头（或做一次快速字节扫描）得到顶点/面数，
+据此估算峰值内存和处理耗时，并按全局内存预算准入并发任务
+"""
+
+import os
+import json
+import struct
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from services.streaming_sampler import STREAMING_FORMATS
+
+logger = logging.getLogger(__name__)
+
+# 可检查的格式
+INSPECTABLE_FORMATS = ('.obj', '.ply', '.stl', '.glb')
+# 允许上传但无法读取文件头的格式，按文件大小估算
+SIZE_ESTIMATED_FORMATS = ('.fbx',)
+
+# trimesh 加载后每个顶点/面的峰值内存（含法向、邻接、缓存等派生数组）
+BYTES_PER_VERTEX = 160
+BYTES_PER_FACE = 256
+# 文本格式解析时的额外内存（相对文件大小的倍数）
+TEXT_PARSE_OVERHEAD = 3.0
+# 无法读取文件头时，每字节文件大小对应的峰值内存
+BYTES_PER_FILE_BYTE = 8.0
+
+# 处理耗时估算：固定开销 + 每百万面耗时
+BASE_SECONDS = 0.5
+SECONDS_PER_MILLION_FACES = 2.5
+
+# 默认全局内存预算
+DEFAULT_MEMORY_BUDGET = 4 * 1024 * 1024 * 1024
+# 流式采样的内存占用（与文件大小无关，约为若干个分块）
+STREAMING_JOB_BYTES = 512 * 1024 * 1024
+
+# 字节扫描的块大小
+SCAN_CHUNK_BYTES = 16 * 1024 * 1024
+
+# GLB 分块类型
+GLB_MAGIC = b'glTF'
+GLB_JSON_CHUNK = 0x4E4F534A
+
+# 文件头损坏或字段缺失/类型不符时的异常（如 GLB JSON 中缺少访问器、序号越界）
+INSPECTION_ERRORS = (OSError, ValueError, struct.error, KeyError, IndexError, TypeError, AttributeError)
+
+
+class MeshInspector:
+    """只读文件头的网格规模检查"""
+
+    def inspect(self, file_path: str) -> Dict[str, Any]:
+        """
+        检查网格文件
+
+        Returns:
+            检查报告：format / file_size / vertex_count / face_count /
+            estimated_bytes / estimated_seconds / streamable / binary
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        file_size = os.path.getsize(file_path)
+        report = {
+            'format': extension,
+            'file_size': file_size,
+            'vertex_count': None,
+            'face_count': None,
+            'binary': None,
+            'supported': extension in INSPECTABLE_FORMATS + SIZE_ESTIMATED_FORMATS
+        }
+
+        try:
+            if extension == '.obj':
+                report.update(self._inspect_obj(file_path))
+            elif extension == '.ply':
+                report.update(self._inspect_ply(file_path))
+            elif extension == '.stl':
+                report.update(self._inspect_stl(file_path, file_size))
+            elif extension == '.glb':
+                report.update(self._inspect_glb(file_path))
+        except INSPECTION_ERRORS as e:
+            logger.warning(f"Header inspection failed for {file_path}: {str(e)}")
+            report['supported'] = False
+            report['error'] = str(e)
+
+        report.update(self._estimate(report))
+        report['streamable'] = self._is_streamable(report)
+        return report
+
+    def _estimate(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """由顶点/面数估算峰值内存和处理耗时"""
+        face_count = report['face_count']
+        if face_count is None:
+            # 无法获得计数时按文件大小粗略估计
+            estimated_bytes = int(report['file_size'] * BYTES_PER_FILE_BYTE)
+            face_count = report['file_size'] // 50
+        else:
+            estimated_bytes = report['vertex_count'] * BYTES_PER_VERTEX + face_count * BYTES_PER_FACE
+            if report['binary'] is False:
+                estimated_bytes += int(report['file_size'] * TEXT_PARSE_OVERHEAD)
+
+        return {
+            'estimated_bytes': int(estimated_bytes),
+            'estimated_seconds': round(BASE_SECONDS + face_count / 1e6 * SECONDS_PER_MILLION_FACES, 2)
+        }
+
+    def _is_streamable(self, report: Dict[str, Any]) -> bool:
+        """流式采样支持OBJ以及二进制STL/PLY"""
+        if report['format'] not in STREAMING_FORMATS or not report['supported']:
+            return False
+        return report['format'] == '.obj' or bool(report['binary'])
+
+    def _inspect_obj(self, file_path: str) -> Dict[str, Any]:
+        """OBJ：分块字节扫描统计以 'v ' / 'f ' 开头的行"""
+        vertex_count = 0
+        face_count = 0
+        with open(file_path, 'rb') as f:
+            # 在块前拼上上一块的最后一个字节，保证跨块的行首也能匹配
+            previous = b'\n'
+            while True:
+                chunk = f.read(SCAN_CHUNK_BYTES)
+                if not chunk:
+                    break
+                data = previous + chunk
+                vertex_count += data.count(b'\nv ')
+                face_count += data.count(b'\nf ')
+                previous = chunk[-1:]
+
+        return {'vertex_count': vertex_count, 'face_count': face_count, 'binary': False}
+
+    def _inspect_ply(self, file_path: str) -> Dict[str, Any]:
+        """PLY：读取头部中的元素数量"""
+        counts = {}
+        data_format = None
+        with open(file_path, 'rb') as f:
+            if f.readline().strip() != b'ply':
+                raise ValueError("Not a PLY file")
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ValueError("Unterminated PLY header")
+                tokens = line.decode('ascii', errors='replace').split()
+                if not tokens:
+                    continue
+                if tokens[0] == 'format':
+                    data_format = tokens[1]
+                elif tokens[0] == 'element':
+                    counts[tokens[1]] = int(tokens[2])
+                elif tokens[0] == 'end_header':
+                    break
+
+        return {
+            'vertex_count': counts.get('vertex', 0),
+            'face_count': counts.get('face', 0),
+            'binary': data_format != 'ascii'
+        }
+
+    def _inspect_stl(self, file_path: str, file_size: int) -> Dict[str, Any]:
+        """STL：二进制读取三角形数量字段，ASCII 扫描 'endfacet'"""
+        with open(file_path, 'rb') as f:
+            header = f.read(84)
+
+        if len(header) == 84:
+            face_count = struct.unpack('<I', header[80:84])[0]
+            if file_size == 84 + face_count * 50:
+                # 二进制STL每个三角形有3个独立顶点
+                return {'vertex_count': face_count * 3, 'face_count': face_count, 'binary': True}
+
+        face_count = 0
+        with open(file_path, 'rb') as f:
+            previous = b''
+            while True:
+                chunk = f.read(SCAN_CHUNK_BYTES)
+                if not chunk:
+                    break
+                # 保留上一块末尾，避免关键字被切断
+                data = previous + chunk
+                face_count += data.count(b'endfacet')
+                previous = chunk[-7:]
+
+        return {'vertex_count': face_count * 3, 'face_count': face_count, 'binary': False}
+
+    def _inspect_glb(self, file_path: str) -> Dict[str, Any]:
+        """GLB：解析 JSON 分块，累计各图元的 POSITION 和 indices 访问器数量"""
+        with open(file_path, 'rb') as f:
+            magic, _, _ = struct.unpack('<4sII', f.read(12))
+            if magic != GLB_MAGIC:
+                raise ValueError("Not a GLB file")
+            chunk_length, chunk_type = struct.unpack('<II', f.read(8))
+            if chunk_type != GLB_JSON_CHUNK:
+                raise ValueError("GLB file has no JSON chunk")
+            document = json.loads(f.read(chunk_length))
+
+        accessors = document.get('accessors', [])
+        vertex_count = 0
+        face_count = 0
+        for mesh in document.get('meshes', []):
+            for primitive in mesh.get('primitives', []):
+                positions = accessors[primitive['attributes']['POSITION']]['count']
+                vertex_count += positions
+                if 'indices' in primitive:
+                    face_count += accessors[primitive['indices']]['count'] // 3
+                else:
+                    face_count += positions // 3
+
+        return {'vertex_count': vertex_count, 'face_count': face_count, 'binary': True}
+
+
+class AdmissionController:
+    """按估算峰值内存的全局准入控制"""
+
+    def __init__(
+        self,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET,
+        max_job_bytes: Optional[int] = None
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        # 单个任务可整体加载的上限，超过时走流式采样或拒绝
+        self.max_job_bytes = max_job_bytes or memory_budget_bytes // 2
+        self._reserved = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+        # 指标
+        self._decisions = {'load': 0, 'stream': 0, 'reject': 0}
+        self._waiting = 0
+
+    def decide(self, report: Dict[str, Any]) -> str:
+        """
+        决定任务的处理方式（只做判断，决定在 reserve 时计入指标）
+
+        Returns:
+            'load'（整体加载）/ 'stream'（流式采样）/ 'reject'（拒绝）
+        """
+        if not report['supported']:
+            decision = 'reject'
+        elif report['estimated_bytes'] <= self.max_job_bytes:
+            decision = 'load'
+        elif report['streamable']:
+            decision = 'stream'
+        else:
+            decision = 'reject'
+        return decision
+
+    def reservation_bytes(self, report: Dict[str, Any], decision: str) -> int:
+        """任务需要预留的内存"""
+        if decision == 'stream':
+            return STREAMING_JOB_BYTES
+        return report['estimated_bytes']
+
+    @asynccontextmanager
+    async def reserve(self, report: Dict[str, Any]) -> AsyncIterator[None]:
+        """
+        按检查报告中的准入决定预留内存，预算不足时等待其他任务释放
+
+        Raises:
+            ValueError: 准入决定为拒绝
+        """
+        decision = report['admission']
+        self._decisions[decision] += 1
+        if decision == 'reject':
+            raise ValueError(
+                f"Mesh rejected: {report['format']} file, estimated {report['estimated_bytes']} bytes"
+            )
+
+        # 单个预留不超过总预算，避免永远等待
+        nbytes = min(self.reservation_bytes(report, decision), self.memory_budget_bytes)
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+
+        async with self._condition:
+            self._waiting += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: self._reserved + nbytes <= self.memory_budget_bytes
+                )
+            finally:
+                self._waiting -= 1
+            self._reserved += nbytes
+
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._reserved -= nbytes
+                self._condition.notify_all()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取准入指标"""
+        return {
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'max_job_bytes': self.max_job_bytes,
+            'reserved_bytes': self._reserved,
+            'waiting_jobs': self._waiting,
+            'decisions': dict(self._decisions)
+        }
@@ -0,0 +1,284 @@
+"""
+几何部位分割模块
+在稀疏顶点邻接图上用平均测地距离检测末端，再用简单的空间规则
+把末端分支标注为头、手臂/手、腿/脚、尾巴、翅膀，输出逐面的部位标签
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+import trimesh
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial import cKDTree
+
+from services.mesh_context import MeshContext
+
+logger = logging.getLogger(__name__)
+
+# 部位标签（数组中保存下标）
+PART_LABELS = ('torso', 'head', 'arm', 'hand', 'leg', 'foot', 'tail', 'wing')
+PART_INDEX = {name: i for i, name in enumerate(PART_LABELS)}
+
+# 提示词区域到部位标签的映射
+REGION_PARTS = {
+    'hand': ('hand',),
+    'finger': ('hand',),
+    'arm': ('arm', 'hand'),
+    'leg': ('leg', 'foot'),
+    'foot': ('foot',),
+    'spine': ('torso',),
+    'neck': ('head',),
+    'head': ('head',),
+    'tail': ('tail',),
+    'wing': ('wing',)
+}
+
+
+class PartSegmenter:
+    """基于平均测地距离末端检测的快速部位分割"""
+
+    def __init__(
+        self,
+        num_sources: int = 16,
+        protrusion: float = 0.25,
+        branch_fraction: float = 0.5,
+        distal_fraction: float = 0.3,
+        wing_area_fraction: float = 0.12
+    ):
+        # 估计平均测地距离所用的源点数
+        self.num_sources = num_sources
+        # 末端的平均测地距离至少比核心高出该比例（球体等无突出形状不会产生末端）
+        self.protrusion = protrusion
+        # 分支覆盖从末端到核心测地路径的远端比例
+        self.branch_fraction = branch_fraction
+        # 手/脚占手臂/腿分支的远端比例
+        self.distal_fraction = distal_fraction
+        # 侧向上方分支面积占比超过该值时视为翅膀
+        self.wing_area_fraction = wing_area_fraction
+
+    def segment(self, mesh: trimesh.Trimesh, context: Optional[MeshContext] = None) -> np.ndarray:
+        """
+        计算逐面部位标签
+
+        约定 +Y 朝上、X 为左右方向（常见 OBJ / glTF 朝向）
+
+        Args:
+            mesh: 输入网格
+            context: 共享的网格上下文（复用邻接图和面面积），为空时临时构建
+
+        Returns:
+            (F,) int8 数组，取值为 PART_LABELS 的下标
+        """
+        context = context or MeshContext(mesh, None)
+        vertices = np.asarray(mesh.vertices)
+        graph = self._adjacency_graph(context)
+
+        # 1. 平均测地距离（AGD）：末端处最大，躯干核心处最小
+        agd = self._average_geodesic_distance(graph, vertices)
+        core = int(np.argmin(agd))
+        core_distance = dijkstra(graph, directed=False, indices=core)
+
+        # 2. AGD 的局部极大值作为末端
+        extremities = self._find_extremities(graph, vertices, agd)
+
+        vertex_labels = np.full(len(vertices), PART_INDEX['torso'], dtype=np.int8)
+        if len(extremities) > 0:
+            vertex_labels = self._label_branches(
+                context, graph, vertices, core, core_distance, extremities, vertex_labels
+            )
+
+        # 3. 顶点标签转为面标签（两个顶点一致时取其值，否则取第一个顶点）
+        corner_labels = vertex_labels[mesh.faces]
+        face_labels = np.where(
+            corner_labels[:, 1] == corner_labels[:, 2], corner_labels[:, 1], corner_labels[:, 0]
+        )
+
+        logger.info(
+            f"Part segmentation: {len(extremities)} extremities, "
+            f"labels={self.summarize(face_labels)}"
+        )
+        return face_labels.astype(np.int8)
+
+    def summarize(self, face_labels: np.ndarray) -> Dict[str, int]:
+        """统计各部位的面数"""
+        counts = np.bincount(face_labels, minlength=len(PART_LABELS))
+        return {name: int(counts[i]) for i, name in enumerate(PART_LABELS) if counts[i] > 0}
+
+    def face_weights(self, face_labels: np.ndarray, region_weights: Dict[str, float]) -> np.ndarray:
+        """
+        把提示词区域权重映射为逐面采样权重
+
+        同一部位被多个区域覆盖时取最大权重，未提及的部位权重为1
+        """
+        label_weights = np.ones(len(PART_LABELS), dtype=np.float64)
+        for region, weight in region_weights.items():
+            for part in REGION_PARTS.get(region, ()):
+                label_weights[PART_INDEX[part]] = max(label_weights[PART_INDEX[part]], weight)
+        return label_weights[face_labels]
+
+    def _adjacency_graph(self, context: MeshContext) -> csr_matrix:
+        """
+        以边长为权重的对称稀疏顶点邻接图
+
+        上传模型常由多个互不相连的部件拼成（如单独建模的四肢），
+        每个非主体连通分量以最近的顶点对连到主体上
+        """
+        mesh = context.mesh
+        vertices = np.asarray(mesh.vertices)
+        num_vertices = len(vertices)
+        graph = context.vertex_graph
+        num_components, component = connected_components(graph, directed=False)
+        if num_components == 1:
+            return graph
+
+        # 连接到面积最大的分量
+        component_area = np.bincount(
+            component[mesh.faces[:, 0]], weights=context.face_areas, minlength=num_components
+        )
+        main = int(np.argmax(component_area))
+        in_main = component == main
+
+        distance, nearest = cKDTree(vertices[in_main]).query(vertices[~in_main])
+        others = np.flatnonzero(~in_main)
+        order = np.lexsort((distance, component[others]))
+        first = order[np.unique(component[others][order], return_index=True)[1]]
+
+        sources = others[first]
+        targets = np.flatnonzero(in_main)[nearest[first]]
+        lengths = np.maximum(distance[first], 1e-12)
+        bridges = csr_matrix(
+            (np.concatenate([lengths, lengths]),
+             (np.concatenate([sources, targets]), np.concatenate([targets, sources]))),
+            shape=(num_vertices, num_vertices)
+        )
+        return (graph + bridges).tocsr()
+
+    def _average_geodesic_distance(self, graph: csr_matrix, vertices: np.ndarray) -> np.ndarray:
+        """以空间上分散的少量源点近似每个顶点的平均测地距离"""
+        # 按最远点方式选取分散的源点，避免对全部顶点求最短路
+        count = min(self.num_sources, len(vertices))
+        sources = [int(np.argmax(np.linalg.norm(vertices - vertices.mean(axis=0), axis=1)))]
+        nearest = np.linalg.norm(vertices - vertices[sources[0]], axis=1)
+        for _ in range(count - 1):
+            sources.append(int(np.argmax(nearest)))
+            nearest = np.minimum(nearest, np.linalg.norm(vertices - vertices[sources[-1]], axis=1))
+
+        distance = dijkstra(graph, directed=False, indices=sources)
+        distance[~np.isfinite(distance)] = 0.0
+        return distance.mean(axis=0)
+
+    def _find_extremities(
+        self,
+        graph: csr_matrix,
+        vertices: np.ndarray,
+        agd: np.ndarray
+    ) -> np.ndarray:
+        """AGD 的局部极大值，空间聚类后每簇保留 AGD 最大的顶点"""
+        # 邻居中的最大 AGD（按CSR行做分段最大值）
+        neighbor_values = agd[graph.indices]
+        row_has_neighbors = np.diff(graph.indptr) > 0
+        neighbor_max = np.full(len(vertices), np.inf)
+        starts = graph.indptr[:-1][row_has_neighbors]
+        neighbor_max[row_has_neighbors] = np.maximum.reduceat(neighbor_values, starts)
+
+        threshold = (1.0 + self.protrusion) * agd.min()
+        candidates = np.flatnonzero((agd >= neighbor_max) & (agd > threshold))
+        if len(candidates) == 0:
+            return candidates
+
+        # 距离相近的候选合并为一个末端
+        radius = 0.05 * float(np.linalg.norm(vertices.max(axis=0) - vertices.min(axis=0)))
+        pairs = cKDTree(vertices[candidates]).query_pairs(radius, output_type='ndarray')
+        cluster_graph = csr_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(candidates), len(candidates))
+        )
+        _, cluster = connected_components(cluster_graph, directed=False)
+
+        order = np.lexsort((-agd[candidates], cluster))
+        first = np.searchsorted(cluster[order], np.arange(cluster.max() + 1))
+        return candidates[order[first]]
+
+    def _label_branches(
+        self,
+        context: MeshContext,
+        graph: csr_matrix,
+        vertices: np.ndarray,
+        core: int,
+        core_distance: np.ndarray,
+        extremities: np.ndarray,
+        vertex_labels: np.ndarray
+    ) -> np.ndarray:
+        """把每个末端的分支顶点标注为对应部位"""
+        # 多源最短路：每个顶点最近的末端及到它的测地距离
+        extremity_distance, _, source = dijkstra(
+            graph, directed=False, indices=extremities, min_only=True, return_predecessors=True
+        )
+        branch_length = core_distance[extremities]
+
+        # 源顶点（末端）到分支序号的映射
+        lookup = np.full(len(vertices), -1, dtype=np.int64)
+        lookup[extremities] = np.arange(len(extremities))
+        branch = np.where(source >= 0, lookup[np.maximum(source, 0)], -1)
+
+        in_branch = (branch >= 0) & (
+            extremity_distance < self.branch_fraction * branch_length[np.maximum(branch, 0)]
+        )
+        distal = in_branch & (
+            extremity_distance < self.distal_fraction * branch_length[np.maximum(branch, 0)]
+        )
+
+        # 各分支面积占比（按顶点面积近似，复用上下文中的顶点重心面积）
+        vertex_area = context.vertex_areas
+        branch_area = np.bincount(
+            branch[in_branch], weights=vertex_area[in_branch], minlength=len(extremities)
+        ) / max(context.surface_area, 1e-12)
+
+        parts = self._classify_extremities(vertices, vertices[core], extremities, branch_area)
+
+        for i, part in enumerate(parts):
+            members = in_branch & (branch == i)
+            vertex_labels[members] = PART_INDEX[part]
+            if part == 'arm':
+                vertex_labels[members & distal] = PART_INDEX['hand']
+            elif part == 'leg':
+                vertex_labels[members & distal] = PART_INDEX['foot']
+
+        return vertex_labels
+
+    def _classify_extremities(
+        self,
+        vertices: np.ndarray,
+        center: np.ndarray,
+        extremities: np.ndarray,
+        branch_area: np.ndarray
+    ) -> List[str]:
+        """根据末端相对躯干核心的方向给分支命名"""
+        scale = max(float(np.ptp(vertices, axis=0).max()), 1e-12)
+        rel = (vertices[extremities] - center) / scale
+
+        parts = []
+        head_assigned = False
+        # 先处理最靠上的末端，便于确定唯一的头部
+        for i in np.argsort(-rel[:, 1]):
+            x, y, z = rel[i]
+            lateral, forward = abs(x), abs(z)
+            if not head_assigned and y > 0.1 and y > lateral and y > forward:
+                part = 'head'
+                head_assigned = True
+            elif y < -0.1 and -y >= max(lateral, forward):
+                part = 'leg'
+            elif lateral >= forward:
+                part = 'wing' if (y > 0 and branch_area[i] > self.wing_area_fraction) else 'arm'
+            else:
+                part = 'tail'
+            parts.append((i, part))
+
+        # 水平方向有多个末端且没有朝上的头部时（如四足动物），面积最大的一支视为头部
+        horizontal = [i for i, part in parts if part == 'tail']
+        if not head_assigned and len(horizontal) >= 2:
+            head = max(horizontal, key=lambda i: branch_area[i])
+            parts = [(i, 'head' if i == head else part) for i, part in parts]
+
+        return [part for _, part in sorted(parts)]
@@ -0,0 +1,149 @@
+"""
+流水线执行模块
+把请求的处理阶段分配给各自的工作协程，阶段之间用有界队列连接，
+不同请求的不同阶段可以同时进行，吞吐量由最慢的阶段而不是各阶段耗时之和决定
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 阶段处理函数：接收作业的值字典并原地写入输出
+StageHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class PipelineJob:
+    """流水线中的一个作业"""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = values
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.timings: Dict[str, float] = {}
+
+
+class StagePipeline:
+    """以有界队列连接、每个阶段独立配置并发数的流水线"""
+
+    def __init__(self, stages: Sequence[Tuple[str, StageHandler, int]], queue_size: int = 8):
+        """
+        Args:
+            stages: (阶段名, 处理函数, 并发数) 列表，按执行顺序排列
+            queue_size: 每个阶段输入队列的容量，队列满时上游阶段等待（背压）
+        """
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._stats = {
+            name: {'processed': 0, 'failed': 0, 'busy': 0, 'total_seconds': 0.0}
+            for name, _, _ in self.stages
+        }
+
+    @property
+    def running(self) -> bool:
+        """流水线是否已启动"""
+        return bool(self._workers)
+
+    def start(self):
+        """创建各阶段队列和工作协程（需在事件循环中调用）"""
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        for index, (name, handler, concurrency) in enumerate(self.stages):
+            for worker_id in range(concurrency):
+                self._workers.append(asyncio.create_task(
+                    self._worker(index, name, handler), name=f"pipeline-{name}-{worker_id}"
+                ))
+        logger.info(f"Pipeline started: {[(name, concurrency) for name, _, concurrency in self.stages]}")
+
+    async def stop(self):
+        """停止所有工作协程，未完成的作业被取消"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for queue in self._queues:
+            while not queue.empty():
+                job = queue.get_nowait()
+                if not job.future.done():
+                    job.future.cancel()
+        self._queues = []
+
+    async def submit(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        提交作业并等待其完成
+
+        Returns:
+            作业最终的值字典（输入与各阶段输出）
+        """
+        self.start()
+        job = PipelineJob(dict(values))
+        await self._queues[0].put(job)
+        try:
+            return await job.future
+        finally:
+            # 调用方取消时让流水线跳过该作业的剩余阶段
+            if not job.future.done():
+                job.future.cancel()
+
+    async def _worker(self, index: int, name: str, handler: StageHandler):
+        """阶段工作协程：取作业、处理、送入下一阶段"""
+        queue = self._queues[index]
+        next_queue: Optional[asyncio.Queue] = (
+            self._queues[index + 1] if index + 1 < len(self._queues) else None
+        )
+        stats = self._stats[name]
+
+        while True:
+            job = await queue.get()
+            try:
+                if job.future.done():
+                    continue
+
+                stats['busy'] += 1
+                start_time = time.perf_counter()
+                try:
+                    await handler(job.values)
+                except Exception as e:
+                    stats['failed'] += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                    continue
+                finally:
+                    elapsed = time.perf_counter() - start_time
+                    job.timings[name] = elapsed
+                    stats['total_seconds'] += elapsed
+                    stats['busy'] -= 1
+
+                stats['processed'] += 1
+                if next_queue is not None:
+                    await next_queue.put(job)
+                elif not job.future.done():
+                    job.values['stage_timings'] = dict(job.timings)
+                    job.future.set_result(job.values)
+            finally:
+                queue.task_done()
+
+    def is_idle(self, name: str) -> bool:
+        """该阶段及其上游阶段是否都没有排队或正在处理的作业"""
+        for index, (stage_name, _, _) in enumerate(self.stages):
+            if self._stats[stage_name]['busy'] or (self._queues and self._queues[index].qsize()):
+                return False
+            if stage_name == name:
+                return True
+        raise KeyError(f"Unknown pipeline stage: {name}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取各阶段的队列深度、处理数量和耗时"""
+        metrics = {}
+        for index, (name, _, concurrency) in enumerate(self.stages):
+            metrics[name] = {
+                **self._stats[name],
+                'concurrency': concurrency,
+                'queued': self._queues[index].qsize() if self._queues else 0
+            }
+        return metrics
@@ -0,0 +1,67 @@
+"""
+点云金字塔模块
+嵌套采样模式（均匀、FPS）的点云按嵌套顺序（1k ⊂ 2k ⊂ 4k ⊂ 8k ⊂ 16k）保存，
+不超过已采样层级的请求直接取前缀切片，无需重新采样；
+泊松圆盘的前缀不满足最小间距覆盖，只按请求点数整体缓存
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+# 金字塔层级（点数）
+PYRAMID_LEVELS = (1024, 2048, 4096, 8192, 16384)
+PYRAMID_MAX_POINTS = PYRAMID_LEVELS[-1]
+
+# 任意前缀仍是同模式合理子采样的采样模式（均匀为随机顺序，FPS为选择顺序）
+NESTED_SAMPLING_MODES = ('uniform', 'fps')
+
+
+def pyramid_level(count: int, sampling_mode: str) -> int:
+    """
+    满足请求点数时实际采样的点数
+
+    嵌套模式取不小于 count 的最小层级，之后更小的请求都能取前缀；
+    其他模式按 count 原样采样
+    """
+    if sampling_mode not in NESTED_SAMPLING_MODES:
+        return count
+    return next((level for level in PYRAMID_LEVELS if level >= count), count)
+
+
+class PointCloudPyramid:
+    """嵌套多分辨率点云"""
+
+    def __init__(self, point_cloud: np.ndarray, normalization: Optional[Tuple[np.ndarray, float]] = None):
+        """
+        Args:
+            point_cloud: (N, 6) 已归一化的点云，行顺序须保证任意前缀都是合理的子采样
+                （均匀模式为随机顺序，FPS模式为选择顺序）；其他模式只按原点数整体取用
+            normalization: 点云的归一化变换 (center, scale)，前缀切片与整体共用同一变换
+        """
+        # 坐标保持 float32 精度，单位法向用 float16 存储即可
+        self.points = np.ascontiguousarray(point_cloud[:, :3], dtype=np.float32)
+        self.normals = np.ascontiguousarray(point_cloud[:, 3:6], dtype=np.float16)
+        self.normalization = normalization
+
+    @property
+    def max_count(self) -> int:
+        """可提供的最大点数"""
+        return len(self.points)
+
+    @property
+    def levels(self) -> Tuple[int, ...]:
+        """当前金字塔可提供的层级"""
+        return tuple(level for level in PYRAMID_LEVELS if level <= self.max_count)
+
+    @property
+    def nbytes(self) -> int:
+        """占用字节数"""
+        return self.points.nbytes + self.normals.nbytes
+
+    def take(self, count: int) -> np.ndarray:
+        """取前 count 个点，返回 (count, 6) float32 点云"""
+        if count > self.max_count:
+            raise ValueError(f"Pyramid holds {self.max_count} points, {count} requested")
+        return np.concatenate(
+            [self.points[:count], self.normals[:count].astype(np.float32)], axis=1
+        )
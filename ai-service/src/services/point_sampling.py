@@ -0,0 +1,370 @@
+"""
+点云采样模块
+提供面向覆盖率的采样方式（最远点采样、泊松圆盘采样），
+在较少的点数下也能覆盖手指、尾巴等细小部位
+"""
+
+import os
+import numpy as np
+import trimesh
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# 支持的采样模式
+SAMPLING_MODES = ('uniform', 'fps', 'poisson_disk')
+
+
+class PointSampler:
+    """覆盖率导向的点云采样器"""
+
+    def __init__(
+        self,
+        oversample_factor: int = 4,
+        parallel_face_threshold: int = 500_000,
+        chunk_faces: int = 250_000,
+        max_workers: Optional[int] = None
+    ):
+        # 先在表面上密集过采样，再从中挑选覆盖性好的子集
+        self.oversample_factor = oversample_factor
+        # 面数超过阈值时按面分块并行采样
+        self.parallel_face_threshold = parallel_face_threshold
+        self.chunk_faces = chunk_faces
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def sample(
+        self,
+        mesh: trimesh.Trimesh,
+        count: int,
+        mode: str = 'uniform',
+        seed: Optional[int] = None,
+        face_weights: Optional[np.ndarray] = None,
+        area_cdf: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按指定模式在网格表面采样
+
+        Args:
+            mesh: 输入网格
+            count: 采样点数
+            mode: 采样模式 uniform / fps / poisson_disk
+            seed: 随机种子
+            face_weights: 逐面采样权重倍数（与面积相乘），None表示纯面积加权
+            area_cdf: 预先计算的面面积累积分布（来自共享的网格上下文）
+
+        Returns:
+            (points, normals) 两个 (count, 3) 数组
+        """
+        if mode not in SAMPLING_MODES:
+            raise ValueError(f"Unsupported sampling mode: {mode}")
+
+        if mode == 'uniform':
+            return self.surface_sample(mesh, count, seed, face_weights, area_cdf)
+
+        # 1. 密集过采样
+        dense_points, dense_normals = self.surface_sample(
+            mesh, count * self.oversample_factor, seed, face_weights, area_cdf
+        )
+
+        # 2. 从过采样中挑选子集
+        if mode == 'fps':
+            selected = self.farthest_point_sampling(dense_points, count, seed)
+        else:
+            selected = self.poisson_disk_sampling(dense_points, count, float(mesh.area), seed)
+
+        return dense_points[selected], dense_normals[selected]
+
+    def surface_sample(
+        self,
+        mesh: trimesh.Trimesh,
+        count: int,
+        seed: Optional[int] = None,
+        face_weights: Optional[np.ndarray] = None,
+        area_cdf: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """按面积（乘以可选的逐面权重）采样表面点，大网格自动切换为分块并行采样"""
+        if len(mesh.faces) >= self.parallel_face_threshold:
+            return self.parallel_surface_sample(
+                np.asarray(mesh.vertices), np.asarray(mesh.faces), count, seed, face_weights
+            )
+
+        # 已有面积累积分布时直接二分选面，省去每次重新计算面积
+        if area_cdf is not None and face_weights is None:
+            rng = np.random.default_rng(seed)
+            face_index = np.minimum(
+                np.searchsorted(area_cdf, rng.random(count) * area_cdf[-1], side='right'),
+                len(area_cdf) - 1
+            )
+            points, _ = sample_points_on_triangles(mesh.vertices[mesh.faces[face_index]], rng)
+            return points, mesh.face_normals[face_index]
+
+        face_weight = None if face_weights is None else mesh.area_faces * face_weights
+        points, face_indices = trimesh.sample.sample_surface(mesh, count, face_weight=face_weight, seed=seed)
+        return points, mesh.face_normals[face_indices]
+
+    def parallel_surface_sample(
+        self,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        count: int,
+        seed: Optional[int] = None,
+        face_weights: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        分块并行的面积加权表面采样
+
+        1. 各线程计算本块的面面积及其总和（numpy运算期间释放GIL）
+        2. 用多项分布按块面积分配点数，等价于单次采样中每个点独立按面积选面
+        3. 每块使用由主种子派生的独立随机流完成采样，结果与线程调度无关
+
+        Returns:
+            (points, normals) 两个 (count, 3) 数组
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        chunk_bounds = [
+            (start, min(start + self.chunk_faces, len(faces)))
+            for start in range(0, len(faces), self.chunk_faces)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # 第一遍：各块面积
+            chunk_areas = list(executor.map(
+                lambda bounds: self._chunk_face_areas(
+                    vertices, faces[bounds[0]:bounds[1]],
+                    None if face_weights is None else face_weights[bounds[0]:bounds[1]]
+                ),
+                chunk_bounds
+            ))
+            area_totals = np.array([areas.sum() for areas in chunk_areas])
+
+            # 按面积比例分配各块点数
+            master_rng = np.random.default_rng(seed_sequence)
+            budgets = master_rng.multinomial(count, area_totals / area_totals.sum())
+            chunk_seeds = seed_sequence.spawn(len(chunk_bounds))
+
+            # 第二遍：各块独立采样
+            results = list(executor.map(
+                lambda args: self._sample_chunk(vertices, faces[args[0][0]:args[0][1]], *args[1:]),
+                zip(chunk_bounds, chunk_areas, budgets, chunk_seeds)
+            ))
+
+        points = np.concatenate([r[0] for r in results], axis=0)
+        normals = np.concatenate([r[1] for r in results], axis=0)
+
+        # 打乱块顺序，使任意前缀仍是均匀样本
+        order = master_rng.permutation(count)
+        return points[order], normals[order]
+
+    @staticmethod
+    def _chunk_face_areas(
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        weights: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """计算一块面的（加权）面积"""
+        areas = triangle_areas(vertices[faces])
+        return areas if weights is None else areas * weights
+
+    @staticmethod
+    def _sample_chunk(
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        areas: np.ndarray,
+        budget: int,
+        chunk_seed: np.random.SeedSequence
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """在一块面上按面积采样 budget 个点"""
+        if budget == 0:
+            return np.empty((0, 3)), np.empty((0, 3))
+
+        rng = np.random.default_rng(chunk_seed)
+        face_index = choose_faces_by_area(areas, budget, rng)
+        return sample_points_on_triangles(vertices[faces[face_index]], rng)
+
+    def farthest_point_sampling(
+        self,
+        points: np.ndarray,
+        count: int,
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        增量式最远点采样
+
+        所有候选点建一棵KD树；每次迭代只有距新选中点不超过
+        当前最大最近距离的候选点会被更新，因此用球查询取出这部分点，
+        再用向量化的 np.minimum 更新最近距离
+
+        Returns:
+            选中点的索引，按选择顺序排列（任意前缀都是覆盖良好的子集）
+        """
+        num_points = len(points)
+        if count >= num_points:
+            return np.arange(num_points)
+
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        tree = cKDTree(points)
+
+        selected = np.empty(count, dtype=np.int64)
+        selected[0] = rng.integers(num_points)
+
+        min_dist = np.full(num_points, np.inf, dtype=np.float32)
+        farthest_dist = np.inf
+
+        for i in range(1, count):
+            current = points[selected[i - 1]]
+            if np.isinf(farthest_dist):
+                affected = np.arange(num_points)
+            else:
+                affected = np.asarray(
+                    tree.query_ball_point(current, np.sqrt(farthest_dist)), dtype=np.int64
+                )
+
+            diff = points[affected] - current
+            dist = np.einsum('ij,ij->i', diff, diff)
+            min_dist[affected] = np.minimum(min_dist[affected], dist)
+
+            selected[i] = int(np.argmax(min_dist))
+            farthest_dist = float(min_dist[selected[i]])
+
+        return selected
+
+    def poisson_disk_sampling(
+        self,
+        points: np.ndarray,
+        count: int,
+        surface_area: float,
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        基于过采样的泊松圆盘采样（随机顺序的飞镖投掷）
+
+        半径由表面积与目标点数估算，候选点邻域通过KD树一次性查询；
+        接受点不足时按到已选集合的距离补齐，超出时截断
+
+        Returns:
+            选中点的索引
+        """
+        num_points = len(points)
+        if count >= num_points:
+            return np.arange(num_points)
+
+        rng = np.random.default_rng(seed)
+
+        # 随机最大泊松圆盘的密度低于六边形排布，半径取略小的值
+        radius = 0.65 * np.sqrt(2.0 * surface_area / (np.sqrt(3.0) * count))
+
+        order = rng.permutation(num_points)
+        tree = cKDTree(points)
+        neighbors = tree.query_ball_point(points[order], radius, return_sorted=False)
+
+        available = np.ones(num_points, dtype=bool)
+        accepted = []
+        for idx, nbrs in zip(order, neighbors):
+            if not available[idx]:
+                continue
+            accepted.append(idx)
+            available[nbrs] = False
+
+        accepted = np.asarray(accepted, dtype=np.int64)
+        if len(accepted) >= count:
+            # 接受顺序本身是随机的，截断前缀仍然均匀
+            return accepted[:count]
+
+        # 点数不足：从剩余候选中挑选离已选集合最远的点补齐
+        remaining = np.setdiff1d(np.arange(num_points), accepted, assume_unique=True)
+        dist, _ = cKDTree(points[accepted]).query(points[remaining])
+        fill = remaining[np.argsort(-dist)[:count - len(accepted)]]
+        return np.concatenate([accepted, fill])
+
+
+def triangle_areas(triangles: np.ndarray) -> np.ndarray:
+    """计算 (N, 3, 3) 三角形数组的面积"""
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return 0.5 * np.sqrt(np.einsum('ij,ij->i', cross, cross))
+
+
+def choose_faces_by_area(areas: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    """按面积累积分布随机选面"""
+    cdf = np.cumsum(areas)
+    face_index = np.searchsorted(cdf, rng.random(count) * cdf[-1], side='right')
+    return np.minimum(face_index, len(areas) - 1)
+
+
+def sample_points_on_triangles(
+    triangles: np.ndarray,
+    rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """在每个三角形内均匀采样一个点，返回点坐标和面法向"""
+    count = len(triangles)
+
+    # 三角形内均匀的重心坐标
+    u, v = rng.random((2, count))
+    flip = u + v > 1
+    u[flip] = 1 - u[flip]
+    v[flip] = 1 - v[flip]
+
+    edge_a = triangles[:, 1] - triangles[:, 0]
+    edge_b = triangles[:, 2] - triangles[:, 0]
+    points = triangles[:, 0] + u[:, None] * edge_a + v[:, None] * edge_b
+
+    normals = np.cross(edge_a, edge_b)
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    normals = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+    return points, normals
+
+
+def point_cloud_normalization(points: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    点云归一化变换 (center, scale)：normalized = (points - center) / scale
+
+    以采样点包围盒中心为原点，最大坐标分量缩放到 0.9995
+    """
+    bounds = np.array([points.min(axis=0), points.max(axis=0)])
+    center = (bounds[0] + bounds[1]) / 2
+    scale = float(np.abs(points - center).max()) / 0.9995
+    return center, scale
+
+
+def normalize_point_cloud(
+    points: np.ndarray,
+    normals: np.ndarray,
+    normalization: Optional[Tuple[np.ndarray, float]] = None
+) -> np.ndarray:
+    """归一化坐标并拼接法向量，返回 (N, 6) float32 点云；变换为空时按采样点计算"""
+    center, scale = normalization or point_cloud_normalization(points)
+
+    normalized_points = (points - center) / scale
+
+    # 组合点和法向量
+    point_cloud = np.concatenate([normalized_points, normals], axis=1)
+
+    return point_cloud.astype(np.float32)
+
+
+def mesh_file_to_point_cloud(mesh_file_path: str, sampling_strategy: Dict[str, Any]) -> np.ndarray:
+    """
+    网格文件转点云（供进程池中的工作进程调用）
+
+    只依赖 trimesh / numpy，不访问模型和父进程中的缓存
+    """
+    # 延迟导入，避免模块间循环依赖
+    from services.sparse_voxel import SparseVoxelRemesher
+    from services.mesh_cleanup import MeshCleaner
+
+    mesh, _ = MeshCleaner().clean(trimesh.load(mesh_file_path, force='mesh'))
+
+    if sampling_strategy.get('apply_marching_cubes', False):
+        mesh = SparseVoxelRemesher().remesh(mesh, sampling_strategy.get('octree_depth', 7))
+
+    points, normals = PointSampler().sample(
+        mesh,
+        sampling_strategy.get('sampling_count', 8192),
+        sampling_strategy.get('sampling_mode', 'uniform')
+    )
+    return normalize_point_cloud(points, normals)
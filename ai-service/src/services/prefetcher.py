@@ -0,0 +1,110 @@
+"""
+几何预处理预取模块
+上传完成后在后台低优先级地解析、清理网格并生成点云金字塔，
+结果写入网格缓存，/process 到来时几何阶段通常可以直接命中缓存
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class GeometryPrefetcher:
+    """可取消的低优先级几何预取"""
+
+    def __init__(self, wrapper, max_concurrent: int = 1, poll_interval: float = 0.05):
+        """
+        Args:
+            wrapper: MagicArticulateWrapper，预取通过它的点云处理流程写入缓存
+            max_concurrent: 同时运行的预取任务数
+            poll_interval: 等待空闲时的轮询间隔（秒）
+        """
+        self.wrapper = wrapper
+        self.max_concurrent = max_concurrent
+        self.poll_interval = poll_interval
+
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 被前台请求等待的预取任务，不再让行
+        self._promoted: Set[str] = set()
+        self._foreground = 0
+        self._running = 0
+        self._stats = {'scheduled': 0, 'completed': 0, 'cancelled': 0, 'failed': 0}
+
+    def schedule(self, file_path: str, strategy: Dict[str, Any]) -> asyncio.Task:
+        """为文件安排预取，同一文件已有任务时先取消旧任务"""
+        self.cancel(file_path)
+        task = asyncio.create_task(self._run(file_path, strategy))
+        self._tasks[file_path] = task
+        self._stats['scheduled'] += 1
+        return task
+
+    def cancel(self, file_path: str) -> bool:
+        """取消文件的预取任务"""
+        task = self._tasks.pop(file_path, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        self._stats['cancelled'] += 1
+        return True
+
+    def cancel_all(self):
+        """取消全部预取任务"""
+        for file_path in list(self._tasks):
+            self.cancel(file_path)
+
+    @asynccontextmanager
+    async def foreground(self, file_path: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        标记一个前台请求
+
+        前台请求进行期间新的预取任务让行；
+        若该文件的预取已在进行或排队，提升其优先级并等待它完成，之后直接命中缓存
+        """
+        self._foreground += 1
+        try:
+            task = self._tasks.get(file_path) if file_path else None
+            if task is not None and not task.done():
+                self._promoted.add(file_path)
+                # 不使用 await task：前台请求被取消时不应连带取消预取
+                await asyncio.wait({task})
+            yield
+        finally:
+            self._foreground -= 1
+
+    async def _run(self, file_path: str, strategy: Dict[str, Any]):
+        """等待空闲后执行预取"""
+        try:
+            # 1. 让行：有前台请求或预取并发已满时等待（被提升的任务除外）
+            while file_path not in self._promoted and (
+                self._foreground > 0 or self._running >= self.max_concurrent
+            ):
+                await asyncio.sleep(self.poll_interval)
+
+            # 2. 解析、清理并生成金字塔，结果写入网格缓存
+            self._running += 1
+            try:
+                await self.wrapper.process_mesh_to_pointcloud(file_path, dict(strategy))
+            finally:
+                self._running -= 1
+
+            self._stats['completed'] += 1
+            logger.info(f"Geometry prefetched for {file_path}")
+
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.warning(f"Geometry prefetch failed for {file_path}: {str(e)}")
+        finally:
+            self._promoted.discard(file_path)
+            if self._tasks.get(file_path) is asyncio.current_task():
+                del self._tasks[file_path]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取预取指标"""
+        return {
+            **self._stats,
+            'pending': sum(1 for task in self._tasks.values() if not task.done()),
+            'running': self._running
+        }
@@ -0,0 +1,101 @@
+"""
+提示词影响评估模块
+把引导与未引导骨骼的关节批量归属到最近的部位区域，比较各部位的关节分布，
+以提示词请求加密的部位上实际获得的关节份额增量，相对按区域采样权重预期的增量打分
+"""
+
+import logging
+from typing import Any, Dict
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from services.part_segmentation import PART_LABELS, PartSegmenter
+
+logger = logging.getLogger(__name__)
+
+# 关节份额的加性平滑（每个存在的部位的虚拟关节数），避免基线为0的部位无法计算预期增量
+SHARE_SMOOTHING = 0.5
+
+
+class PromptInfluenceEvaluator:
+    """引导 vs 未引导关节分布的提示词影响分数"""
+
+    def __init__(self, part_segmenter: PartSegmenter):
+        self.part_segmenter = part_segmenter
+
+    def evaluate(
+        self,
+        guided_joints: np.ndarray,
+        baseline_joints: np.ndarray,
+        face_tree: cKDTree,
+        face_labels: np.ndarray,
+        face_areas: np.ndarray,
+        region_weights: Dict[str, float]
+    ) -> Dict[str, Any]:
+        """
+        计算提示词影响分数
+
+        Args:
+            guided_joints: 提示词引导的关节（网格坐标系）
+            baseline_joints: 未引导的关节（网格坐标系）
+            face_tree: 面重心KD树
+            face_labels: 逐面部位标签
+            face_areas: 逐面面积
+            region_weights: EnhancedSampling 给出的区域采样权重
+
+        Returns:
+            score（0~1）/ requested_parts / guided_share / baseline_share / joint_density
+        """
+        part_count = len(PART_LABELS)
+        present = np.bincount(face_labels, minlength=part_count) > 0
+
+        # 1. 最近面归属：每个关节一次批量查询
+        guided_counts = self._part_counts(guided_joints, face_tree, face_labels)
+        baseline_counts = self._part_counts(baseline_joints, face_tree, face_labels)
+        guided_share = self._share(guided_counts, present)
+        baseline_share = self._share(baseline_counts, present)
+
+        # 2. 请求加密的部位及其权重（与采样时的逐面权重一致）
+        part_weights = self.part_segmenter.face_weights(np.arange(part_count), region_weights)
+        requested = present & (part_weights > 1.0)
+        if not requested.any():
+            score = 0.0
+        else:
+            # 关节若完全跟随采样密度，基线份额按权重重新分配后的预期份额
+            target = baseline_share * part_weights
+            target /= target.sum()
+            expected_gain = float((target - baseline_share)[requested].sum())
+            achieved_gain = float((guided_share - baseline_share)[requested].sum())
+            score = float(np.clip(achieved_gain / expected_gain, 0.0, 1.0)) if expected_gain > 1e-9 else 0.0
+
+        # 各部位关节密度（每单位面积份额的关节份额）
+        area_share = np.bincount(face_labels, weights=face_areas, minlength=part_count)
+        area_share /= max(area_share.sum(), 1e-12)
+        density = np.divide(guided_share, area_share, out=np.zeros(part_count), where=area_share > 0)
+
+        details = {
+            'score': round(score, 4),
+            'requested_parts': [PART_LABELS[i] for i in np.flatnonzero(requested)],
+            'guided_share': self._by_name(guided_share, present),
+            'baseline_share': self._by_name(baseline_share, present),
+            'joint_density': self._by_name(density, present)
+        }
+        logger.info(f"Prompt influence: {details}")
+        return details
+
+    def _part_counts(self, joints: np.ndarray, face_tree: cKDTree, face_labels: np.ndarray) -> np.ndarray:
+        """批量最近面查询，统计各部位的关节数"""
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 3)
+        if len(joints) == 0:
+            return np.zeros(len(PART_LABELS))
+        _, nearest_faces = face_tree.query(joints)
+        return np.bincount(face_labels[nearest_faces], minlength=len(PART_LABELS)).astype(np.float64)
+
+    def _share(self, counts: np.ndarray, present: np.ndarray) -> np.ndarray:
+        """平滑后的关节份额，只在网格中存在的部位上分布"""
+        smoothed = (counts + SHARE_SMOOTHING) * present
+        return smoothed / max(smoothed.sum(), 1e-12)
+
+    def _by_name(self, values: np.ndarray, present: np.ndarray) -> Dict[str, float]:
+        return {PART_LABELS[i]: round(float(values[i]), 4) for i in np.flatnonzero(present)}
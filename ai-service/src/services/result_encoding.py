@@ -0,0 +1,130 @@
+"""
+处理结果编码模块
+按 Accept 头协商结果的传输格式：msgpack（数组以原始字节传输）、npz 或 JSON（回退格式）
+"""
+
+import io
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.requests import ProcessingResult
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_JSON = 'application/json'
+MEDIA_MSGPACK = 'application/msgpack'
+MEDIA_NPZ = 'application/x-npz'
+
+# 可接受的媒体类型别名
+MEDIA_ALIASES = {
+    'application/x-msgpack': MEDIA_MSGPACK,
+    'application/vnd.msgpack': MEDIA_MSGPACK,
+    'application/npz': MEDIA_NPZ
+}
+
+# 以数组形式传输的字段：(结果字段, 子字段, 数组名)
+ARRAY_FIELDS = (
+    ('skeleton_data', 'joints', 'joints'),
+    ('skeleton_data', 'bones', 'bones'),
+    ('skeleton_data', 'parents', 'parents'),
+    ('skin_weights', 'indices', 'skin_indices'),
+    ('skin_weights', 'weights', 'skin_weights')
+)
+
+
+def available_media_types() -> List[str]:
+    """当前环境支持的媒体类型（按服务端偏好排序）"""
+    media_types = [MEDIA_NPZ, MEDIA_JSON]
+    if msgpack is not None:
+        media_types.insert(0, MEDIA_MSGPACK)
+    return media_types
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    按 Accept 头选择媒体类型
+
+    q 值最高者优先，q 相同时按服务端偏好；无法满足时回退到 JSON
+    """
+    if not accept:
+        return MEDIA_JSON
+
+    supported = available_media_types()
+    candidates: List[Tuple[float, int, str]] = []
+    for item in accept.split(','):
+        parts = [part.strip() for part in item.split(';')]
+        media_type = MEDIA_ALIASES.get(parts[0].lower(), parts[0].lower())
+        quality = 1.0
+        for parameter in parts[1:]:
+            if parameter.startswith('q='):
+                try:
+                    quality = float(parameter[2:])
+                except ValueError:
+                    quality = 0.0
+
+        if quality <= 0:
+            continue
+        if media_type in ('*/*', 'application/*'):
+            # 通配时使用 JSON，保持与未协商的客户端兼容
+            candidates.append((quality, supported.index(MEDIA_JSON), MEDIA_JSON))
+        elif media_type in supported:
+            candidates.append((quality, supported.index(media_type), media_type))
+
+    if not candidates:
+        return MEDIA_JSON
+    return min(candidates, key=lambda candidate: (-candidate[0], candidate[1]))[2]
+
+
+def encode_result(result: ProcessingResult, media_type: str) -> bytes:
+    """把处理结果编码为指定媒体类型"""
+    if media_type == MEDIA_MSGPACK:
+        return _encode_msgpack(result)
+    if media_type == MEDIA_NPZ:
+        return _encode_npz(result)
+    return result.model_dump_json().encode()
+
+
+def _split_arrays(result: ProcessingResult) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """拆分为数组和其余（JSON 兼容的）字段"""
+    exclude: Dict[str, set] = {}
+    for section, field, _ in ARRAY_FIELDS:
+        exclude.setdefault(section, set()).add(field)
+    metadata = result.model_dump(mode='json', exclude=exclude)
+
+    arrays = {}
+    for section, field, name in ARRAY_FIELDS:
+        container = getattr(result, section)
+        value = getattr(container, field) if container is not None else None
+        if value is not None:
+            arrays[name] = np.ascontiguousarray(value)
+    return arrays, metadata
+
+
+def _encode_msgpack(result: ProcessingResult) -> bytes:
+    """msgpack：数组编码为 {dtype, shape, data}，data 为原始小端字节"""
+    arrays, metadata = _split_arrays(result)
+    metadata['arrays'] = {
+        name: {
+            'dtype': array.dtype.newbyteorder('<').str,
+            'shape': list(array.shape),
+            'data': array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()
+        }
+        for name, array in arrays.items()
+    }
+    return msgpack.packb(metadata, use_bin_type=True)
+
+
+def _encode_npz(result: ProcessingResult) -> bytes:
+    """npz：每个数组一个 .npy 成员，其余字段以 JSON 字符串存于 metadata 成员"""
+    arrays, metadata = _split_arrays(result)
+    buffer = io.BytesIO()
+    np.savez(buffer, metadata=np.array(json.dumps(metadata)), **arrays)
+    return buffer.getvalue()
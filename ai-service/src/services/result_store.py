@@ -0,0 +1,183 @@
+"""
+结果持久化模块
+把骨骼 JSON、骨骼数组和（可选的）蒙皮权重按内容哈希命名写入结果目录：
+序列化和哈希在线程池中完成，写入在后台进行，不占用请求路径；
+每个文件先写临时文件再 rename，读者永远看不到写了一半的文件；可选 zstd 压缩
+"""
+
+import io
+import os
+import re
+import asyncio
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from models.requests import SkeletonData, SkinWeights
+from services.gltf_export import MEDIA_GLB
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 默认结果目录
+RESULTS_DIR = Path("/app/results")
+
+# zstd 压缩级别
+COMPRESSION_LEVEL = 3
+
+# 结果文件类型 -> (扩展名, 媒体类型)
+ARTIFACT_TYPES = {
+    'json': ('.json', 'application/json'),
+    'arrays': ('.arrays.npz', 'application/x-npz'),
+    'weights': ('.weights.npz', 'application/x-npz'),
+    'glb': ('.glb', MEDIA_GLB)
+}
+
+# 不压缩的类型：GLB 直接交给 3D 工具，始终以原始文件流式发送
+UNCOMPRESSED_ARTIFACTS = ('glb',)
+
+# 合法的结果文件名：内容哈希 + 类型扩展名 + 可选压缩后缀（防止路径穿越）
+ARTIFACT_NAME_PATTERN = re.compile(r'^[0-9a-f]{32}(\.json|\.arrays\.npz|\.weights\.npz|\.glb)(\.zst)?$')
+
+
+class ResultStore:
+    """按内容哈希命名、原子写入的结果存储"""
+
+    def __init__(self, root: Path = RESULTS_DIR, compress: bool = True):
+        self.root = Path(root)
+        # 未安装 zstandard 时不压缩
+        self.compress = compress and zstandard is not None
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._stats = {'saved': 0, 'deduplicated': 0, 'failed': 0, 'bytes_written': 0}
+
+    async def save(
+        self,
+        skeleton_data: SkeletonData,
+        skin_weights: Optional[SkinWeights] = None,
+        glb: Optional[bytes] = None
+    ) -> Dict[str, str]:
+        """
+        保存处理结果
+
+        Returns:
+            {类型: 文件名}；文件在后台写入，读取时会等待未完成的写入
+        """
+        payloads = await asyncio.get_running_loop().run_in_executor(
+            None, self._serialize, skeleton_data, skin_weights
+        )
+        if glb is not None:
+            payloads['glb'] = glb
+
+        names = {}
+        for kind, content in payloads.items():
+            name = self._artifact_name(kind, content)
+            names[kind] = name
+            # 同内容的文件已存在或正在写入
+            if name in self._pending or (self.root / name).exists():
+                self._stats['deduplicated'] += 1
+                continue
+            self._pending[name] = asyncio.create_task(self._write(name, content))
+
+        return names
+
+    async def path(self, name: str) -> Optional[Path]:
+        """按文件名获取结果文件路径，等待未完成的写入；不存在或名称非法时返回None"""
+        if not ARTIFACT_NAME_PATTERN.match(name):
+            return None
+        pending = self._pending.get(name)
+        if pending is not None:
+            await asyncio.wait({pending})
+        path = self.root / name
+        return path if path.is_file() else None
+
+    def read_decoded(self, path: Path) -> bytes:
+        """读取并解压结果文件（供不接受 zstd 编码的客户端）"""
+        data = path.read_bytes()
+        if path.name.endswith('.zst'):
+            return zstandard.ZstdDecompressor().decompress(data)
+        return data
+
+    @staticmethod
+    def describe(name: str) -> Tuple[str, Optional[str]]:
+        """文件名 -> (媒体类型, 内容编码)"""
+        encoding = 'zstd' if name.endswith('.zst') else None
+        base = name[:-4] if encoding else name
+        for extension, media_type in ARTIFACT_TYPES.values():
+            if base.endswith(extension):
+                return media_type, encoding
+        return 'application/octet-stream', encoding
+
+    async def flush(self):
+        """等待所有后台写入完成"""
+        if self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+
+    def _serialize(self, skeleton_data: SkeletonData, skin_weights: Optional[SkinWeights]) -> Dict[str, bytes]:
+        """序列化各结果文件的内容（未压缩）"""
+        payloads = {
+            'json': skeleton_data.model_dump_json().encode(),
+            'arrays': self._npz(
+                joints=skeleton_data.joints,
+                bones=skeleton_data.bones,
+                parents=skeleton_data.parents if skeleton_data.parents is not None else np.zeros(0, dtype=np.int32)
+            )
+        }
+        if skin_weights is not None:
+            payloads['weights'] = self._npz(indices=skin_weights.indices, weights=skin_weights.weights)
+        return payloads
+
+    @staticmethod
+    def _npz(**arrays: Any) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, **{name: np.ascontiguousarray(array) for name, array in arrays.items()})
+        return buffer.getvalue()
+
+    def _artifact_name(self, kind: str, content: bytes) -> str:
+        """内容哈希（基于未压缩内容）+ 扩展名"""
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        compress = self.compress and kind not in UNCOMPRESSED_ARTIFACTS
+        return digest + ARTIFACT_TYPES[kind][0] + ('.zst' if compress else '')
+
+    async def _write(self, name: str, content: bytes):
+        """后台写入单个文件"""
+        try:
+            written = await asyncio.get_running_loop().run_in_executor(None, self._write_atomic, name, content)
+            self._stats['saved'] += 1
+            self._stats['bytes_written'] += written
+            logger.info(f"Result saved to: {self.root / name} ({written} bytes)")
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.error(f"Failed to save result {name}: {str(e)}")
+        finally:
+            self._pending.pop(name, None)
+
+    def _write_atomic(self, name: str, content: bytes) -> int:
+        """写入同目录下的临时文件并 fsync，再 rename 为目标文件名"""
+        if name.endswith('.zst'):
+            content = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(content)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.root / name)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return len(content)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取存储指标"""
+        return {**self._stats, 'pending': len(self._pending), 'compression': 'zstd' if self.compress else None}
@@ -0,0 +1,131 @@
+"""
+骨骼输出解码模块
+把 SkeletonGPT 输出的骨骼端点对（离散坐标或已反量化的坐标）向量化地解码为关节和骨骼，
+重合的端点用量化空间哈希（np.unique）合并，整个批次一次完成
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 坐标范围（与 MagicArticulate 的离散化范围一致）
+COORD_LOW = -0.5
+COORD_HIGH = 0.5
+
+
+class SkeletonDecoder:
+    """骨骼端点对 -> (关节坐标, 骨骼索引)"""
+
+    def __init__(self, n_discrete_size: int = 128, pad_id: int = -1, merge_tolerance: Optional[float] = None):
+        """
+        Args:
+            n_discrete_size: 坐标离散级数
+            pad_id: 填充值，含填充值的行被丢弃
+            merge_tolerance: 端点合并的网格边长，默认半个离散步长
+        """
+        self.n_discrete_size = n_discrete_size
+        self.pad_id = pad_id
+        self.merge_tolerance = merge_tolerance or 0.5 * (COORD_HIGH - COORD_LOW) / n_discrete_size
+
+    def decode(self, raw: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        解码单个骨骼
+
+        Args:
+            raw: 骨骼端点对，形状可为 (N, 6) 或扁平的 (N*6,)
+
+        Returns:
+            (关节坐标 (J, 3), 骨骼索引 (B, 2))，关节按首次出现顺序编号
+        """
+        return self.decode_batch(np.asarray(raw).reshape(1, -1, 6))[0]
+
+    def decode_batch(self, raw: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        解码一个批次的骨骼
+
+        Args:
+            raw: 形状 (B, N, 6) 或 (B, N*6) 的端点对
+
+        Returns:
+            每个样本的 (关节坐标, 骨骼索引)
+        """
+        coords = np.asarray(raw)
+        batch_size = coords.shape[0]
+        coords = coords.reshape(batch_size, -1, 6)
+        quantized = self._is_quantized(coords)
+
+        # 1. 丢弃填充行和含非有限值的行
+        values = coords.astype(np.float64)
+        valid = np.isfinite(values).all(axis=-1) & ~(values == self.pad_id).any(axis=-1)
+        bone_owner, bone_row = np.nonzero(valid)
+
+        # 2. 反量化（取离散格中心）；每根骨骼两个端点，依次展开为 (2M, 3)
+        endpoints = values[bone_owner, bone_row].reshape(-1, 3)
+        if quantized:
+            step = (COORD_HIGH - COORD_LOW) / self.n_discrete_size
+            endpoints = COORD_LOW + (endpoints + 0.5) * step
+        endpoint_owner = np.repeat(bone_owner, 2)
+
+        # 3. 量化空间哈希合并重合端点（离散格中心落在哈希格中心，不受舍入误差影响）；
+        #    样本序号作为键的第一列，批次内样本互不合并
+        keys = np.column_stack([
+            endpoint_owner,
+            np.round(endpoints / self.merge_tolerance).astype(np.int64)
+        ])
+        _, first_index, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        # 按首次出现的顺序重新编号，使第一根骨骼的起点成为0号关节
+        order = np.argsort(first_index, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        endpoint_joint = rank[inverse]
+
+        joint_count = len(order)
+        joints = np.zeros((joint_count, 3))
+        np.add.at(joints, endpoint_joint, endpoints)
+        joints /= np.maximum(np.bincount(endpoint_joint, minlength=joint_count), 1)[:, None]
+        joint_owner = endpoint_owner[first_index[order]]
+
+        # 4. 去除合并后长度为0的骨骼和重复骨骼（无向），保留首次出现的顺序
+        bones = endpoint_joint.reshape(-1, 2)
+        keep = bones[:, 0] != bones[:, 1]
+        bones, bone_owner = bones[keep], bone_owner[keep]
+        _, unique_bones = np.unique(np.sort(bones, axis=1), axis=0, return_index=True)
+        unique_bones = np.sort(unique_bones)
+        bones, bone_owner = bones[unique_bones], bone_owner[unique_bones]
+
+        # 5. 移除不再被任何骨骼引用的关节
+        referenced = np.zeros(joint_count, dtype=bool)
+        referenced[bones.reshape(-1)] = True
+        remap = np.cumsum(referenced) - 1
+        joints, joint_owner = joints[referenced], joint_owner[referenced]
+        bones = remap[bones]
+
+        # 6. 按样本切分；关节和骨骼都按样本序号有序
+        samples = np.arange(batch_size + 1)
+        joint_bounds = np.searchsorted(joint_owner, samples)
+        bone_bounds = np.searchsorted(bone_owner, samples)
+
+        decoded = []
+        for index in range(batch_size):
+            joint_start, joint_end = joint_bounds[index], joint_bounds[index + 1]
+            bone_start, bone_end = bone_bounds[index], bone_bounds[index + 1]
+            decoded.append((
+                joints[joint_start:joint_end],
+                bones[bone_start:bone_end] - joint_start
+            ))
+
+        logger.debug(f"Decoded {batch_size} skeleton(s): {[len(b) for _, b in decoded]} bones")
+        return decoded
+
+    def _is_quantized(self, coords: np.ndarray) -> bool:
+        """判断输入是离散坐标还是已反量化的连续坐标"""
+        if np.issubdtype(coords.dtype, np.integer):
+            return True
+        values = coords[np.isfinite(coords) & (coords != self.pad_id)]
+        # 连续坐标位于 [-0.5, 0.5]，离散坐标为 [0, n_discrete_size) 内的整数
+        return bool(values.size) and float(values.max()) > 1.0 and bool(np.all(values == np.round(values)))
@@ -0,0 +1,163 @@
+"""
+骨骼层次构建模块
+把解码得到的骨骼图转换为有根树：连通分量桥接、最小生成树去环、按中心性或提示词规则选根，
+一次性得到父关节数组和拓扑顺序，供后处理、导出和蒙皮复用
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, dijkstra, minimum_spanning_tree
+
+logger = logging.getLogger(__name__)
+
+# 骨骼风格 -> 选根规则
+ROOT_RULES = {
+    'humanoid': 'lowest_branch',   # 髋部：腿与脊柱交汇、位置最低的分叉关节
+    'mechanical': 'lowest',        # 机械结构：底座
+}
+DEFAULT_ROOT_RULE = 'center'
+
+# 分叉关节作为根候选时，离心率相对树中心的上限倍数
+BRANCH_ECCENTRICITY_RATIO = 1.5
+
+# 零长度骨骼的最小边权（csgraph 中0表示无边）
+MIN_EDGE_LENGTH = 1e-9
+
+
+class SkeletonHierarchyBuilder:
+    """骨骼图 -> 有根树（父关节数组 + 拓扑顺序）"""
+
+    def __init__(self, up_axis: int = 1):
+        # 竖直方向（与部件分割一致，默认 +Y 向上）
+        self.up_axis = up_axis
+
+    def build(
+        self,
+        joints: np.ndarray,
+        bones: np.ndarray,
+        geometry_hints: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        构建骨骼层次
+
+        Args:
+            joints: 关节坐标 (J, 3)
+            bones: 骨骼索引 (B, 2)，可能含环或多个连通分量
+            geometry_hints: 提示词几何约束，articulation_style 决定选根规则
+
+        Returns:
+            root_index / parents（根为-1）/ order（拓扑顺序）/ depth /
+            bones（父 -> 子，按拓扑顺序）/ joint_names / components / bridged_bones / dropped_bones
+        """
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 3)
+        bones = np.asarray(bones, dtype=np.int64).reshape(-1, 2)
+        joint_count = len(joints)
+        if joint_count == 0:
+            return {
+                'root_index': None, 'parents': np.zeros(0, dtype=np.int32), 'order': np.zeros(0, dtype=np.int32),
+                'depth': np.zeros(0, dtype=np.int32), 'bones': np.zeros((0, 2), dtype=np.int32),
+                'joint_names': [], 'components': 0, 'bridged_bones': 0, 'dropped_bones': 0
+            }
+
+        # 1. 骨骼图与连通分量
+        graph = self._bone_graph(joints, bones)
+        components, _ = connected_components(graph, directed=False)
+
+        # 2. 最小生成树：去除环；多个分量时按最近距离桥接
+        tree = minimum_spanning_tree(self._bridged_graph(joints, graph) if components > 1 else graph)
+        tree = tree + tree.T
+        tree_edges = tree.nnz // 2
+
+        # 3. 选根并求父关节数组与拓扑顺序
+        style = (geometry_hints or {}).get('articulation_style')
+        rule = ROOT_RULES.get(style, DEFAULT_ROOT_RULE)
+        root = self._select_root(joints, tree, rule)
+
+        order, predecessors = breadth_first_order(tree, root, directed=False, return_predecessors=True)
+        parents = np.where(predecessors < 0, -1, predecessors).astype(np.int32)
+        depth = dijkstra(tree, indices=root, unweighted=True).astype(np.int32)
+        tree_bones = np.column_stack([parents[order[1:]], order[1:]]).astype(np.int32)
+
+        unique_bones = graph.nnz // 2
+        hierarchy = {
+            'root_index': int(root),
+            'parents': parents,
+            'order': order.astype(np.int32),
+            'depth': depth,
+            'bones': tree_bones,
+            'joint_names': self._joint_names(parents, order, root),
+            'components': int(components),
+            'bridged_bones': int(components - 1),
+            'dropped_bones': int(unique_bones - (tree_edges - (components - 1)))
+        }
+        logger.info(
+            f"Skeleton hierarchy: root={root} ({rule}), components={components}, "
+            f"max_depth={int(depth.max())}, dropped={hierarchy['dropped_bones']}"
+        )
+        return hierarchy
+
+    def _bone_graph(self, joints: np.ndarray, bones: np.ndarray):
+        """以骨骼长度为边权的对称稀疏图"""
+        bones = bones[bones[:, 0] != bones[:, 1]]
+        bones = np.unique(np.sort(bones, axis=1), axis=0).reshape(-1, 2)
+        lengths = np.maximum(np.linalg.norm(joints[bones[:, 0]] - joints[bones[:, 1]], axis=1), MIN_EDGE_LENGTH)
+        joint_count = len(joints)
+        graph = coo_matrix((lengths, (bones[:, 0], bones[:, 1])), shape=(joint_count, joint_count)).tocsr()
+        # 对称化
+        graph = graph.maximum(graph.T)
+        return graph
+
+    def _bridged_graph(self, joints: np.ndarray, graph):
+        """在骨骼图上加入所有关节对之间的惩罚边，使生成树只在分量之间用最短距离桥接"""
+        distances = np.linalg.norm(joints[:, None, :] - joints[None, :, :], axis=-1)
+        # 惩罚值大于所有骨骼长度之和，生成树优先使用原有骨骼
+        penalty = float(graph.sum()) + 1.0
+        dense = np.maximum(distances, MIN_EDGE_LENGTH) + penalty
+        bone_lengths = graph.toarray()
+        bone_mask = bone_lengths > 0
+        dense[bone_mask] = bone_lengths[bone_mask]
+        np.fill_diagonal(dense, 0.0)
+        return dense
+
+    def _select_root(self, joints: np.ndarray, tree, rule: str) -> int:
+        """按规则选根；候选不存在时退回树中心"""
+        distances = dijkstra(tree, directed=False)
+        eccentricity = distances.max(axis=1)
+        # 树中心：离心率最小，并列时总距离最小
+        center = int(np.lexsort((distances.sum(axis=1), eccentricity))[0])
+
+        if rule == 'lowest':
+            return int(np.argmin(joints[:, self.up_axis]))
+
+        if rule == 'lowest_branch':
+            degree = np.diff(tree.indptr)
+            candidates = np.flatnonzero(
+                (degree >= 3) & (eccentricity <= eccentricity[center] * BRANCH_ECCENTRICITY_RATIO)
+            )
+            if len(candidates):
+                return int(candidates[np.argmin(joints[candidates, self.up_axis])])
+
+        return center
+
+    def _joint_names(self, parents: np.ndarray, order: np.ndarray, root: int) -> list:
+        """按链命名：root，以及 chain{链序号}_{链内序号}；分叉处开始新链"""
+        child_count = np.bincount(parents[parents >= 0], minlength=len(parents))
+        chain = np.full(len(parents), -1, dtype=np.int64)
+        position = np.zeros(len(parents), dtype=np.int64)
+        names = [''] * len(parents)
+        names[root] = 'root'
+
+        chain_count = 0
+        for joint in order[1:]:
+            parent = parents[joint]
+            if parent == root or child_count[parent] > 1:
+                chain[joint] = chain_count
+                chain_count += 1
+            else:
+                chain[joint] = chain[parent]
+                position[joint] = position[parent] + 1
+            names[joint] = f"chain{chain[joint]}_{position[joint]}"
+        return names
@@ -0,0 +1,139 @@
+"""
+骨骼细节层级（LOD）模块
+在父关节数组上做向量化的边折叠：每一遍按骨骼长度（链中间的度2关节优先）选出一批互不相邻的关节，
+并入各自的父关节，直到关节数降到目标值，逐级得到越来越粗的预览骨骼及其到全分辨率关节的映射
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 每一级相对上一级保留的关节比例
+LOD_REDUCTION = 0.5
+# 每级至少保留的关节数
+MIN_LOD_JOINTS = 3
+# 每一遍最多折叠当前关节数的比例
+PASS_FRACTION = 0.25
+
+# 折叠代价系数：链中间的度2关节最先折叠，分叉关节最后折叠
+DEGREE2_COST = 0.5
+LEAF_COST = 1.0
+BRANCH_COST = 2.0
+
+
+class SkeletonLODBuilder:
+    """向量化边折叠的骨骼 LOD 生成"""
+
+    def __init__(self, reduction: float = LOD_REDUCTION, min_joints: int = MIN_LOD_JOINTS):
+        self.reduction = reduction
+        self.min_joints = min_joints
+
+    def build(
+        self,
+        joints: np.ndarray,
+        parents: np.ndarray,
+        levels: int,
+        joint_names: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        生成逐级简化的骨骼
+
+        Args:
+            joints: 全分辨率关节 (J, 3)
+            parents: 父关节索引，根为 -1
+            levels: LOD 级数
+            joint_names: 全分辨率关节名称
+
+        Returns:
+            每级一个字典：level / joints / bones / parents / joint_names /
+            source_joints（LOD 关节对应的全分辨率关节）/ joint_map（全分辨率关节 -> LOD 关节）
+        """
+        joints = np.asarray(joints, dtype=np.float32).reshape(-1, 3)
+        parents = np.asarray(parents, dtype=np.int64)
+        # 当前层级的关节在全分辨率中的序号，以及全分辨率关节到当前层级的映射
+        source = np.arange(len(joints))
+        joint_map = np.arange(len(joints))
+
+        lods = []
+        for level in range(1, levels + 1):
+            target = max(self.min_joints, int(np.ceil(len(source) * self.reduction)))
+            if target >= len(source):
+                break
+
+            while len(source) > target:
+                collapsed = self._select_collapses(joints[source], parents, len(source) - target)
+                if not collapsed.any():
+                    break
+                parents, remap = self._collapse(parents, collapsed)
+                source = source[~collapsed]
+                joint_map = remap[joint_map]
+
+            lods.append(self._level(level, joints, parents, source, joint_map, joint_names))
+
+        logger.info(f"Skeleton LOD: {len(joints)} joints -> {[len(lod['source_joints']) for lod in lods]}")
+        return lods
+
+    def _select_collapses(self, joints: np.ndarray, parents: np.ndarray, excess: int) -> np.ndarray:
+        """本遍折叠的关节：代价最小的一批非根关节，且不与同遍选中的父关节相邻"""
+        count = len(parents)
+        has_parent = parents >= 0
+        children = np.bincount(parents[has_parent], minlength=count)
+
+        length = np.full(count, np.inf)
+        length[has_parent] = np.linalg.norm(joints[has_parent] - joints[parents[has_parent]], axis=1)
+        factor = np.where(children == 0, LEAF_COST, np.where(children == 1, DEGREE2_COST, BRANCH_COST))
+        cost = length * factor
+
+        budget = min(excess, max(1, int(count * PASS_FRACTION)))
+        candidates = np.argsort(cost, kind='stable')[:budget]
+        candidates = candidates[np.isfinite(cost[candidates])]
+
+        selected = np.zeros(count, dtype=bool)
+        selected[candidates] = True
+        # 父关节也被选中时本遍跳过，保证折叠代价在本遍内有效
+        selected[has_parent] &= ~selected[parents[has_parent]]
+        return selected
+
+    def _collapse(self, parents: np.ndarray, collapsed: np.ndarray):
+        """
+        把选中的关节并入父关节：指针倍增求每个关节最近的保留祖先，
+        保留关节重新编号，返回 (新父关节数组, 旧序号 -> 新序号)
+        """
+        count = len(parents)
+        representative = np.where(collapsed, parents, np.arange(count))
+        while True:
+            jumped = representative[representative]
+            if np.array_equal(jumped, representative):
+                break
+            representative = jumped
+
+        kept = ~collapsed
+        new_index = np.cumsum(kept) - 1
+        remap = new_index[representative]
+
+        kept_parents = parents[kept]
+        new_parents = np.where(kept_parents >= 0, remap[np.maximum(kept_parents, 0)], -1)
+        return new_parents, remap
+
+    def _level(
+        self,
+        level: int,
+        joints: np.ndarray,
+        parents: np.ndarray,
+        source: np.ndarray,
+        joint_map: np.ndarray,
+        joint_names: Optional[List[str]]
+    ) -> Dict[str, Any]:
+        child = np.flatnonzero(parents >= 0)
+        return {
+            'level': level,
+            'joints': joints[source],
+            'bones': np.column_stack([parents[child], child]).astype(np.int32),
+            'parents': parents.astype(np.int32),
+            'joint_names': [joint_names[i] for i in source] if joint_names else None,
+            'source_joints': source.astype(np.int32),
+            'joint_map': joint_map.astype(np.int32)
+        }
@@ -0,0 +1,136 @@
+"""
+蒙皮权重模块
+热扩散蒙皮（Baran & Popović）：对每根骨骼求解 (L + M·H) w = M·H·p，
+系数矩阵只与网格和骨骼到顶点的距离有关，分解缓存在网格上下文中，同一网格骨骼组合只分解一次，
+所有骨骼作为多右端项批量求解，结果按顶点保留 top-k 稀疏存储
+"""
+
+import logging
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from services.mesh_context import MeshContext
+
+logger = logging.getLogger(__name__)
+
+# 热扩散常数（顶点到最近骨骼距离平方的倒数乘以该常数）
+HEAT_CONSTANT = 1.0
+
+# 每次求解的右端项（骨骼）数，限制稠密解矩阵的内存
+BONE_CHUNK = 32
+
+# 计算顶点到骨骼距离时每批的 顶点×骨骼 对数
+DISTANCE_CHUNK_PAIRS = 1 << 20
+
+# 可求解的顶点数上限（稀疏 LU 分解的内存随顶点数超线性增长）
+MAX_SKINNING_VERTICES = 500000
+
+
+class HeatDiffusionSkinner:
+    """基于余切拉普拉斯热扩散的蒙皮权重"""
+
+    def __init__(self, top_k: int = 4, heat_constant: float = HEAT_CONSTANT, bone_chunk: int = BONE_CHUNK):
+        self.top_k = top_k
+        self.heat_constant = heat_constant
+        self.bone_chunk = bone_chunk
+
+    def compute(self, context: MeshContext, joints: np.ndarray, bones: np.ndarray) -> Dict[str, Any]:
+        """
+        计算蒙皮权重
+
+        Args:
+            context: 网格几何上下文（提供顶点面积和系数矩阵的分解）
+            joints: 网格坐标系下的关节 (J, 3)
+            bones: 骨骼 (B, 2)，父 -> 子
+
+        Returns:
+            indices (V, k) 骨骼序号 / weights (V, k) 权重（按权重降序，每行和为1）/
+            top_k / vertex_count / active_bones / solve_seconds
+        """
+        vertices = np.asarray(context.mesh.vertices, dtype=np.float64)
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 3)
+        bones = np.asarray(bones, dtype=np.int64).reshape(-1, 2)
+        if len(bones) == 0:
+            raise ValueError("Skeleton has no bones to skin")
+        if len(vertices) > MAX_SKINNING_VERTICES:
+            raise ValueError(f"Mesh has {len(vertices)} vertices, skinning limit is {MAX_SKINNING_VERTICES}")
+
+        start_time = time.perf_counter()
+        top_k = min(self.top_k, len(bones))
+
+        # 1. 每个顶点的最近骨骼及距离
+        nearest, distance = self._nearest_bones(vertices, joints[bones[:, 0]], joints[bones[:, 1]])
+
+        # 2. 系数矩阵 A = L + M·H，对称正定，分解由网格上下文缓存
+        diagonal = self.heat_constant / np.maximum(distance, 1e-6 * np.ptp(vertices, axis=0).max()) ** 2
+        heat = context.vertex_areas * diagonal
+        factor = context.heat_factorization(heat)
+
+        # 3. 只对作为某些顶点最近骨骼的骨骼求解（其余骨骼的右端项为0，解也为0），分块多右端项求解
+        active_bones = np.unique(nearest)
+        best_weights = np.zeros((len(vertices), top_k))
+        best_indices = np.zeros((len(vertices), top_k), dtype=np.int64)
+        for start in range(0, len(active_bones), self.bone_chunk):
+            chunk = active_bones[start:start + self.bone_chunk]
+            column = np.full(len(bones), -1)
+            column[chunk] = np.arange(len(chunk))
+
+            rhs = np.zeros((len(vertices), len(chunk)))
+            in_chunk = column[nearest] >= 0
+            rhs[np.flatnonzero(in_chunk), column[nearest[in_chunk]]] = heat[in_chunk]
+            solution = factor.solve(rhs)
+
+            # 与已有的 top-k 合并
+            candidates = np.concatenate([best_weights, solution], axis=1)
+            candidate_indices = np.concatenate([best_indices, np.broadcast_to(chunk, solution.shape)], axis=1)
+            keep = np.argpartition(-candidates, top_k - 1, axis=1)[:, :top_k]
+            best_weights = np.take_along_axis(candidates, keep, axis=1)
+            best_indices = np.take_along_axis(candidate_indices, keep, axis=1)
+
+        # 4. 截断负值并归一化；数值上全为0的顶点完全绑定到最近骨骼
+        best_weights = np.maximum(best_weights, 0.0)
+        totals = best_weights.sum(axis=1)
+        empty = totals <= 1e-12
+        best_weights[empty] = 0.0
+        best_weights[empty, 0] = 1.0
+        best_indices[empty, 0] = nearest[empty]
+        best_weights /= np.where(empty, 1.0, totals)[:, None]
+
+        order = np.argsort(-best_weights, axis=1)
+        weights = np.take_along_axis(best_weights, order, axis=1).astype(np.float32)
+        indices = np.take_along_axis(best_indices, order, axis=1).astype(np.int32)
+
+        solve_seconds = time.perf_counter() - start_time
+        logger.info(
+            f"Skin weights: {len(vertices)} vertices, {len(active_bones)}/{len(bones)} bones, "
+            f"top_k={top_k}, {solve_seconds:.3f}s"
+        )
+        return {
+            'indices': indices,
+            'weights': weights,
+            'top_k': top_k,
+            'vertex_count': len(vertices),
+            'active_bones': int(len(active_bones)),
+            'solve_seconds': round(solve_seconds, 4)
+        }
+
+    def _nearest_bones(self, vertices: np.ndarray, heads: np.ndarray, tails: np.ndarray):
+        """分批计算顶点到所有骨骼线段的距离，返回最近骨骼序号和距离"""
+        segments = tails - heads
+        lengths_squared = np.maximum(np.einsum('ij,ij->i', segments, segments), 1e-18)
+
+        nearest = np.empty(len(vertices), dtype=np.int64)
+        distance = np.empty(len(vertices))
+        chunk = max(1, DISTANCE_CHUNK_PAIRS // len(heads))
+        for start in range(0, len(vertices), chunk):
+            points = vertices[start:start + chunk]
+            # (n, B, 3)：顶点相对骨骼起点的向量，投影参数截断到线段上
+            offsets = points[:, None, :] - heads[None, :, :]
+            t = np.clip(np.einsum('nbi,bi->nb', offsets, segments) / lengths_squared, 0.0, 1.0)
+            closest = offsets - t[..., None] * segments[None, :, :]
+            squared = np.einsum('nbi,nbi->nb', closest, closest)
+            nearest[start:start + len(points)] = np.argmin(squared, axis=1)
+            distance[start:start + len(points)] = np.sqrt(squared.min(axis=1))
+        return nearest, distance
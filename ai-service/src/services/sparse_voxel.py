@@ -0,0 +1,325 @@
+"""
+稀疏体素水密重建模块
+只在表面附近的窄带体素上计算占据值并提取等值面，
+内存与耗时随表面积而不是体积（8^depth）增长
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+import trimesh
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# 单位立方体的8个角点偏移
+CORNER_OFFSETS = np.array(
+    [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.int64
+)
+
+# 立方体12条边（以角点序号表示）
+CUBE_EDGES = np.array([
+    [0, 1], [2, 3], [4, 5], [6, 7],
+    [0, 2], [1, 3], [4, 6], [5, 7],
+    [0, 4], [1, 5], [2, 6], [3, 7]
+], dtype=np.int64)
+
+# 26邻域 + 自身
+NEIGHBOR_OFFSETS = np.array(
+    [[x, y, z] for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64
+)
+
+# 消除歧义面时改为外部的角点取值（略大于等值面，交点几乎落在该角点上）
+AMBIGUITY_EPSILON = 1e-6
+
+# 支持的八叉树深度：低于 4 时四肢等细长部位在 16^3 网格中丢失；
+# 深度 9 的立方体峰值内存约 4.6GB，超过默认的全局内存预算
+MIN_OCTREE_DEPTH = 4
+MAX_OCTREE_DEPTH = 8
+
+
+class SparseVoxelRemesher:
+    """基于稀疏窄带体素的水密重建"""
+
+    def __init__(
+        self,
+        samples_per_cell: float = 8.0,
+        iso_level: float = 1.0,
+        max_surface_samples: int = 20_000_000
+    ):
+        # 每个体素面积上的表面采样数，决定无符号距离的近似精度
+        self.samples_per_cell = samples_per_cell
+        # 等值面位置（以体素边长为单位的无符号距离）
+        self.iso_level = iso_level
+        self.max_surface_samples = max_surface_samples
+
+    def remesh(self, mesh: trimesh.Trimesh, octree_depth: int) -> trimesh.Trimesh:
+        """
+        生成水密网格
+
+        Args:
+            mesh: 输入网格（可以不封闭）
+            octree_depth: 八叉树深度，网格分辨率为 2^octree_depth
+
+        Returns:
+            水密网格（无符号距离等值面的外壳）
+
+        Raises:
+            ValueError: 深度超出支持范围，或重建结果不水密（调用方应退回原始网格）
+        """
+        if not MIN_OCTREE_DEPTH <= octree_depth <= MAX_OCTREE_DEPTH:
+            raise ValueError(
+                f"Octree depth {octree_depth} outside supported range [{MIN_OCTREE_DEPTH}, {MAX_OCTREE_DEPTH}]"
+            )
+        resolution = 2 ** octree_depth
+        pitch = float(mesh.extents.max()) / resolution
+        origin = mesh.bounds[0] - 2 * pitch
+        # 键编码用的每轴跨度，足以容纳填充和膨胀后的索引
+        span = resolution + 8
+
+        # 1. 表面采样并量化到体素
+        samples = self._surface_samples(mesh, pitch)
+        surface_keys = np.unique(self._encode(np.floor((samples - origin) / pitch).astype(np.int64), span))
+        surface_cells = self._decode(surface_keys, span)
+
+        # 2. 表面体素膨胀一圈得到窄带，窄带外边界上的角点必然在等值面之外
+        band_cells = (surface_cells[:, None, :] + NEIGHBOR_OFFSETS[None, :, :]).reshape(-1, 3)
+        band_keys = np.unique(self._encode(band_cells, span))
+        band_cells = self._decode(band_keys, span)
+
+        # 3. 只在窄带体素的角点上计算无符号距离
+        corner_keys = np.unique(
+            self._encode((band_cells[:, None, :] + CORNER_OFFSETS[None, :, :]).reshape(-1, 3), span)
+        )
+        corner_points = self._decode(corner_keys, span) * pitch + origin
+        # 远离表面的角点只需知道在等值面之外，限定查询半径可以提前终止搜索
+        distance, _ = cKDTree(samples).query(
+            corner_points, distance_upper_bound=2 * self.iso_level * pitch, workers=-1
+        )
+        values = np.minimum(distance / pitch, 2 * self.iso_level) - self.iso_level
+
+        # 4. 消除歧义面（对角同号的体素面会产生被4个面共享的非流形边）
+        values, resolved = self._resolve_ambiguous_faces(corner_keys, values, span)
+
+        # 5. 在跨越等值面的体素上提取表面
+        vertices, faces = self._surface_nets(band_cells, corner_keys, values, span)
+        vertices = vertices * pitch + origin
+
+        watertight = trimesh.Trimesh(vertices=vertices, faces=faces, process=False)
+        watertight = self._drop_cavity_shells(watertight)
+
+        logger.info(
+            f"Sparse voxel remesh: depth={octree_depth}, surface cells={len(surface_cells)}, "
+            f"band cells={len(band_cells)}, resolved corners={resolved}, faces={len(watertight.faces)}"
+        )
+        if not watertight.is_watertight:
+            raise ValueError(f"Sparse voxel remesh produced a non-watertight mesh at depth {octree_depth}")
+        return watertight
+
+    def _surface_samples(self, mesh: trimesh.Trimesh, pitch: float) -> np.ndarray:
+        """按体素尺度在表面上密集采样"""
+        count = int(np.ceil(mesh.area / (pitch ** 2) * self.samples_per_cell))
+        count = min(max(count, 1), self.max_surface_samples)
+        samples, _ = trimesh.sample.sample_surface(mesh, count, seed=0)
+        return np.concatenate([samples, mesh.vertices], axis=0)
+
+    def _resolve_ambiguous_faces(
+        self,
+        corner_keys: np.ndarray,
+        values: np.ndarray,
+        span: int
+    ) -> Tuple[np.ndarray, int]:
+        """
+        消除歧义面
+
+        体素面上对角的两个角点在内部、另两个在外部时，面上4条边都有符号变化，
+        两侧体素顶点之间的边会被4个四边形共享。把两个内部角点中较靠近等值面的一个改为外部，
+        反复进行直到没有歧义面；内部角点只减不增，必然终止。
+        改为外部的角点与内部邻点之间的新边，其周围体素都包含该内部邻点，仍在窄带之内
+
+        Returns:
+            (修改后的角点取值, 改为外部的角点数)
+        """
+        corners = self._decode(corner_keys, span)
+        values = values.copy()
+
+        # 每个面法向轴上，面的另外3个角点的序号（-1 表示不在窄带内）
+        faces = []
+        for axis in range(3):
+            u, v = [a for a in range(3) if a != axis]
+            step_u = np.zeros(3, dtype=np.int64)
+            step_u[u] = 1
+            step_v = np.zeros(3, dtype=np.int64)
+            step_v[v] = 1
+            quad = np.stack([
+                np.arange(len(corner_keys)),
+                self._lookup(corner_keys, self._encode(corners + step_u, span)),
+                self._lookup(corner_keys, self._encode(corners + step_u + step_v, span)),
+                self._lookup(corner_keys, self._encode(corners + step_v, span))
+            ], axis=1)
+            faces.append(quad[(quad >= 0).all(axis=1)])
+        faces = np.concatenate(faces, axis=0)
+
+        resolved = 0
+        while True:
+            inside = values[faces] < 0
+            ambiguous = (
+                (inside[:, 0] == inside[:, 2]) & (inside[:, 1] == inside[:, 3]) & (inside[:, 0] != inside[:, 1])
+            )
+            if not ambiguous.any():
+                break
+
+            # 内部的一对对角角点中取值较大（离等值面较近）的一个
+            pairs = np.where(inside[ambiguous, 0:1], faces[ambiguous][:, [0, 2]], faces[ambiguous][:, [1, 3]])
+            closer = np.where(values[pairs[:, 0]] >= values[pairs[:, 1]], pairs[:, 0], pairs[:, 1])
+            closer = np.unique(closer)
+            values[closer] = AMBIGUITY_EPSILON
+            resolved += len(closer)
+
+        return values, resolved
+
+    def _surface_nets(
+        self,
+        cells: np.ndarray,
+        corner_keys: np.ndarray,
+        values: np.ndarray,
+        span: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        向量化的 Surface Nets 等值面提取
+
+        每个跨越等值面的体素生成一个顶点（边交点的平均），
+        每条符号变化的网格边生成一个由周围4个体素顶点组成的四边形
+        """
+        inside = values < 0
+
+        # 1. 找出角点符号不一致的体素
+        cell_corner_keys = self._encode(
+            (cells[:, None, :] + CORNER_OFFSETS[None, :, :]).reshape(-1, 3), span
+        ).reshape(-1, 8)
+        cell_corner_idx = np.searchsorted(corner_keys, cell_corner_keys)
+        cell_inside = inside[cell_corner_idx]
+        active = cell_inside.any(axis=1) & ~cell_inside.all(axis=1)
+
+        active_cells = cells[active]
+        active_keys = self._encode(active_cells, span)
+        corner_idx = cell_corner_idx[active]
+        corner_values = values[corner_idx]
+
+        # 2. 顶点位置：符号变化边上线性插值交点的平均
+        v0 = corner_values[:, CUBE_EDGES[:, 0]]
+        v1 = corner_values[:, CUBE_EDGES[:, 1]]
+        crossing = (v0 < 0) != (v1 < 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(crossing, v0 / (v0 - v1), 0.0)
+        edge_points = (
+            CORNER_OFFSETS[CUBE_EDGES[:, 0]][None, :, :]
+            + t[:, :, None] * (CORNER_OFFSETS[CUBE_EDGES[:, 1]] - CORNER_OFFSETS[CUBE_EDGES[:, 0]])[None, :, :]
+        )
+        edge_points = np.where(crossing[:, :, None], edge_points, 0.0)
+        vertices = active_cells + edge_points.sum(axis=1) / crossing.sum(axis=1, keepdims=True)
+
+        # 3. 每条符号变化的网格边生成一个四边形
+        corners = self._decode(corner_keys, span)
+        faces = []
+        for axis in range(3):
+            step = np.zeros(3, dtype=np.int64)
+            step[axis] = 1
+            neighbor_idx = self._lookup(corner_keys, self._encode(corners + step, span))
+            sign_change = (neighbor_idx >= 0) & (inside != inside[neighbor_idx])
+
+            edge_starts = corners[sign_change]
+            outward = np.where(inside[sign_change], 1.0, -1.0)
+
+            # 共享该边的4个体素，按环绕顺序排列
+            u, v = [a for a in range(3) if a != axis]
+            ring = []
+            for du, dv in ((0, 0), (1, 0), (1, 1), (0, 1)):
+                offset = np.zeros(3, dtype=np.int64)
+                offset[u] = -du
+                offset[v] = -dv
+                ring.append(self._lookup(active_keys, self._encode(edge_starts + offset, span)))
+            quads = np.stack(ring, axis=1)
+
+            valid = (quads >= 0).all(axis=1)
+            quads = quads[valid]
+            outward = outward[valid]
+
+            # 环绕顺序在 (u, v) 平面内为逆时针，法向沿 u×v；
+            # 按边的内外方向翻转，使法向从内部指向外部
+            base_sign = 1 if axis != 1 else -1
+            flip = base_sign * outward < 0
+            quads[flip] = quads[flip][:, ::-1]
+
+            faces.append(quads[:, [0, 1, 2]])
+            faces.append(quads[:, [0, 2, 3]])
+
+        return vertices, np.concatenate(faces, axis=0)
+
+    def _drop_cavity_shells(self, mesh: trimesh.Trimesh) -> trimesh.Trimesh:
+        """
+        去除内部空腔壳
+
+        无符号距离等值面对封闭输入会产生内外两层壳，
+        朝向一致时内壳包围的是空腔，其有向体积为负。
+        连通分量只沿流形边（恰好被两个面共享）传播，
+        这样内外壳在个别非流形点相接时仍能分开
+        """
+        if len(mesh.faces) == 0:
+            return mesh
+
+        faces = mesh.faces
+        num_faces = len(faces)
+
+        # 1. 按无向边分组，找出恰好被两个面共享的边
+        edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+        edge_faces = np.repeat(np.arange(num_faces), 3)
+        edge_keys = edges[:, 0] * len(mesh.vertices) + edges[:, 1]
+        order = np.argsort(edge_keys, kind='stable')
+        edge_keys = edge_keys[order]
+        edge_faces = edge_faces[order]
+        _, starts, counts = np.unique(edge_keys, return_index=True, return_counts=True)
+        manifold = starts[counts == 2]
+
+        # 2. 面邻接图上的连通分量
+        graph = coo_matrix(
+            (np.ones(len(manifold), dtype=np.int8), (edge_faces[manifold], edge_faces[manifold + 1])),
+            shape=(num_faces, num_faces)
+        )
+        _, face_labels = connected_components(graph, directed=False)
+
+        triangles = mesh.vertices[faces]
+        signed = np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])) / 6.0
+        component_volume = np.bincount(face_labels, weights=signed)
+
+        keep_faces = component_volume[face_labels] > 0
+        if not keep_faces.any():
+            return mesh
+
+        result = trimesh.Trimesh(vertices=mesh.vertices, faces=faces[keep_faces], process=False)
+        result.remove_unreferenced_vertices()
+        return result
+
+    @staticmethod
+    def _lookup(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        """在有序键数组中查找键的位置，不存在时为 -1"""
+        if len(sorted_keys) == 0:
+            return np.full(keys.shape, -1, dtype=np.int64)
+        index = np.clip(np.searchsorted(sorted_keys, keys), 0, len(sorted_keys) - 1)
+        return np.where(sorted_keys[index] == keys, index, -1)
+
+    @staticmethod
+    def _encode(cells: np.ndarray, span: int) -> np.ndarray:
+        """把体素整数坐标编码为 int64 键"""
+        return (cells[..., 0] * span + cells[..., 1]) * span + cells[..., 2]
+
+    @staticmethod
+    def _decode(keys: np.ndarray, span: int) -> np.ndarray:
+        """把 int64 键解码回体素整数坐标"""
+        z = keys % span
+        y = (keys // span) % span
+        x = keys // (span * span)
+        return np.stack([x, y, z], axis=-1)
@@ -0,0 +1,165 @@
+"""
+阶段图模块
+把处理流程表示为显式声明输入的阶段序列，
+每个阶段的输出按其输入内容的哈希记忆化，只有输入变化的阶段才会重新执行；
+带 is_fallback 标记的输出（回退结果）不写入缓存
+"""
+
+import hashlib
+import logging
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from services.mesh_cache import MeshCache
+
+logger = logging.getLogger(__name__)
+
+
+def value_digest(value: Any) -> str:
+    """计算任意（可嵌套的）值的内容哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value: Any):
+    """递归地把值写入哈希；字典按键排序，数组按类型、形状和字节"""
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape}:".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, BaseModel):
+        _update_digest(digest, value.model_dump())
+    elif isinstance(value, Enum):
+        _update_digest(digest, value.value)
+    elif isinstance(value, dict):
+        digest.update(b"dict{")
+        for key in sorted(value, key=str):
+            _update_digest(digest, str(key))
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"list[")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, (np.floating, np.integer, np.bool_)):
+        _update_digest(digest, value.item())
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def is_fallback(value: Any) -> bool:
+    """阶段输出是否为回退结果（字典中 is_fallback 为真）"""
+    return isinstance(value, dict) and bool(value.get('is_fallback'))
+
+
+class Stage:
+    """流程中的一个阶段"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        inputs: Sequence[str],
+        memoize: bool = True,
+        unkeyed_inputs: Sequence[str] = ()
+    ):
+        """
+        Args:
+            name: 阶段名（也是输出名）
+            func: 异步函数，按 inputs 的顺序接收参数，不得修改输入对象
+            inputs: 输入名，可以是运行参数或前面阶段的输出
+            memoize: 是否记忆化（读文件等依赖外部状态的阶段应关闭）
+            unkeyed_inputs: 传给函数但不参与缓存键的输入（如同内容文件的路径）
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.memoize = memoize
+        self.unkeyed_inputs = set(unkeyed_inputs)
+
+
+class StageGraph:
+    """按输入哈希记忆化的阶段图"""
+
+    def __init__(self, cache: MeshCache):
+        self.cache = cache
+        self._stages: List[Stage] = []
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        inputs: Sequence[str],
+        memoize: bool = True,
+        unkeyed_inputs: Sequence[str] = ()
+    ) -> 'StageGraph':
+        """添加阶段；阶段按添加顺序执行，只能依赖运行参数和已添加的阶段"""
+        if any(stage.name == name for stage in self._stages):
+            raise ValueError(f"Duplicate stage: {name}")
+        self._stages.append(Stage(name, func, inputs, memoize, unkeyed_inputs))
+        return self
+
+    async def run(
+        self,
+        params: Dict[str, Any],
+        only: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        执行阶段图
+
+        Args:
+            params: 运行参数（分段执行时还包含前面阶段的输出）
+            only: 只执行这些阶段，为空时执行全部阶段
+
+        Returns:
+            (所有参数与阶段输出, 各阶段的执行情况 'hit' / 'run' / 'fallback')
+        """
+        values: Dict[str, Any] = dict(params)
+        digests: Dict[str, str] = {}
+        report: Dict[str, str] = {}
+
+        def digest_of(name: str) -> str:
+            if name not in digests:
+                digests[name] = value_digest(values[name])
+            return digests[name]
+
+        for stage in self._stages:
+            if only is not None and stage.name not in only:
+                continue
+
+            missing = [name for name in stage.inputs if name not in values]
+            if missing:
+                raise KeyError(f"Stage {stage.name} is missing inputs: {missing}")
+
+            args = [values[name] for name in stage.inputs]
+            if not stage.memoize:
+                values[stage.name] = await stage.func(*args)
+                report[stage.name] = 'run'
+                continue
+
+            # 缓存键只由阶段名和各输入的内容哈希构成
+            key_digest = value_digest([
+                (name, digest_of(name)) for name in stage.inputs if name not in stage.unkeyed_inputs
+            ])
+            cache_key = (f'stage:{stage.name}', key_digest)
+
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                values[stage.name], digests[stage.name] = cached
+                report[stage.name] = 'hit'
+                continue
+
+            result = await stage.func(*args)
+            values[stage.name] = result
+            if is_fallback(result):
+                report[stage.name] = 'fallback'
+                continue
+            self.cache.put(cache_key, (result, digest_of(stage.name)))
+            report[stage.name] = 'run'
+
+        logger.info(f"Stage graph run: {report}")
+        return values, report
@@ -0,0 +1,274 @@
+"""
+流式网格采样模块
+对超出内存的大网格（二进制STL / 二进制PLY / OBJ）做两遍分块采样，
+第一遍累计各块面积，第二遍按面积分配点数并采样，内存占用与文件大小无关
+"""
+
+import os
+import logging
+import tempfile
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from services.point_sampling import triangle_areas, choose_faces_by_area, sample_points_on_triangles
+
+logger = logging.getLogger(__name__)
+
+# 支持流式采样的格式
+STREAMING_FORMATS = ('.stl', '.ply', '.obj')
+
+# 二进制STL的三角形记录
+STL_RECORD_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attributes', '<u2')
+])
+
+# PLY属性类型到numpy类型的映射
+PLY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'
+}
+
+
+class StreamingMeshSampler:
+    """有界内存的两遍流式表面采样器"""
+
+    def __init__(self, chunk_faces: int = 1_000_000, obj_batch_lines: int = 200_000):
+        self.chunk_faces = chunk_faces
+        self.obj_batch_lines = obj_batch_lines
+
+    def supports(self, file_path: str) -> bool:
+        """判断文件格式是否支持流式采样"""
+        return os.path.splitext(file_path)[1].lower() in STREAMING_FORMATS
+
+    def sample(
+        self,
+        file_path: str,
+        count: int,
+        seed: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        流式采样表面点
+
+        Args:
+            file_path: 网格文件路径
+            count: 采样点数
+            seed: 随机种子
+
+        Returns:
+            (points, normals, surface_area)
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+
+        with tempfile.TemporaryDirectory(prefix='stream_sampler_') as work_dir:
+            if extension == '.stl':
+                chunks = self._stl_chunks(file_path)
+            elif extension == '.ply':
+                chunks = self._ply_chunks(file_path)
+            elif extension == '.obj':
+                chunks = self._obj_chunks(file_path, work_dir)
+            else:
+                raise ValueError(f"Unsupported streaming format: {extension}")
+
+            return self._two_pass_sample(chunks, count, seed)
+
+    def _two_pass_sample(
+        self,
+        chunk_source: Callable[[], Iterator[np.ndarray]],
+        count: int,
+        seed: Optional[int]
+    ) -> Tuple[np.ndarray, np.ndarray, float]:
+        """两遍采样：先累计各块面积，再按面积分配点数"""
+        seed_sequence = np.random.SeedSequence(seed)
+
+        # 第一遍：各块面积总和
+        area_totals = np.array([triangle_areas(triangles).sum() for triangles in chunk_source()])
+        surface_area = float(area_totals.sum())
+        if surface_area <= 0:
+            raise ValueError("Mesh has no surface area")
+
+        master_rng = np.random.default_rng(seed_sequence)
+        budgets = master_rng.multinomial(count, area_totals / surface_area)
+        chunk_seeds = seed_sequence.spawn(len(budgets))
+
+        # 第二遍：各块按预算采样
+        points = np.empty((count, 3), dtype=np.float64)
+        normals = np.empty((count, 3), dtype=np.float64)
+        offset = 0
+        for triangles, budget, chunk_seed in zip(chunk_source(), budgets, chunk_seeds):
+            if budget == 0:
+                continue
+            rng = np.random.default_rng(chunk_seed)
+            face_index = choose_faces_by_area(triangle_areas(triangles), budget, rng)
+            chunk_points, chunk_normals = sample_points_on_triangles(triangles[face_index], rng)
+            points[offset:offset + budget] = chunk_points
+            normals[offset:offset + budget] = chunk_normals
+            offset += budget
+
+        order = master_rng.permutation(count)
+        return points[order], normals[order], surface_area
+
+    def _stl_chunks(self, file_path: str):
+        """二进制STL：直接内存映射三角形记录"""
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            f.seek(80)
+            face_count = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+
+        if file_size != 84 + face_count * STL_RECORD_DTYPE.itemsize:
+            raise ValueError("Only binary STL files can be streamed")
+
+        records = np.memmap(file_path, dtype=STL_RECORD_DTYPE, mode='r', offset=84, shape=(face_count,))
+
+        def chunks() -> Iterator[np.ndarray]:
+            for start in range(0, face_count, self.chunk_faces):
+                yield records['vertices'][start:start + self.chunk_faces].astype(np.float64)
+
+        return chunks
+
+    def _ply_chunks(self, file_path: str):
+        """二进制PLY：解析头部后分别内存映射顶点和三角面记录"""
+        with open(file_path, 'rb') as f:
+            if f.readline().strip() != b'ply':
+                raise ValueError("Not a PLY file")
+
+            elements = []
+            data_format = None
+            while True:
+                line = f.readline()
+                if not line:
+                    raise ValueError("Unterminated PLY header")
+                tokens = line.decode('ascii', errors='replace').split()
+                if not tokens:
+                    continue
+                if tokens[0] == 'format':
+                    data_format = tokens[1]
+                elif tokens[0] == 'element':
+                    elements.append({'name': tokens[1], 'count': int(tokens[2]), 'properties': []})
+                elif tokens[0] == 'property':
+                    elements[-1]['properties'].append(tokens[1:])
+                elif tokens[0] == 'end_header':
+                    break
+            data_offset = f.tell()
+
+        if data_format not in ('binary_little_endian', 'binary_big_endian'):
+            raise ValueError("Only binary PLY files can be streamed")
+        endian = '<' if data_format == 'binary_little_endian' else '>'
+
+        # 计算各元素的记录类型和数据偏移
+        vertex_info = face_info = None
+        offset = data_offset
+        for element in elements:
+            dtype = self._ply_record_dtype(element, endian)
+            if element['name'] == 'vertex':
+                vertex_info = (offset, element['count'], dtype)
+            elif element['name'] == 'face':
+                face_info = (offset, element['count'], dtype)
+            offset += element['count'] * dtype.itemsize
+
+        if vertex_info is None or face_info is None:
+            raise ValueError("PLY file has no vertex or face element")
+
+        vertices = np.memmap(
+            file_path, dtype=vertex_info[2], mode='r', offset=vertex_info[0], shape=(vertex_info[1],)
+        )
+        faces = np.memmap(
+            file_path, dtype=face_info[2], mode='r', offset=face_info[0], shape=(face_info[1],)
+        )
+        face_count = face_info[1]
+
+        def chunks() -> Iterator[np.ndarray]:
+            for start in range(0, face_count, self.chunk_faces):
+                face_chunk = faces[start:start + self.chunk_faces]
+                if np.any(face_chunk['count'] != 3):
+                    raise ValueError("Only triangulated PLY files can be streamed")
+                corner_records = vertices[np.asarray(face_chunk['indices']).reshape(-1)]
+                triangles = np.stack(
+                    [corner_records['x'], corner_records['y'], corner_records['z']], axis=-1
+                ).astype(np.float64)
+                yield triangles.reshape(-1, 3, 3)
+
+        return chunks
+
+    @staticmethod
+    def _ply_record_dtype(element: dict, endian: str) -> np.dtype:
+        """
+        由PLY元素的属性构造定长记录类型
+
+        面元素只支持列表长度固定为3的三角面
+        """
+        fields = []
+        for prop in element['properties']:
+            if prop[0] == 'list':
+                if element['name'] != 'face':
+                    raise ValueError("List properties are only supported on faces")
+                fields.append(('count', endian + PLY_TYPES[prop[1]]))
+                fields.append(('indices', endian + PLY_TYPES[prop[2]], (3,)))
+            else:
+                name = 'indices_scalar' if prop[1] in ('count', 'indices') else prop[1]
+                fields.append((name, endian + PLY_TYPES[prop[0]]))
+        return np.dtype(fields)
+
+    def _obj_chunks(self, file_path: str, work_dir: str):
+        """
+        OBJ：逐行解析，把顶点和（扇形三角化后的）面索引分批写入临时文件，
+        之后按内存映射分块读取
+        """
+        vertex_path = os.path.join(work_dir, 'vertices.f64')
+        face_path = os.path.join(work_dir, 'faces.i64')
+        vertex_count = 0
+        face_count = 0
+
+        with open(file_path, 'rb') as src, open(vertex_path, 'wb') as vertex_out, open(face_path, 'wb') as face_out:
+            vertex_batch = []
+            face_batch = []
+
+            def flush_vertices():
+                nonlocal vertex_count
+                if vertex_batch:
+                    np.asarray(vertex_batch, dtype=np.float64).tofile(vertex_out)
+                    vertex_count += len(vertex_batch)
+                    vertex_batch.clear()
+
+            def flush_faces():
+                nonlocal face_count
+                if face_batch:
+                    np.asarray(face_batch, dtype=np.int64).tofile(face_out)
+                    face_count += len(face_batch)
+                    face_batch.clear()
+
+            for line in src:
+                if line.startswith(b'v '):
+                    vertex_batch.append([float(x) for x in line.split()[1:4]])
+                    if len(vertex_batch) >= self.obj_batch_lines:
+                        flush_vertices()
+                elif line.startswith(b'f '):
+                    # 负索引相对当前已读顶点数
+                    current = vertex_count + len(vertex_batch)
+                    indices = []
+                    for token in line.split()[1:]:
+                        index = int(token.split(b'/')[0])
+                        indices.append(index - 1 if index > 0 else current + index)
+                    for i in range(1, len(indices) - 1):
+                        face_batch.append([indices[0], indices[i], indices[i + 1]])
+                    if len(face_batch) >= self.obj_batch_lines:
+                        flush_faces()
+
+            flush_vertices()
+            flush_faces()
+
+        if vertex_count == 0 or face_count == 0:
+            raise ValueError("OBJ file has no faces")
+
+        vertices = np.memmap(vertex_path, dtype=np.float64, mode='r', shape=(vertex_count, 3))
+        faces = np.memmap(face_path, dtype=np.int64, mode='r', shape=(face_count, 3))
+
+        def chunks() -> Iterator[np.ndarray]:
+            for start in range(0, face_count, self.chunk_faces):
+                yield vertices[np.asarray(faces[start:start + self.chunk_faces])]
+
+        return chunks
@@ -0,0 +1,166 @@
+"""
+对称性模块
+以点云主成分方向作为候选镜像平面，用KD树计算反射残差打分，再用镜像点对迭代细化平面；
+模型判定为左右对称时，对解码后的关节做镜像配对平均，或只保留一半骨骼并镜像补全另一半
+"""
+
+import logging
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+# 用于检测的最多点数
+DETECTION_POINTS = 4096
+# 反射残差（中位数）与点云自身最近邻间距（中位数）之比低于该值时视为对称
+SYMMETRY_RATIO_THRESHOLD = 1.5
+# 平面细化迭代次数
+REFINE_ITERATIONS = 3
+
+# 关节到平面的距离低于该值时视为位于对称面上（归一化坐标）
+PLANE_TOLERANCE = 0.02
+# 镜像关节配对的最大距离（归一化坐标）
+MATCH_TOLERANCE = 0.08
+
+
+def reflect(points: np.ndarray, normal: np.ndarray, origin: np.ndarray) -> np.ndarray:
+    """关于过 origin、法向为 normal 的平面做镜像"""
+    return points - 2.0 * ((points - origin) @ normal)[:, None] * normal
+
+
+class SymmetryDetector:
+    """镜像对称检测与骨骼对称化"""
+
+    def __init__(self, ratio_threshold: float = SYMMETRY_RATIO_THRESHOLD):
+        self.ratio_threshold = ratio_threshold
+
+    def detect(self, points: np.ndarray) -> Dict[str, Any]:
+        """
+        检测镜像对称平面
+
+        Args:
+            points: 点云坐标 (N, 3)
+
+        Returns:
+            symmetric / normal / origin / ratio（反射残差与点间距之比）/ candidate_ratios
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if len(points) > DETECTION_POINTS:
+            points = points[np.random.default_rng(0).choice(len(points), DETECTION_POINTS, replace=False)]
+        tree = cKDTree(points)
+        spacing = max(float(np.median(tree.query(points, k=2)[0][:, 1])), 1e-12)
+
+        # 1. 候选平面：过质心、法向为各主成分方向
+        origin = points.mean(axis=0)
+        _, _, axes = np.linalg.svd(points - origin, full_matrices=False)
+        ratios = [self._residual(tree, points, axis, origin) / spacing for axis in axes]
+        best = int(np.argmin(ratios))
+
+        # 2. 用镜像点对细化最优平面
+        normal, origin = self._refine(tree, points, axes[best], origin)
+        ratio = self._residual(tree, points, normal, origin) / spacing
+
+        result = {
+            'symmetric': bool(ratio < self.ratio_threshold),
+            'normal': normal.tolist(),
+            'origin': origin.tolist(),
+            'ratio': round(float(ratio), 4),
+            'candidate_ratios': [round(float(value), 4) for value in ratios]
+        }
+        logger.info(f"Symmetry detection: {result}")
+        return result
+
+    def symmetrize(self, joints: np.ndarray, plane: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        镜像配对平均：互为最近镜像的关节对取平均后互为镜像，对称面上的关节投影到平面
+
+        Returns:
+            (对称化后的关节, 统计)
+        """
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 3)
+        if len(joints) == 0:
+            return joints, {'paired_joints': 0, 'plane_joints': 0}
+        normal, origin = np.asarray(plane['normal']), np.asarray(plane['origin'])
+        reflected = reflect(joints, normal, origin)
+        distance, partner = cKDTree(joints).query(reflected)
+        index = np.arange(len(joints))
+
+        offset = (joints - origin) @ normal
+        on_plane = np.abs(offset) < PLANE_TOLERANCE
+        paired = (partner[partner] == index) & (partner != index) & (distance < MATCH_TOLERANCE) & ~on_plane
+
+        result = joints.copy()
+        result[paired] = 0.5 * (joints[paired] + reflected[partner[paired]])
+        result[on_plane] -= offset[on_plane, None] * normal
+        return result, {'paired_joints': int(paired.sum()), 'plane_joints': int(on_plane.sum())}
+
+    def mirror_half(
+        self,
+        joints: np.ndarray,
+        bones: np.ndarray,
+        plane: Dict[str, Any]
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+        """
+        半边生成：保留关节较多的一侧（含对称面上的关节）及其骨骼，镜像补全另一侧
+
+        Returns:
+            (关节, 骨骼, 统计)
+        """
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 3)
+        bones = np.asarray(bones, dtype=np.int64).reshape(-1, 2)
+        normal, origin = np.asarray(plane['normal']), np.asarray(plane['origin'])
+        offset = (joints - origin) @ normal
+        on_plane = np.abs(offset) < PLANE_TOLERANCE
+        if (offset < -PLANE_TOLERANCE).sum() > (offset > PLANE_TOLERANCE).sum():
+            offset = -offset
+
+        # 1. 保留半边，重新编号；对称面上的关节投影到平面
+        kept = on_plane | (offset > 0)
+        kept_bones = bones[kept[bones].all(axis=1)]
+        if len(kept_bones) == 0:
+            return joints, bones, {'mirrored_joints': 0, 'dropped_joints': 0}
+        new_index = np.cumsum(kept) - 1
+        half = joints[kept]
+        half_on_plane = on_plane[kept]
+        half[half_on_plane] -= ((half[half_on_plane] - origin) @ normal)[:, None] * normal
+        half_bones = new_index[kept_bones]
+
+        # 2. 镜像补全：离开平面的关节生成镜像副本，平面上的关节映射到自身
+        off_plane = np.flatnonzero(~half_on_plane)
+        mirror_index = np.arange(len(half))
+        mirror_index[off_plane] = len(half) + np.arange(len(off_plane))
+        mirrored_joints = np.vstack([half, reflect(half[off_plane], normal, origin)])
+        mirrored_bones = np.unique(np.vstack([half_bones, mirror_index[half_bones]]), axis=0)
+
+        stats = {'mirrored_joints': len(off_plane), 'dropped_joints': int((~kept).sum())}
+        return mirrored_joints, mirrored_bones, stats
+
+    def _residual(self, tree: cKDTree, points: np.ndarray, normal: np.ndarray, origin: np.ndarray) -> float:
+        """反射点到原点云最近邻距离的中位数（对局部不对称的配件不敏感）"""
+        distance, _ = tree.query(reflect(points, normal, origin))
+        return float(np.median(distance))
+
+    def _refine(
+        self,
+        tree: cKDTree,
+        points: np.ndarray,
+        normal: np.ndarray,
+        origin: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """镜像点对 p、q 的差向量应平行于法向、中点应在平面上：取差向量主方向和中点均值更新平面"""
+        for _ in range(REFINE_ITERATIONS):
+            distance, partner = tree.query(reflect(points, normal, origin))
+            difference = points - points[partner]
+            separation = np.linalg.norm(difference, axis=1)
+            # 只用匹配良好且离开平面的点对
+            inliers = (distance <= np.median(distance)) & (separation > 2.0 * PLANE_TOLERANCE)
+            if inliers.sum() < 3:
+                break
+            # 差向量方向不一致（p->q 与 q->p），用外积矩阵的主特征向量
+            _, vectors = np.linalg.eigh(difference[inliers].T @ difference[inliers])
+            refined = vectors[:, -1]
+            normal = refined if refined @ normal >= 0 else -refined
+            origin = 0.5 * (points[inliers] + points[partner[inliers]]).mean(axis=0)
+        return normal, origin
@@ -0,0 +1,71 @@
+"""
+任务结果登记模块
+按任务号保存已完成的处理结果，条目数有上限（LRU 淘汰）且超过存活时间后失效，
+结果文件本身由结果存储持久化，这里只保留供 /results 按 Accept 编码的内存副本
+"""
+
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from models.requests import ProcessingResult
+
+logger = logging.getLogger(__name__)
+
+# 默认最多保留的任务结果数
+DEFAULT_MAX_RESULTS = 256
+# 默认结果存活时间（秒）
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+class TaskResultRegistry:
+    """有界、带过期时间的任务结果表"""
+
+    def __init__(self, max_results: int = DEFAULT_MAX_RESULTS, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_results = max_results
+        self.ttl_seconds = ttl_seconds
+        # task_id -> (写入时间, 结果)，按最近使用排序
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {'evicted': 0, 'expired': 0}
+
+    def put(self, task_id: str, result: ProcessingResult):
+        """登记结果，超出上限时淘汰最久未使用的结果"""
+        self._entries[task_id] = (time.monotonic(), result)
+        self._entries.move_to_end(task_id)
+        self._expire()
+        while len(self._entries) > self.max_results:
+            self._entries.popitem(last=False)
+            self._stats['evicted'] += 1
+
+    def get(self, task_id: str) -> Optional[ProcessingResult]:
+        """读取结果，不存在或已过期时返回None"""
+        self._expire()
+        entry = self._entries.get(task_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(task_id)
+        return entry[1]
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self):
+        """删除超过存活时间的结果（按写入时间判断）"""
+        deadline = time.monotonic() - self.ttl_seconds
+        expired = [task_id for task_id, (created, _) in self._entries.items() if created < deadline]
+        for task_id in expired:
+            del self._entries[task_id]
+        self._stats['expired'] += len(expired)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取结果表指标"""
+        return {
+            'results': len(self._entries),
+            'max_results': self.max_results,
+            'ttl_seconds': self.ttl_seconds,
+            **self._stats
+        }
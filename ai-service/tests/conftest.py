@@ -0,0 +1,8 @@
+"""
+测试配置：服务代码以 src 为根目录导入
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
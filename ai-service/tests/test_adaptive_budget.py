@@ -0,0 +1,79 @@
+"""
+自适应点数测试：按各金字塔层级的实测覆盖率选择点数，请求的点数范围校验
+"""
+
+import pytest
+import trimesh
+from pydantic import ValidationError
+
+from models.requests import ProcessingOptions
+from services.enhanced_sampling import EnhancedSampling
+from services.point_pyramid import PYRAMID_LEVELS
+
+
+@pytest.fixture(scope='module')
+def sampling():
+    return EnhancedSampling()
+
+
+@pytest.fixture(scope='module')
+def box_coverage(sampling):
+    return sampling.measure_level_coverage(trimesh.creation.box())
+
+
+def test_level_coverage_grows_with_level(box_coverage):
+    assert box_coverage['levels'] == list(PYRAMID_LEVELS)
+    coverage = box_coverage['coverage']
+    assert all(0.0 <= value <= 1.0 for value in coverage)
+    assert coverage == sorted(coverage)
+    assert coverage[0] < 0.9 < coverage[-1]
+
+
+def test_selects_smallest_level_meeting_target(sampling, box_coverage):
+    selection = sampling.select_adaptive_budget(
+        box_coverage, {'min_pc_num': 1024, 'max_pc_num': 16384, 'adaptive_target_quality': 0.9}
+    )
+    measured = dict(zip(box_coverage['levels'], box_coverage['coverage']))
+    selected = selection['selected_point_count']
+
+    assert selection['target_met']
+    assert selection['measured_coverage'] == measured[selected] >= 0.9
+    assert all(measured[level] < 0.9 for level in PYRAMID_LEVELS if level < selected)
+
+
+def test_selection_respects_bounds(sampling, box_coverage):
+    selection = sampling.select_adaptive_budget(
+        box_coverage, {'min_pc_num': 1024, 'max_pc_num': 2048, 'adaptive_target_quality': 0.99}
+    )
+    assert selection['selected_point_count'] == 2048
+    assert not selection['target_met']
+
+    # 范围内没有金字塔层级时取上限，不报告覆盖率
+    selection = sampling.select_adaptive_budget(
+        box_coverage, {'min_pc_num': 3000, 'max_pc_num': 3500, 'adaptive_target_quality': 0.9}
+    )
+    assert selection['selected_point_count'] == 3500
+    assert selection['measured_coverage'] is None
+
+
+def test_larger_relative_area_needs_more_points(sampling, box_coverage):
+    # 相对包围盒对角线，立方体的表面积约为球面的两倍，同一覆盖半径下需要更多点
+    sphere_coverage = sampling.measure_level_coverage(trimesh.creation.icosphere(subdivisions=4))
+    strategy = {'min_pc_num': 1024, 'max_pc_num': 16384, 'adaptive_target_quality': 0.9}
+    sphere = sampling.select_adaptive_budget(sphere_coverage, strategy)['selected_point_count']
+    box = sampling.select_adaptive_budget(box_coverage, strategy)['selected_point_count']
+    assert sphere < box
+
+
+def test_point_bounds_validation():
+    options = ProcessingOptions(min_pc_num=2048, max_pc_num=2048)
+    assert options.min_pc_num == options.max_pc_num == 2048
+
+    with pytest.raises(ValidationError):
+        ProcessingOptions(min_pc_num=4096, max_pc_num=2048)
+    with pytest.raises(ValidationError):
+        ProcessingOptions(min_pc_num=0)
+    with pytest.raises(ValidationError):
+        ProcessingOptions(max_pc_num=10 ** 7)
+    with pytest.raises(ValidationError):
+        ProcessingOptions(input_pc_num=10 ** 7)
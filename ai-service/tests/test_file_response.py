@@ -0,0 +1,171 @@
+"""
+结果文件响应测试：ETag 条件请求、Range / If-Range 处理，以及按内容哈希命名的结果存储
+"""
+
+import asyncio
+import hashlib
+import io
+
+import numpy as np
+import pytest
+
+from models.requests import SkeletonData
+from services.file_response import RangeFileResponse, IMMUTABLE_CACHE_CONTROL, accepts_encoding
+from services.result_store import ResultStore
+
+CONTENT = bytes(range(256)) * 40
+ETAG = '"0123456789abcdef0123456789abcdef"'
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    path = tmp_path / 'artifact.bin'
+    path.write_bytes(CONTENT)
+    return path
+
+
+def _call(path, headers, method='GET', extensions=None):
+    """以 ASGI 方式调用响应，返回 (状态码, 响应头, 响应体, 发送的消息)"""
+    response = RangeFileResponse(path, headers, ETAG, 'application/octet-stream')
+    scope = {'type': 'http', 'method': method}
+    if extensions is not None:
+        scope['extensions'] = extensions
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, None, send))
+    start = messages[0]
+    response_headers = {key.decode(): value.decode() for key, value in start['headers']}
+    body = b''.join(m.get('body', b'') for m in messages[1:] if m['type'] == 'http.response.body')
+    return start['status'], response_headers, body, messages
+
+
+def test_full_response(artifact):
+    status, headers, body, _ = _call(artifact, {})
+    assert status == 200
+    assert body == CONTENT
+    assert headers['content-length'] == str(len(CONTENT))
+    assert headers['etag'] == ETAG
+    assert headers['accept-ranges'] == 'bytes'
+    assert headers['cache-control'] == IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.mark.parametrize('range_header, start, end', [
+    ('bytes=0-0', 0, 0),
+    ('bytes=10-19', 10, 19),
+    ('bytes=100-', 100, len(CONTENT) - 1),
+    ('bytes=-5', len(CONTENT) - 5, len(CONTENT) - 1),
+    ('bytes=-999999', 0, len(CONTENT) - 1),
+    ('bytes=10000-999999', 10000, len(CONTENT) - 1),
+])
+def test_single_range(artifact, range_header, start, end):
+    status, headers, body, _ = _call(artifact, {'range': range_header})
+    assert status == 206
+    assert body == CONTENT[start:end + 1]
+    assert headers['content-range'] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert headers['content-length'] == str(end - start + 1)
+
+
+@pytest.mark.parametrize('range_header', ['bytes=999999-', 'bytes=20-10', 'bytes=-0'])
+def test_unsatisfiable_range(artifact, range_header):
+    status, headers, body, _ = _call(artifact, {'range': range_header})
+    assert status == 416
+    assert body == b''
+    assert headers['content-range'] == f"bytes */{len(CONTENT)}"
+
+
+@pytest.mark.parametrize('range_header', ['bytes=0-1,4-5', 'items=0-10', 'bytes=abc'])
+def test_unsupported_range_returns_full_content(artifact, range_header):
+    status, _, body, _ = _call(artifact, {'range': range_header})
+    assert status == 200
+    assert body == CONTENT
+
+
+@pytest.mark.parametrize('if_none_match', [ETAG, f'W/{ETAG}', f'"other", {ETAG}', '*'])
+def test_if_none_match(artifact, if_none_match):
+    status, headers, body, _ = _call(artifact, {'if-none-match': if_none_match, 'range': 'bytes=0-9'})
+    assert status == 304
+    assert body == b''
+    assert headers['etag'] == ETAG
+    assert 'content-length' not in headers
+
+
+def test_if_none_match_mismatch(artifact):
+    status, _, body, _ = _call(artifact, {'if-none-match': '"other"'})
+    assert status == 200
+    assert body == CONTENT
+
+
+def test_if_range(artifact):
+    status, _, body, _ = _call(artifact, {'range': 'bytes=0-9', 'if-range': ETAG})
+    assert status == 206 and body == CONTENT[:10]
+    # 客户端持有的版本已过期：忽略 Range，返回完整的新内容
+    status, _, body, _ = _call(artifact, {'range': 'bytes=0-9', 'if-range': '"stale"'})
+    assert status == 200 and body == CONTENT
+
+
+def test_head_sends_headers_only(artifact):
+    status, headers, body, _ = _call(artifact, {'range': 'bytes=0-9'}, method='HEAD')
+    assert status == 206
+    assert headers['content-length'] == '10'
+    assert body == b''
+
+
+def test_zero_copy_send(artifact):
+    status, _, _, messages = _call(artifact, {'range': 'bytes=5-14'}, extensions={'http.response.zerocopysend': {}})
+    assert status == 206
+    assert messages[1]['type'] == 'http.response.zerocopysend'
+    assert (messages[1]['offset'], messages[1]['count']) == (5, 10)
+
+
+def test_empty_file_range(tmp_path):
+    path = tmp_path / 'empty.bin'
+    path.write_bytes(b'')
+    status, _, _, _ = _call(path, {'range': 'bytes=0-'})
+    assert status == 416
+
+
+def test_result_store_names_by_content(tmp_path):
+    store = ResultStore(tmp_path)
+    skeleton = SkeletonData(joints=[[0, 0, 0], [0, 1, 0]], bones=[[0, 1]], parents=[-1, 0])
+
+    async def save_twice():
+        first = await store.save(skeleton)
+        second = await store.save(skeleton)
+        await store.flush()
+        return first, second, await store.path(first['arrays']), await store.path('../' + first['json'])
+
+    first, second, arrays_path, traversal = asyncio.run(save_twice())
+
+    assert first == second
+    assert traversal is None
+    decoded = store.read_decoded(arrays_path)
+    # 文件名即未压缩内容的哈希，可直接用作 ETag
+    assert first['arrays'].split('.', 1)[0] == hashlib.blake2b(decoded, digest_size=16).hexdigest()
+    np.testing.assert_array_equal(np.load(io.BytesIO(decoded))['bones'], [[0, 1]])
+    media_type, encoding = store.describe(first['arrays'])
+    assert media_type == 'application/x-npz'
+    assert encoding == ('zstd' if store.compress else None)
+    assert store.get_metrics()['deduplicated'] == len(first)
+    assert not list(tmp_path.glob('.tmp-*'))
+
+
+@pytest.mark.parametrize('header, accepted', [
+    ('zstd', True),
+    ('gzip, ZSTD', True),
+    ('gzip;q=1.0, zstd;q=0.5', True),
+    ('zstd;q=0', False),
+    ('zstd; q=0.0, gzip', False),
+    ('gzip, deflate', False),
+    ('*', True),
+    ('*;q=0', False),
+    ('zstd;q=0, *', False),
+    ('gzip, *;q=0.1', True),
+    ('zstdx', False),
+    ('', False),
+    (None, False),
+])
+def test_accepts_encoding(header, accepted):
+    assert accepts_encoding(header, 'zstd') is accepted
@@ -0,0 +1,133 @@
+"""
+GLB 导出测试：容器结构、访问器范围和蒙皮属性合法性
+"""
+
+import io
+import json
+import struct
+
+import numpy as np
+import trimesh
+
+from models.requests import SkinWeights
+from services.gltf_export import GLBExporter, CHUNK_BIN, CHUNK_JSON, GLB_MAGIC
+
+# 分量类型 -> 字节数 / 元素类型 -> 分量数
+COMPONENT_SIZES = {5121: 1, 5123: 2, 5125: 4, 5126: 4}
+TYPE_WIDTHS = {'SCALAR': 1, 'VEC3': 3, 'VEC4': 4, 'MAT4': 16}
+COMPONENT_DTYPES = {5121: np.uint8, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+
+
+def _parse_glb(glb: bytes):
+    """拆分 GLB 容器，返回 (JSON 文档, BIN 块)"""
+    magic, version, total_length = struct.unpack('<III', glb[:12])
+    assert magic == GLB_MAGIC and version == 2
+    assert total_length == len(glb)
+
+    json_length, json_type = struct.unpack('<II', glb[12:20])
+    assert json_type == CHUNK_JSON and json_length % 4 == 0
+    document = json.loads(glb[20:20 + json_length])
+
+    offset = 20 + json_length
+    bin_length, bin_type = struct.unpack('<II', glb[offset:offset + 8])
+    assert bin_type == CHUNK_BIN and bin_length % 4 == 0
+    binary = glb[offset + 8:offset + 8 + bin_length]
+    assert len(binary) == bin_length
+    return document, binary
+
+
+def _read_accessor(document, binary, index) -> np.ndarray:
+    accessor = document['accessors'][index]
+    view = document['bufferViews'][accessor['bufferView']]
+    width = TYPE_WIDTHS[accessor['type']]
+    component_size = COMPONENT_SIZES[accessor['componentType']]
+    assert view['byteOffset'] % component_size == 0
+    assert accessor['count'] * width * component_size <= view['byteLength']
+    assert view['byteOffset'] + view['byteLength'] <= document['buffers'][0]['byteLength']
+
+    data = np.frombuffer(
+        binary, dtype=COMPONENT_DTYPES[accessor['componentType']],
+        count=accessor['count'] * width, offset=view['byteOffset']
+    )
+    return data.reshape(accessor['count'], width)
+
+
+def _branching_skeleton():
+    """根关节 0 下挂两条链：骨骼 0、1 共用父端关节 0"""
+    joints = np.array([[0, 0, 0], [0.5, 0.5, 0], [-0.5, 0.5, 0], [0.5, 1.0, 0]], dtype=np.float32)
+    bones = np.array([[0, 1], [0, 2], [1, 3]], dtype=np.int32)
+    parents = np.array([-1, 0, 0, 1], dtype=np.int32)
+    return joints, bones, parents
+
+
+def _export(top_k: int = 3):
+    mesh = trimesh.creation.box()
+    joints, bones, parents = _branching_skeleton()
+    rng = np.random.default_rng(0)
+    vertex_count = len(mesh.vertices)
+    indices = np.stack([rng.permutation(len(bones))[:top_k] for _ in range(vertex_count)])
+    weights = rng.random((vertex_count, top_k)).astype(np.float32)
+    weights /= weights.sum(axis=1, keepdims=True)
+    skin_weights = SkinWeights(indices=indices, weights=weights, top_k=top_k, vertex_count=vertex_count)
+
+    glb = GLBExporter().export(mesh, joints, bones, parents, ['root', 'a', 'b', 'c'], skin_weights)
+    return mesh, glb
+
+
+def test_glb_container_and_accessors():
+    mesh, glb = _export()
+    document, binary = _parse_glb(glb)
+
+    primitive = document['meshes'][0]['primitives'][0]
+    positions = _read_accessor(document, binary, primitive['attributes']['POSITION'])
+    np.testing.assert_allclose(positions, mesh.vertices, atol=1e-6)
+    accessor = document['accessors'][primitive['attributes']['POSITION']]
+    np.testing.assert_allclose(accessor['min'], positions.min(axis=0))
+    np.testing.assert_allclose(accessor['max'], positions.max(axis=0))
+
+    indices = _read_accessor(document, binary, primitive['indices']).reshape(-1, 3)
+    np.testing.assert_array_equal(indices, mesh.faces)
+
+    skin = document['skins'][0]
+    assert skin['joints'] == [1, 2, 3, 4]
+    inverse_bind = _read_accessor(document, binary, skin['inverseBindMatrices'])
+    assert inverse_bind.shape == (4, 16)
+
+    scene = trimesh.load(io.BytesIO(glb), file_type='glb')
+    assert len(scene.geometry) == 1
+
+
+def test_skin_joints_unique_per_vertex():
+    _, glb = _export()
+    document, binary = _parse_glb(glb)
+    attributes = document['meshes'][0]['primitives'][0]['attributes']
+
+    joints = np.concatenate([
+        _read_accessor(document, binary, attributes[name]) for name in sorted(attributes) if name.startswith('JOINTS_')
+    ], axis=1).astype(np.int64)
+    weights = np.concatenate([
+        _read_accessor(document, binary, attributes[name]) for name in sorted(attributes) if name.startswith('WEIGHTS_')
+    ], axis=1)
+
+    assert joints.max() < len(document['skins'][0]['joints'])
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, atol=1e-6)
+    assert (weights >= 0).all()
+    # 非零权重的关节在同一顶点上不重复，零权重槽位指向关节 0
+    for row_joints, row_weights in zip(joints, weights):
+        active = row_joints[row_weights > 0]
+        assert len(active) == len(np.unique(active))
+    assert (joints[weights == 0] == 0).all()
+    # 权重降序排列
+    assert (np.diff(weights, axis=1) <= 1e-7).all()
+
+
+def test_merged_weights_follow_bone_heads():
+    _, glb = _export()
+    document, binary = _parse_glb(glb)
+    attributes = document['meshes'][0]['primitives'][0]['attributes']
+    joints = _read_accessor(document, binary, attributes['JOINTS_0']).astype(np.int64)
+
+    # 骨骼 0、1 都映射到关节 0，骨骼 2 映射到关节 1，因此每个顶点至多两个有效关节
+    weights = _read_accessor(document, binary, attributes['WEIGHTS_0'])
+    assert ((weights > 0).sum(axis=1) <= 2).all()
+    assert set(np.unique(joints[weights > 0])) <= {0, 1}
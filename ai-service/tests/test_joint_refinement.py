@@ -0,0 +1,50 @@
+"""
+关节细化测试：中轴吸附不依赖提示词，结构约束只在提示词要求时启用
+"""
+
+import numpy as np
+import trimesh
+
+from services.joint_refinement import JointRefiner, MAX_SNAP_DISTANCE
+
+
+def _column_cloud():
+    """沿 y 轴的方柱表面点云（截面中心线为 y 轴）"""
+    mesh = trimesh.creation.box(extents=[0.4, 1.0, 0.4])
+    points, faces = trimesh.sample.sample_surface(mesh, 20000, seed=0)
+    return np.hstack([points, mesh.face_normals[faces]])
+
+
+def _chain():
+    """根在底部、沿 y 轴向上的三关节链，中间关节偏离中轴"""
+    joints = np.array([[0.0, -0.4, 0.0], [0.06, 0.0, 0.0], [0.0, 0.4, 0.0]])
+    bones = np.array([[0, 1], [1, 2]])
+    parents = np.array([-1, 0, 1])
+    return joints, bones, parents, ['root', 'mid', 'tip']
+
+
+def test_snapping_runs_without_hints():
+    joints, bones, parents, names = _chain()
+    refined = JointRefiner().refine(joints, bones, parents, names, 0, _column_cloud(), None)
+
+    # 内部关节移向中轴，末端关节保持原位，结构不变
+    assert abs(refined['joints'][1, 0]) < abs(joints[1, 0])
+    assert np.linalg.norm(refined['joints'][1] - joints[1]) <= MAX_SNAP_DISTANCE + 1e-9
+    np.testing.assert_array_equal(refined['joints'][[0, 2]], joints[[0, 2]])
+    np.testing.assert_array_equal(refined['bones'], bones)
+    assert refined['inserted_joints'] == 0
+
+
+def test_hint_constraints_gated_on_hints():
+    joints, bones, parents, names = _chain()
+    cloud = _column_cloud()
+    refiner = JointRefiner()
+
+    plain = refiner.refine(joints, bones, parents, names, 0, cloud, {})
+    detailed = refiner.refine(joints, bones, parents, names, 0, cloud, {'emphasis_areas': ['detailed']})
+    spine = refiner.refine(joints, bones, parents, names, 0, cloud, {'joint_regions': ['spine']})
+
+    # 精细提示词加大吸附强度；脊柱提示词细分脊柱链
+    assert detailed['mean_shift'] > plain['mean_shift']
+    assert spine['inserted_joints'] > 0
+    assert len(spine['joints']) == len(joints) + spine['inserted_joints']
@@ -0,0 +1,100 @@
+"""
+网格上下文测试：点云归一化变换的记录与反求，关节按点云实际使用的变换映射回网格坐标；
+热扩散系数矩阵分解的缓存
+"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from services.mesh_context import MeshContext
+from services.skinning import HeatDiffusionSkinner
+from services.point_sampling import normalize_point_cloud, point_cloud_normalization
+
+
+def _ellipsoid():
+    """偏离原点的椭球（细分二十面体），包围盒与采样点包围盒不完全一致"""
+    mesh = trimesh.creation.icosphere(subdivisions=4)
+    mesh.apply_scale([2.0, 0.7, 1.2])
+    mesh.apply_translation([3.0, -1.0, 0.5])
+    return mesh
+
+
+def _sampled_cloud(mesh, count=8192, seed=0):
+    points, faces = trimesh.sample.sample_surface(mesh, count, seed=seed)
+    return points, mesh.face_normals[faces]
+
+
+def test_recorded_normalization_round_trip():
+    points, normals = _sampled_cloud(_ellipsoid())
+    normalization = point_cloud_normalization(points)
+    cloud = normalize_point_cloud(points, normals, normalization)
+
+    center, scale = normalization
+    assert np.abs(cloud[:, :3]).max() == pytest.approx(0.9995, abs=1e-6)
+    np.testing.assert_allclose(cloud[:, :3] * scale + center, points, atol=1e-5)
+    # 与不传变换时的结果一致
+    np.testing.assert_allclose(cloud, normalize_point_cloud(points, normals), atol=1e-6)
+
+
+def test_denormalize_uses_given_normalization():
+    mesh = _ellipsoid()
+    context = MeshContext(mesh, 'ellipsoid')
+    points, normals = _sampled_cloud(mesh)
+    normalization = point_cloud_normalization(points)
+    cloud = normalize_point_cloud(points, normals, normalization)
+
+    recovered = context.denormalize(cloud[:, :3].astype(np.float64), normalization)
+    np.testing.assert_allclose(recovered, points, atol=1e-5)
+    np.testing.assert_allclose(context.normalize(recovered, normalization), cloud[:, :3], atol=1e-5)
+
+
+def test_fit_normalization_recovers_unrecorded_transform():
+    mesh = _ellipsoid()
+    context = MeshContext(mesh, 'ellipsoid')
+    extent = mesh.extents.max()
+
+    for seed in range(3):
+        # 外部预处理的点云（不同采样）只有归一化结果，没有变换
+        points, normals = _sampled_cloud(mesh, seed=seed + 1)
+        cloud = normalize_point_cloud(points, normals)
+
+        fitted = context.fit_normalization(cloud[:, :3])
+        fit_error = np.abs(context.denormalize(cloud[:, :3].astype(np.float64), fitted) - points).max()
+        bounds_error = np.abs(context.denormalize(cloud[:, :3].astype(np.float64)) - points).max()
+        assert fit_error < 2e-4 * extent
+        assert fit_error < bounds_error
+
+
+def test_fit_normalization_rejects_flat_mesh():
+    plane = trimesh.Trimesh(
+        vertices=[[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], faces=[[0, 1, 2], [0, 2, 3]]
+    )
+    context = MeshContext(plane, 'plane')
+    points, normals = _sampled_cloud(plane, 2048)
+
+    with pytest.raises(ValueError):
+        context.fit_normalization(normalize_point_cloud(points, normals)[:, :3])
+
+
+def test_heat_factorization_is_reused_for_the_same_skeleton():
+    mesh = trimesh.creation.capsule(height=2.0, radius=0.3, count=[16, 16])
+    context = MeshContext(mesh, 'capsule')
+    joints = np.array([[0.0, 0.0, -1.0], [0.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    bones = np.array([[0, 1], [1, 2]])
+    skinner = HeatDiffusionSkinner(top_k=2)
+
+    first = skinner.compute(context, joints, bones)
+    factor = context._derived['heat_factorization'][1]
+    second = skinner.compute(context, joints, bones)
+    assert context._derived['heat_factorization'][1] is factor
+    np.testing.assert_array_equal(first['weights'], second['weights'])
+
+    # 骨骼变化时重新分解，只保留最新的分解
+    skinner.compute(context, joints * 0.9, bones)
+    assert context._derived['heat_factorization'][1] is not factor
+
+    heat = np.full(len(mesh.vertices), 0.5)
+    rhs = np.random.default_rng(0).random(len(mesh.vertices))
+    solution = context.heat_factorization(heat).solve(rhs)
+    np.testing.assert_allclose(context.cotangent_laplacian @ solution + heat * solution, rhs, atol=1e-8)
@@ -0,0 +1,71 @@
+"""
+网格检查与准入控制测试：损坏文件头被拒绝，准入决定在预留时计数
+"""
+
+import asyncio
+import json
+import struct
+
+import pytest
+
+from services.mesh_inspector import AdmissionController, MeshInspector, GLB_JSON_CHUNK, GLB_MAGIC
+
+
+def _write_glb(path, document):
+    chunk = json.dumps(document).encode()
+    chunk += b' ' * (-len(chunk) % 4)
+    path.write_bytes(
+        GLB_MAGIC + struct.pack('<II', 2, 20 + len(chunk)) + struct.pack('<II', len(chunk), GLB_JSON_CHUNK) + chunk
+    )
+
+
+@pytest.mark.parametrize('document', [
+    {'meshes': [{'primitives': [{'attributes': {}}]}]},
+    {'meshes': [{'primitives': [{'attributes': {'POSITION': 3}}]}], 'accessors': [{'count': 3}]},
+    {'meshes': [{'primitives': [{'attributes': {'POSITION': 'a'}}]}], 'accessors': [{'count': 3}]},
+    {'meshes': [None]},
+    [],
+])
+def test_malformed_glb_is_rejected(tmp_path, document):
+    path = tmp_path / 'broken.glb'
+    _write_glb(path, document)
+
+    report = MeshInspector().inspect(str(path))
+
+    assert report['supported'] is False
+    assert 'error' in report
+    assert AdmissionController().decide(report) == 'reject'
+
+
+def test_valid_glb_counts(tmp_path):
+    path = tmp_path / 'mesh.glb'
+    _write_glb(path, {
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}, 'indices': 1}]}],
+        'accessors': [{'count': 8}, {'count': 36}]
+    })
+
+    report = MeshInspector().inspect(str(path))
+
+    assert report['supported'] is True
+    assert (report['vertex_count'], report['face_count']) == (8, 12)
+
+
+def test_decisions_counted_at_reservation():
+    admission = AdmissionController(memory_budget_bytes=1000)
+    report = {'supported': True, 'estimated_bytes': 100, 'streamable': False, 'format': '.obj'}
+    report['admission'] = admission.decide(report)
+    admission.decide(report)
+    assert admission.get_metrics()['decisions'] == {'load': 0, 'stream': 0, 'reject': 0}
+
+    async def run():
+        async with admission.reserve(report):
+            assert admission.get_metrics()['reserved_bytes'] == 100
+        rejected = dict(report, admission='reject')
+        with pytest.raises(ValueError):
+            async with admission.reserve(rejected):
+                pass
+
+    asyncio.run(run())
+    metrics = admission.get_metrics()
+    assert metrics['decisions'] == {'load': 1, 'stream': 0, 'reject': 1}
+    assert metrics['reserved_bytes'] == 0
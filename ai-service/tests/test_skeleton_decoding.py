@@ -0,0 +1,89 @@
+"""
+骨骼解码性质测试：随机树骨骼编码为端点对（含填充、重复和反向骨骼）后能被无损还原
+"""
+
+import numpy as np
+import pytest
+
+from services.skeleton_decoding import SkeletonDecoder, COORD_LOW, COORD_HIGH
+
+N_DISCRETE = 128
+
+
+def _random_skeleton(rng: np.random.Generator, joint_count: int):
+    """离散格上互不重合的随机关节和随机树骨骼"""
+    cells = rng.choice(N_DISCRETE ** 3, size=joint_count, replace=False)
+    discrete = np.stack(np.unravel_index(cells, (N_DISCRETE,) * 3), axis=1)
+    parents = np.array([rng.integers(0, i) for i in range(1, joint_count)])
+    bones = np.column_stack([parents, np.arange(1, joint_count)])
+    return discrete, bones
+
+
+def _encode(rng: np.random.Generator, discrete: np.ndarray, bones: np.ndarray, pad_rows: int):
+    """端点对编码：打乱顺序、加入反向重复骨骼和填充行"""
+    rows = np.concatenate([discrete[bones[:, 0]], discrete[bones[:, 1]]], axis=1)
+    duplicates = rows[rng.choice(len(rows), size=max(1, len(rows) // 4))][:, [3, 4, 5, 0, 1, 2]]
+    rows = np.concatenate([rows, duplicates])[rng.permutation(len(rows) + len(duplicates))]
+    padding = np.full((pad_rows, 6), -1)
+    return np.concatenate([rows, padding]).astype(np.int64)
+
+
+def _bone_set(joints: np.ndarray, bones: np.ndarray):
+    """以端点坐标表示的无向骨骼集合（与关节编号无关）"""
+    keys = [tuple(np.round(joints[b] * 1e6).astype(np.int64).reshape(-1)) for b in bones]
+    return {min(k[:3], k[3:]) + max(k[:3], k[3:]) for k in keys}
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_decode_recovers_tree(seed):
+    rng = np.random.default_rng(seed)
+    joint_count = int(rng.integers(2, 40))
+    discrete, bones = _random_skeleton(rng, joint_count)
+    raw = _encode(rng, discrete, bones, pad_rows=int(rng.integers(0, 8)))
+
+    joints, decoded_bones = SkeletonDecoder(N_DISCRETE).decode(raw)
+
+    step = (COORD_HIGH - COORD_LOW) / N_DISCRETE
+    expected_joints = COORD_LOW + (discrete + 0.5) * step
+    assert len(joints) == joint_count
+    assert len(decoded_bones) == len(bones)
+    # 关节即离散格中心，骨骼无自环、无重复，所有关节都被引用
+    assert _bone_set(joints, decoded_bones) == _bone_set(expected_joints, bones)
+    assert (decoded_bones[:, 0] != decoded_bones[:, 1]).all()
+    assert len(np.unique(np.sort(decoded_bones, axis=1), axis=0)) == len(decoded_bones)
+    assert set(decoded_bones.reshape(-1)) == set(range(joint_count))
+    # 0号关节是第一根骨骼的起点
+    assert decoded_bones[0, 0] == 0
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_batch_matches_single_decoding(seed):
+    rng = np.random.default_rng(100 + seed)
+    samples = []
+    for _ in range(4):
+        discrete, bones = _random_skeleton(rng, int(rng.integers(2, 30)))
+        samples.append(_encode(rng, discrete, bones, pad_rows=0))
+    # 各样本补齐到相同行数
+    width = max(len(sample) for sample in samples)
+    batch = np.stack([np.concatenate([s, np.full((width - len(s), 6), -1)]) for s in samples])
+
+    decoder = SkeletonDecoder(N_DISCRETE)
+    for (joints, bones), sample in zip(decoder.decode_batch(batch), samples):
+        single_joints, single_bones = decoder.decode(sample)
+        np.testing.assert_allclose(joints, single_joints)
+        np.testing.assert_array_equal(bones, single_bones)
+
+
+def test_continuous_coordinates_are_merged_within_tolerance():
+    decoder = SkeletonDecoder(N_DISCRETE)
+    jitter = 0.1 * decoder.merge_tolerance
+    raw = np.array([
+        [0.0, 0.0, 0.0, 0.1, 0.0, 0.0],
+        [0.1 + jitter, 0.0, 0.0, 0.2, 0.0, 0.0],
+        [np.nan, 0.0, 0.0, 0.3, 0.0, 0.0],
+    ])
+
+    joints, bones = decoder.decode(raw)
+
+    assert len(joints) == 3
+    np.testing.assert_array_equal(bones, [[0, 1], [1, 2]])
@@ -0,0 +1,104 @@
+"""
+骨骼层次性质测试：任意骨骼图（含环、自环、重复骨骼、多个连通分量）都得到覆盖全部关节的有根树
+"""
+
+import numpy as np
+import pytest
+
+from services.skeleton_hierarchy import SkeletonHierarchyBuilder
+
+
+def _random_graph(rng: np.random.Generator, joint_count: int, components: int, extra_edges: int):
+    """由若干随机树组成的骨骼图，再加入分量内的环边、自环和重复骨骼"""
+    joints = rng.uniform(-0.5, 0.5, size=(joint_count, 3))
+    # 每个分量至少一个关节
+    labels = rng.integers(0, components, size=joint_count)
+    labels[:components] = np.arange(components)
+    labels = np.sort(labels)
+
+    bones = []
+    for component in range(components):
+        members = np.flatnonzero(labels == component)
+        for i in range(1, len(members)):
+            bones.append([members[rng.integers(0, i)], members[i]])
+    tree_bones = np.array(bones, dtype=np.int64).reshape(-1, 2)
+
+    extras = []
+    for _ in range(extra_edges):
+        component = rng.integers(0, components)
+        members = np.flatnonzero(labels == component)
+        if len(members) >= 2:
+            extras.append(rng.choice(members, size=2, replace=False))
+    extras.append([0, 0])
+    if len(tree_bones):
+        extras.append(tree_bones[0][::-1])
+    all_bones = np.concatenate([tree_bones, np.array(extras, dtype=np.int64).reshape(-1, 2)])
+    return joints, all_bones[rng.permutation(len(all_bones))], tree_bones
+
+
+def _assert_rooted_tree(hierarchy, joint_count: int):
+    parents = hierarchy['parents']
+    order = hierarchy['order']
+    root = hierarchy['root_index']
+
+    assert len(parents) == joint_count
+    assert sorted(order.tolist()) == list(range(joint_count))
+    assert order[0] == root and parents[root] == -1
+    assert (parents >= 0).sum() == joint_count - 1
+
+    # 拓扑顺序：父关节先于子关节出现，深度逐级加一
+    position = np.empty(joint_count, dtype=np.int64)
+    position[order] = np.arange(joint_count)
+    children = np.flatnonzero(parents >= 0)
+    assert (position[parents[children]] < position[children]).all()
+    np.testing.assert_array_equal(hierarchy['depth'][children], hierarchy['depth'][parents[children]] + 1)
+
+    # 骨骼即按拓扑顺序排列的 (父, 子)
+    np.testing.assert_array_equal(hierarchy['bones'], np.column_stack([parents[order[1:]], order[1:]]))
+    assert len(set(hierarchy['joint_names'])) == joint_count
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_any_bone_graph_becomes_rooted_tree(seed):
+    rng = np.random.default_rng(seed)
+    joint_count = int(rng.integers(2, 40))
+    components = int(rng.integers(1, min(4, joint_count) + 1))
+    joints, bones, _ = _random_graph(rng, joint_count, components, int(rng.integers(0, 6)))
+
+    hierarchy = SkeletonHierarchyBuilder().build(joints, bones)
+
+    _assert_rooted_tree(hierarchy, joint_count)
+    assert hierarchy['components'] == components
+    assert hierarchy['bridged_bones'] == components - 1
+    unique_bones = {tuple(sorted(b)) for b in bones.tolist() if b[0] != b[1]}
+    assert hierarchy['dropped_bones'] == len(unique_bones) - (joint_count - components)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_tree_input_keeps_its_bones(seed):
+    rng = np.random.default_rng(200 + seed)
+    joint_count = int(rng.integers(2, 30))
+    joints, _, tree_bones = _random_graph(rng, joint_count, 1, 0)
+
+    hierarchy = SkeletonHierarchyBuilder().build(joints, tree_bones)
+
+    _assert_rooted_tree(hierarchy, joint_count)
+    assert {tuple(sorted(b)) for b in hierarchy['bones'].tolist()} == {tuple(sorted(b)) for b in tree_bones.tolist()}
+    assert hierarchy['dropped_bones'] == 0
+
+
+def test_root_rules():
+    # 竖直的 Y 形：底部关节 0，分叉关节 1
+    joints = np.array([[0, -1.0, 0], [0, 0, 0], [-0.5, 0.5, 0], [0.5, 0.5, 0], [0, 1.0, 0]])
+    bones = np.array([[0, 1], [1, 2], [1, 3], [1, 4]])
+    builder = SkeletonHierarchyBuilder()
+
+    assert builder.build(joints, bones, {'articulation_style': 'mechanical'})['root_index'] == 0
+    assert builder.build(joints, bones, {'articulation_style': 'humanoid'})['root_index'] == 1
+    assert builder.build(joints, bones)['root_index'] == 1
+
+
+def test_empty_skeleton():
+    hierarchy = SkeletonHierarchyBuilder().build(np.zeros((0, 3)), np.zeros((0, 2)))
+    assert hierarchy['root_index'] is None
+    assert len(hierarchy['bones']) == 0
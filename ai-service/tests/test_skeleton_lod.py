@@ -0,0 +1,84 @@
+"""
+骨骼 LOD 性质测试：每级都是更粗的有根树，关节映射到自身或最近的保留祖先
+"""
+
+import numpy as np
+import pytest
+
+from services.skeleton_lod import SkeletonLODBuilder, MIN_LOD_JOINTS
+
+
+def _random_tree(rng: np.random.Generator, joint_count: int):
+    """根为0的随机树，父关节序号小于子关节"""
+    joints = rng.uniform(-0.5, 0.5, size=(joint_count, 3))
+    parents = np.array([-1] + [int(rng.integers(0, i)) for i in range(1, joint_count)])
+    return joints, parents
+
+
+def _ancestors(parents: np.ndarray, joint: int):
+    chain = [joint]
+    while parents[chain[-1]] >= 0:
+        chain.append(int(parents[chain[-1]]))
+    return chain
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_levels_are_nested_rooted_trees(seed):
+    rng = np.random.default_rng(seed)
+    joint_count = int(rng.integers(4, 80))
+    joints, parents = _random_tree(rng, joint_count)
+    names = [f"joint_{i}" for i in range(joint_count)]
+
+    lods = SkeletonLODBuilder().build(joints, parents, levels=4, joint_names=names)
+
+    previous_source = np.arange(joint_count)
+    for index, lod in enumerate(lods):
+        assert lod['level'] == index + 1
+        source = lod['source_joints']
+        lod_parents = lod['parents']
+        count = len(source)
+
+        # 关节逐级减少但不少于下限，且是上一级关节的子集；全分辨率的根始终保留
+        assert MIN_LOD_JOINTS <= count < len(previous_source)
+        assert set(source.tolist()) <= set(previous_source.tolist())
+        assert 0 in source.tolist()
+        np.testing.assert_allclose(lod['joints'], joints[source].astype(np.float32))
+        assert lod['joint_names'] == [names[i] for i in source]
+
+        # 有根树：唯一的根，沿父关节必然到达根
+        assert (lod_parents < 0).sum() == 1
+        for joint in range(count):
+            assert len(_ancestors(lod_parents, joint)) <= count
+        child = np.flatnonzero(lod_parents >= 0)
+        np.testing.assert_array_equal(lod['bones'], np.column_stack([lod_parents[child], child]))
+
+        # LOD 父子关系对应全分辨率中的祖先关系
+        for joint in child:
+            assert source[lod_parents[joint]] in _ancestors(parents, int(source[joint]))
+
+        # 全分辨率关节映射到自身或最近的保留祖先
+        joint_map = lod['joint_map']
+        assert len(joint_map) == joint_count
+        np.testing.assert_array_equal(joint_map[source], np.arange(count))
+        kept = set(source.tolist())
+        for joint in range(joint_count):
+            nearest_kept = next(a for a in _ancestors(parents, joint) if a in kept)
+            assert source[joint_map[joint]] == nearest_kept
+
+        previous_source = source
+
+
+def test_small_skeleton_has_no_levels():
+    joints = np.array([[0, 0, 0], [0, 1, 0], [0, 2, 0]], dtype=np.float32)
+    assert SkeletonLODBuilder().build(joints, np.array([-1, 0, 1]), levels=3) == []
+
+
+def test_chain_collapses_interior_joints_first():
+    # 链 0-1-2-3-4 加分叉 1-5：度2的链中间关节先折叠，分叉关节 1 保留
+    joints = np.array([[0, 0, 0], [0, 1, 0], [0, 2, 0], [0, 3, 0], [0, 4, 0], [1, 1, 0]], dtype=np.float32)
+    parents = np.array([-1, 0, 1, 2, 3, 1])
+
+    lods = SkeletonLODBuilder(reduction=0.5).build(joints, parents, levels=1)
+
+    assert 1 in lods[0]['source_joints'].tolist()
+    assert len(lods[0]['source_joints']) == 3
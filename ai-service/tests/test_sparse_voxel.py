@@ -0,0 +1,70 @@
+"""
+稀疏体素重建测试：标准几何体的重建结果水密且朝向一致
+"""
+
+import numpy as np
+import pytest
+import trimesh
+
+from models.requests import ProcessingOptions
+from services.sparse_voxel import MAX_OCTREE_DEPTH, MIN_OCTREE_DEPTH, SparseVoxelRemesher
+
+PRIMITIVES = {
+    'box': lambda: trimesh.creation.box(),
+    'icosphere': lambda: trimesh.creation.icosphere(),
+    'cylinder': lambda: trimesh.creation.cylinder(radius=0.5, height=2.0),
+    'capsule': lambda: trimesh.creation.capsule(height=1.0, radius=0.4),
+    'cone': lambda: trimesh.creation.cone(radius=0.5, height=1.0),
+    'torus': lambda: trimesh.creation.torus(major_radius=1.0, minor_radius=0.3),
+    'annulus': lambda: trimesh.creation.annulus(r_min=0.5, r_max=1.0, height=0.3),
+}
+
+
+def _assert_closed_shell(remeshed: trimesh.Trimesh, source: trimesh.Trimesh):
+    assert remeshed.is_watertight
+    assert remeshed.is_winding_consistent
+    assert remeshed.volume > 0
+    # 等值面是输入表面向外偏移不到两个体素的外壳
+    assert (remeshed.bounds[0] <= source.bounds[0]).all()
+    assert (remeshed.bounds[1] >= source.bounds[1]).all()
+
+
+@pytest.mark.parametrize('name', sorted(PRIMITIVES))
+def test_primitives_are_watertight(name):
+    source = PRIMITIVES[name]()
+    _assert_closed_shell(SparseVoxelRemesher().remesh(source, 6), source)
+
+
+def test_torus_is_watertight_at_depth_8():
+    # 深度8时管壁附近出现对角同号的歧义面，曾产生非流形边
+    source = PRIMITIVES['torus']()
+    remeshed = SparseVoxelRemesher().remesh(source, 8)
+    _assert_closed_shell(remeshed, source)
+    assert remeshed.euler_number == 0
+
+
+def test_ambiguous_faces_are_resolved():
+    remesher = SparseVoxelRemesher()
+    # 单个体素面：对角两个角点在内部
+    corners = np.array([[0, 0, 0], [0, 1, 0], [0, 1, 1], [0, 0, 1]], dtype=np.int64)
+    span = 4
+    order = np.argsort(remesher._encode(corners, span))
+    corner_keys = remesher._encode(corners, span)[order]
+    values = np.array([-0.5, 0.5, -0.2, 0.5])[order]
+
+    resolved_values, resolved = remesher._resolve_ambiguous_faces(corner_keys, values, span)
+
+    assert resolved == 1
+    assert (resolved_values < 0).sum() == 1
+    # 离等值面较近（取值 -0.2）的角点被改为外部
+    flipped = np.flatnonzero((values < 0) & (resolved_values >= 0))
+    assert values[flipped[0]] == -0.2
+
+
+def test_depth_outside_supported_range_is_rejected():
+    for depth in (MIN_OCTREE_DEPTH - 1, MAX_OCTREE_DEPTH + 1):
+        with pytest.raises(ValueError):
+            SparseVoxelRemesher().remesh(PRIMITIVES['box'](), depth)
+        # 请求校验使用同一范围
+        with pytest.raises(ValueError):
+            ProcessingOptions(octree_depth=depth)
@@ -0,0 +1,49 @@
+"""
+阶段图测试：按输入哈希记忆化，回退结果不缓存
+"""
+
+import asyncio
+
+import numpy as np
+
+from services.mesh_cache import MeshCache
+from services.stage_graph import StageGraph
+
+
+def _counting_graph(fallback: bool):
+    calls = {'source': 0, 'double': 0}
+
+    async def source(value):
+        calls['source'] += 1
+        return {'points': np.full(4, value, dtype=np.float32), 'is_fallback': fallback}
+
+    async def double(source_output):
+        calls['double'] += 1
+        return source_output['points'] * 2
+
+    graph = StageGraph(MeshCache())
+    graph.add_stage('source', source, ['value'])
+    graph.add_stage('double', double, ['source'])
+    return graph, calls
+
+
+def test_stages_memoized_by_input_digest():
+    graph, calls = _counting_graph(fallback=False)
+    _, first = asyncio.run(graph.run({'value': 1.0}))
+    values, second = asyncio.run(graph.run({'value': 1.0}))
+    _, third = asyncio.run(graph.run({'value': 2.0}))
+
+    assert first == {'source': 'run', 'double': 'run'}
+    assert second == {'source': 'hit', 'double': 'hit'}
+    assert third == {'source': 'run', 'double': 'run'}
+    np.testing.assert_array_equal(values['double'], np.full(4, 2.0))
+    assert calls == {'source': 2, 'double': 2}
+
+
+def test_fallback_outputs_are_not_cached():
+    graph, calls = _counting_graph(fallback=True)
+    _, first = asyncio.run(graph.run({'value': 1.0}))
+    _, second = asyncio.run(graph.run({'value': 1.0}))
+
+    assert first['source'] == second['source'] == 'fallback'
+    assert calls['source'] == 2
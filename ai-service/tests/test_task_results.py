@@ -0,0 +1,40 @@
+"""
+任务结果表测试：LRU 上限与过期
+"""
+
+from models.requests import ProcessingResult
+from services import task_results
+from services.task_results import TaskResultRegistry
+
+
+def _result(seconds: float) -> ProcessingResult:
+    return ProcessingResult(processing_time=seconds)
+
+
+def test_least_recently_used_results_are_evicted():
+    registry = TaskResultRegistry(max_results=2)
+    registry.put('a', _result(1))
+    registry.put('b', _result(2))
+    assert registry.get('a').processing_time == 1
+    registry.put('c', _result(3))
+
+    assert registry.get('b') is None
+    assert registry.get('a') is not None and registry.get('c') is not None
+    assert len(registry) == 2
+    assert registry.get_metrics()['evicted'] == 1
+
+
+def test_results_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(task_results.time, 'monotonic', lambda: now[0])
+    registry = TaskResultRegistry(ttl_seconds=10)
+    registry.put('a', _result(1))
+    now[0] += 5
+    registry.put('b', _result(2))
+
+    now[0] += 6
+    assert registry.get('a') is None
+    assert 'b' in registry
+    now[0] += 5
+    assert len(registry) == 1 and registry.get('b') is None
+    assert registry.get_metrics()['expired'] == 2